@@ -0,0 +1,63 @@
+# from https://github.com/Unstructured-IO/pipeline-sec-filings
+
+"""Module for clustering locations of Titles within the sequence of document elements"""
+from typing import Any, List
+
+import numpy as np
+import numpy.typing as npt
+
+
+def cluster_title_locs(
+    title_locs: npt.NDArray[np.int_], eps: int = 6, min_samples: int = 5
+) -> npt.NDArray[np.int_]:
+    """Clusters locations of Titles within the sequence of elements, given as sorted distinct
+    indices, the same way as sklearn.cluster.DBSCAN(eps=eps, min_samples=min_samples) does
+    in 1d space. Returns the cluster number of each location, with clusters numbered from left
+    to right and -1 for noise. Runs in linear time of the last location.
+    """
+    labels = np.full(len(title_locs), -1, dtype=int)
+    if len(title_locs) == 0:
+        return labels
+    # NOTE: title_counts[k] is the number of titles before index k, so the titles
+    # within eps of a location, including itself, are counted with two lookups.
+    is_title = np.zeros(int(title_locs[-1]) + eps + 1, dtype=bool)
+    is_title[title_locs] = True
+    title_counts = np.concatenate(([0], np.cumsum(is_title)))
+    neighbor_counts = (
+        title_counts[title_locs + eps + 1] - title_counts[np.maximum(title_locs - eps, 0)]
+    )
+    is_core = neighbor_counts >= min_samples
+    core_locs = title_locs[is_core]
+    if len(core_locs) == 0:
+        return labels
+    # NOTE: core locations within eps of each other are in the same cluster.
+    core_labels = np.concatenate(([0], np.cumsum(np.diff(core_locs) > eps)))
+    labels[is_core] = core_labels
+
+    # NOTE: other locations within eps of a core location join its cluster. DBSCAN visits
+    # clusters from left to right, so the closest core location on the left takes precedence.
+    is_border = ~is_core
+    border_locs = title_locs[is_border]
+    left = np.cumsum(is_core)[is_border] - 1
+    right = left + 1
+    left_core = np.maximum(left, 0)
+    right_core = np.minimum(right, len(core_locs) - 1)
+    joins_left = (left >= 0) & (border_locs - core_locs[left_core] <= eps)
+    joins_right = (right < len(core_locs)) & (core_locs[right_core] - border_locs <= eps)
+    labels[is_border] = np.where(
+        joins_left,
+        core_labels[left_core],
+        np.where(joins_right, core_labels[right_core], -1),
+    )
+    return labels
+
+
+def cluster_num_to_indices(
+    num: int, elem_idxs: npt.NDArray[Any], res: npt.NDArray[np.int_]
+) -> List[int]:
+    """Keeping in mind the input to clustering was indices in a list of elements interpreted as
+    location in 1-d space, this function gives back the original indices of elements that are
+    members of the cluster with the given number.
+    """
+    idxs = elem_idxs[res == num].astype(int).flatten().tolist()
+    return idxs
@@ -1,8 +1,10 @@
 # from https://github.com/Unstructured-IO/pipeline-sec-filings
 
+from bisect import bisect_left
 from functools import partial
+from itertools import islice
 import re
-from typing import List, Optional, Iterable, Iterator, Any, Tuple
+from typing import Callable, Dict, List, Optional, Iterable, Iterator, Any, Sequence, Tuple, Union
 import sys
 
 if sys.version_info < (3, 8):
@@ -12,13 +14,13 @@ else:
 
 import numpy as np
 import numpy.typing as npt
-from sklearn.cluster import DBSCAN
 from collections import defaultdict
 
 from unstructured.cleaners.core import clean
 from unstructured.documents.elements import Text, ListItem, NarrativeText, Title, Element
 from unstructured.documents.html import HTMLDocument
 from unstructured.nlp.partition import is_possible_title
+from prepline_sec_filings.clustering import cluster_num_to_indices, cluster_title_locs
 from prepline_sec_filings.sections import SECSection
 
 
@@ -47,169 +49,389 @@ def _raise_for_invalid_filing_type(filing_type: Optional[str]):
         raise ValueError(f"Filing type was {filing_type}. Expected: {VALID_FILING_TYPES}")
 
 
+# NOTE: one optional lookahead per section pattern, so a single match call
+# finds every section a text matches. Each lookahead searches the text like re.search.
+# Risk factors titles are matched by is_risk_title rather than by their pattern.
+_SEARCHED_SECTIONS: Final[List[SECSection]] = [
+    section for section in SECSection if section is not SECSection.RISK_FACTORS
+]
+_SECTIONS_RE = re.compile(
+    "".join(
+        f"(?:(?=[\\s\\S]*?(?:{getattr(section.value, 'pattern', section.value)})(?P<s{i}>)))?"
+        for i, section in enumerate(_SEARCHED_SECTIONS)
+    )
+)
+_SECTION_COLUMNS: Final[Dict[SECSection, int]] = {
+    section: i for i, section in enumerate(SECSection)
+}
+_SEARCHED_SECTION_COLUMNS: Final[Dict[str, int]] = {
+    f"s{i}": _SECTION_COLUMNS[section] for i, section in enumerate(_SEARCHED_SECTIONS)
+}
+
+
+class _ElementFeatures:
+    """Text features of document elements computed once per document,
+    stored as columns indexed by element position."""
+
+    def __init__(self, elements: List[Element], filing_type: Optional[str]):
+        _raise_for_invalid_filing_type(filing_type)
+        self.filing_type = filing_type
+        texts = [el.text for el in elements]
+        # NOTE: lowercase cleaned texts, and the same without the 'item' heading
+        # for matching TOC titles to 10-K/Q section titles.
+        self.clean_texts: List[str] = [clean_sec_text(text, lowercase=True) for text in texts]
+        if filing_type in REPORT_TYPES:
+            self.item_free_texts = [
+                remove_item_from_section_text(text) for text in self.clean_texts
+            ]
+        else:
+            self.item_free_texts = self.clean_texts
+        self.is_title: npt.NDArray[np.bool_] = np.array(
+            [is_possible_title(text) for text in texts], dtype=bool
+        )
+        if filing_type in REPORT_TYPES:
+            self.is_item_title = np.array(
+                [ITEM_TITLE_RE.match(text) is not None for text in self.clean_texts], dtype=bool
+            )
+            is_risk = [is_10k_risk_title(text) for text in self.clean_texts]
+        else:
+            self.is_item_title = np.array([is_s1_section_title(text) for text in texts], dtype=bool)
+            is_risk = [is_s1_risk_title(text) for text in self.clean_texts]
+        self.is_toc_title: npt.NDArray[np.bool_] = np.array(
+            [text in ("table of contents", "index") for text in self.clean_texts], dtype=bool
+        )
+        # NOTE: texts matched against section patterns, as is_section_elem cleans them.
+        # Texts without an 'item' heading are the same as their cleaned texts.
+        if filing_type in REPORT_TYPES:
+            self.section_texts = [
+                clean_sec_text(remove_item_from_section_text(text), lowercase=True)
+                if ITEM_TITLE_RE.search(text)
+                else clean_text
+                for text, clean_text in zip(texts, self.clean_texts)
+            ]
+        else:
+            self.section_texts = self.clean_texts
+        # NOTE: section_matches[i, _SECTION_COLUMNS[section]] tells
+        # if element i matches the section title, as is_section_elem does.
+        # Only titles and TOC entries are checked against sections, so only their rows
+        # are matched, titles here and TOC entries by match_sections.
+        self.section_matches: npt.NDArray[np.bool_] = np.zeros(
+            (len(texts), len(_SECTION_COLUMNS)), dtype=bool
+        )
+        self.section_matches[:, _SECTION_COLUMNS[SECSection.RISK_FACTORS]] = is_risk
+        self._texts = texts
+        self._matched_rows: npt.NDArray[np.bool_] = np.zeros(len(texts), dtype=bool)
+        self._text_idxs: Optional[Dict[str, List[int]]] = None
+        self.match_sections(np.flatnonzero(self.is_title))
+
+    def __len__(self) -> int:
+        return len(self.clean_texts)
+
+    @property
+    def is_risk_title(self) -> npt.NDArray[np.bool_]:
+        return self.section_matches[:, _SECTION_COLUMNS[SECSection.RISK_FACTORS]]
+
+    def is_section(self, section: SECSection, idx: int) -> bool:
+        """Checks if the element at idx matches the section title.
+        The element must be a title or matched by match_sections."""
+        return bool(self.section_matches[idx, _SECTION_COLUMNS[section]])
+
+    def match_sections(self, idxs: Iterable[int]):
+        """Matches the elements at idxs against all section patterns at once,
+        skipping elements matched before."""
+        idxs = [idx for idx in idxs if not self._matched_rows[idx]]
+        # NOTE: section patterns have groups of their own, so matches are read by group name.
+        for idx in idxs:
+            for name, group in _SECTIONS_RE.match(self.section_texts[idx]).groupdict().items():
+                if group is not None:
+                    self.section_matches[idx, _SEARCHED_SECTION_COLUMNS[name]] = True
+        self._matched_rows[idxs] = True
+
+    def find_titles(self, titles: Iterable[str]) -> Dict[str, List[int]]:
+        """Returns the indices of elements whose text approximately matches each of titles,
+        found in one pass over the elements."""
+        # NOTE: same as match_10k_toc_title_to_section and match_s1_toc_title_to_section.
+        clean_titles: Dict[str, List[str]] = defaultdict(list)
+        for title in set(titles):
+            clean_titles[clean_sec_text(title, lowercase=True)].append(title)
+        title_idxs: Dict[str, List[int]] = {title: [] for titles in clean_titles.values() for title in titles}
+        if self.filing_type in REPORT_TYPES:
+            # NOTE: titles are prefixes of element texts, so each text is looked up
+            # by its prefix of every title length. Item titles are prefixes of cleaned texts,
+            # other titles are prefixes of texts without the 'item' heading.
+            item_titles: Dict[int, set] = defaultdict(set)
+            other_titles: Dict[int, set] = defaultdict(set)
+            for clean_title in clean_titles:
+                if re.match(ITEM_TITLE_RE, clean_title):
+                    item_titles[len(clean_title)].add(clean_title)
+                else:
+                    other_titles[len(clean_title)].add(clean_title)
+            lookups = [(self.clean_texts, item_titles), (self.item_free_texts, other_titles)]
+            for idx in range(len(self)):
+                for texts, titles_by_length in lookups:
+                    text = texts[idx]
+                    for length, prefixes in titles_by_length.items():
+                        if text[:length] in prefixes:
+                            for title in clean_titles[text[:length]]:
+                                title_idxs[title].append(idx)
+        else:
+            for idx, text in enumerate(self.clean_texts):
+                for title in clean_titles.get(text, []):
+                    title_idxs[title].append(idx)
+        return title_idxs
+
+    def first_equal_idx(self, elements: List[Element], idx: int) -> int:
+        """Returns the index of the first element equal to the element at idx."""
+        # NOTE: equal elements have equal texts, so only elements with the same text are compared.
+        if self._text_idxs is None:
+            self._text_idxs = defaultdict(list)
+            for i, text in enumerate(self._texts):
+                self._text_idxs[text].append(i)
+        element = elements[idx]
+        return first(i for i in self._text_idxs[self._texts[idx]] if elements[i] == element)
+
+
 class SECDocument(HTMLDocument):
     filing_type = None
-
-    def _filter_table_of_contents(self, elements: List[Text]) -> List[Text]:
+    _features: Optional[_ElementFeatures] = None
+
+    def _element_features(self) -> _ElementFeatures:
+        """Returns text features of the elements, computed on first use."""
+        features = self._features
+        if (
+            features is None
+            or features.filing_type != self.filing_type
+            or len(features) != len(self.elements)
+        ):
+            features = self._features = _ElementFeatures(self.elements, self.filing_type)
+        return features
+
+    def _filter_table_of_contents(self, idxs: List[int]) -> List[int]:
         """Filter out unnecessary elements in the table of contents using keyword search."""
+        clean_texts = self._element_features().clean_texts
         if self.filing_type in REPORT_TYPES:
             # NOTE(yuming): Narrow TOC as all elements within
             # the first two titles that contain the keyword 'part i\b'.
             start, end = None, None
-            for i, element in enumerate(elements):
-                if bool(re.match(r"(?i)part i\b", clean_sec_text(element.text))):
+            for i, idx in enumerate(idxs):
+                if bool(re.match(r"(?i)part i\b", clean_texts[idx])):
                     if start is None:
                         # NOTE(yuming): Found the start of the TOC section.
                         start = i
                     else:
                         # NOTE(yuming): Found the end of the TOC section.
                         end = i - 1
-                        filtered_elements = elements[start:end]
-                        return filtered_elements
+                        filtered_idxs = idxs[start:end]
+                        return filtered_idxs
         elif self.filing_type in S1_TYPES:
             # NOTE(yuming): Narrow TOC as all elements within
             # the first pair of duplicated titles that contain the keyword 'prospectus'.
             title_indices = defaultdict(list)
-            for i, element in enumerate(elements):
-                clean_title_text = clean_sec_text(element.text).lower()
-                title_indices[clean_title_text].append(i)
+            for i, idx in enumerate(idxs):
+                title_indices[clean_texts[idx]].append(i)
             duplicate_title_indices = {k: v for k, v in title_indices.items() if len(v) > 1}
             for title, indices in duplicate_title_indices.items():
                 # NOTE(yuming): Make sure that we find the pair of duplicated titles.
                 if "prospectus" in title and len(indices) == 2:
                     start = indices[0]
                     end = indices[1] - 1
-                    filtered_elements = elements[start:end]
-                    return filtered_elements
+                    filtered_idxs = idxs[start:end]
+                    return filtered_idxs
         # NOTE(yuming): Probably better ways to improve TOC,
         # but now we return [] if it fails to find the keyword.
         return []
 
-    def get_table_of_contents(self) -> HTMLDocument:
-        """Identifies text sections that are likely the table of contents."""
-        out_cls = self.__class__
+    def _get_table_of_contents_idxs(self) -> List[int]:
+        """Identifies indices of elements that are likely the table of contents."""
         _raise_for_invalid_filing_type(self.filing_type)
-        title_locs = to_sklearn_format(self.elements)
+        features = self._element_features()
+        title_locs = np.flatnonzero(features.is_title)
         if len(title_locs) == 0:
-            return out_cls.from_elements([])
-        # NOTE(alan): Might be a way to do the same thing that doesn't involve the transformations
-        # necessary to get it into sklearn. We're just looking for densely packed Titles.
-        res = DBSCAN(eps=6.0).fit_predict(title_locs)
+            return []
+        # NOTE(alan): We're just looking for densely packed Titles.
+        res = cluster_title_locs(title_locs)
         for i in range(res.max() + 1):
             idxs = cluster_num_to_indices(i, title_locs, res)
-            cluster_elements: List[Text] = [self.elements[i] for i in idxs]
-            if any(
-                [
-                    # TODO(alan): Maybe swap risk title out for something more generic? It helps to
-                    # have 2 markers though, I think.
-                    is_risk_title(el.text, self.filing_type)
-                    for el in cluster_elements
-                    if isinstance(el, Title)
-                ]
-            ) and any([is_toc_title(el.text) for el in cluster_elements if isinstance(el, Title)]):
-                return out_cls.from_elements(self._filter_table_of_contents(cluster_elements))
-        return out_cls.from_elements(self._filter_table_of_contents(self.elements))
+            cluster_title_idxs = [idx for idx in idxs if isinstance(self.elements[idx], Title)]
+            # TODO(alan): Maybe swap risk title out for something more generic? It helps to
+            # have 2 markers though, I think.
+            if (
+                features.is_risk_title[cluster_title_idxs].any()
+                and features.is_toc_title[cluster_title_idxs].any()
+            ):
+                return self._filter_table_of_contents(idxs)
+        return self._filter_table_of_contents(list(range(len(self.elements))))
+
+    def get_table_of_contents(self) -> HTMLDocument:
+        """Identifies text sections that are likely the table of contents."""
+        return self.__class__.from_elements(
+            [self.elements[idx] for idx in self._get_table_of_contents_idxs()]
+        )
 
     def get_section_narrative_no_toc(self, section: SECSection) -> List[NarrativeText]:
         """Identifies narrative text sections that fall under the given section heading without
         using the table of contents."""
+        return self._get_section_narratives_no_toc([section])[section]
+
+    def _get_section_narratives_no_toc(
+        self, sections: Iterable[SECSection]
+    ) -> Dict[SECSection, List[NarrativeText]]:
+        """Identifies narrative text sections that fall under each of the given section headings
+        without using the table of contents, in one pass over the elements."""
         _raise_for_invalid_filing_type(self.filing_type)
+        features = self._element_features()
         # NOTE(robinson) - We are not skipping table text because the risk narrative section
         # usually does not contain any tables and sometimes tables are used for
         # title formating
-        section_elements: List[NarrativeText] = list()
-        in_section = False
-        for element in self.elements:
-            is_title = is_possible_title(element.text)
-            if in_section:
-                if is_title and is_item_title(element.text, self.filing_type):
-                    if section_elements:
-                        return section_elements
-                    else:
-                        in_section = False
-                elif isinstance(element, NarrativeText) or isinstance(element, ListItem):
-                    section_elements.append(element)
-
-            if is_title and is_section_elem(section, element, self.filing_type):
-                in_section = True
+        section_elements: Dict[SECSection, List[NarrativeText]] = {
+            section: list() for section in sections
+        }
+        in_section = {section: False for section in section_elements}
+        # NOTE: a section is done once its first non-empty run of narrative text ends.
+        pending = list(section_elements)
+        for idx, element in enumerate(self.elements):
+            if not pending:
+                break
+            is_title = features.is_title[idx]
+            is_item = is_title and features.is_item_title[idx]
+            is_narrative = isinstance(element, NarrativeText) or isinstance(element, ListItem)
+            for section in list(pending):
+                if in_section[section]:
+                    if is_item:
+                        if section_elements[section]:
+                            pending.remove(section)
+                            continue
+                        else:
+                            in_section[section] = False
+                    elif is_narrative:
+                        section_elements[section].append(element)
+
+                if is_title and features.is_section(section, idx):
+                    in_section[section] = True
 
         return section_elements
 
-    def _get_toc_sections(self, section: SECSection, toc: HTMLDocument) -> Tuple[Text, Text]:
-        """Identifies section title and next section title in TOC under the given section heading"""
+    def _get_toc_sections(
+        self, section: SECSection, toc_idxs: List[int]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Identifies indices of section title and next section title in TOC under the given
+        section heading"""
+        features = self._element_features()
         # Note(yuming): The matching section and the section after the matching section
         # can be thought of as placeholders to look for matching content below the toc.
         section_toc = first(
-            el for el in toc.elements if is_section_elem(section, el, self.filing_type)
+            i for i, idx in enumerate(toc_idxs) if features.is_section(section, idx)
         )
         if section_toc is None:
             # NOTE(yuming): unable to identify the section in TOC
             return (None, None)
 
-        after_section_toc = toc.after_element(section_toc)
         next_section_toc = first(
-            el
-            for el in after_section_toc.elements
-            if not is_section_elem(section, el, self.filing_type)
+            idx
+            for idx in islice(toc_idxs, section_toc + 1, None)
+            if not features.is_section(section, idx)
         )
         if next_section_toc is None:
             # NOTE(yuming): unable to identify the next section title in TOC,
             # will leads to failure in finding the end of the section
-            return (section_toc, None)
-        return (section_toc, next_section_toc)
+            return (toc_idxs[section_toc], None)
+        return (toc_idxs[section_toc], next_section_toc)
 
     def get_section_narrative(self, section: SECSection) -> List[NarrativeText]:
         """Identifies narrative text sections that fall under the given section heading"""
+        return self.get_all_section_narratives([section])[section]
+
+    def get_all_section_narratives(
+        self, sections: Iterable[SECSection]
+    ) -> Dict[SECSection, List[NarrativeText]]:
+        """Identifies narrative text sections that fall under each of the given section headings.
+        The table of contents is built once, and the section titles are looked up in one pass
+        over the elements for all sections. Sections that are not found map to an empty list."""
         _raise_for_invalid_filing_type(self.filing_type)
         # NOTE(robinson) - We are not skipping table text because the risk narrative section
         # usually does not contain any tables and sometimes tables are used for
         # title formating
-        toc = self.get_table_of_contents()
-        if not toc.pages:
-            return self.get_section_narrative_no_toc(section)
-
+        toc_idxs = self._get_table_of_contents_idxs()
+        if not toc_idxs:
+            return self._get_section_narratives_no_toc(sections)
+        return self._get_section_narratives_from_toc(sections, toc_idxs)
+
+    def _get_section_narratives_from_toc(
+        self, sections: Iterable[SECSection], toc_idxs: List[int]
+    ) -> Dict[SECSection, List[NarrativeText]]:
+        """Identifies narrative text sections that fall under each of the given section headings
+        using the table of contents given by element indices."""
+        # NOTE: parts of the document are index ranges of its elements,
+        # instead of documents made by after_element and before_element.
+        elements = self.elements
+        features = self._element_features()
+        features.match_sections(toc_idxs)
         # Note(yuming): section_toc is the section title in TOC,
         # next_section_toc is the section title right after section_toc in TOC
-        section_toc, next_section_toc = self._get_toc_sections(section, toc)
-        if section_toc is None:
-            # NOTE(yuming): fail to find the section title in TOC
-            return []
-
-        # NOTE(yuming): we use doc after next_section_toc instead of after toc
-        # to workaround an issue where the TOC grabbed too many elements by
-        # starting to parse after the section matched in the TOC
-        doc_after_section_toc = self.after_element(
-            next_section_toc if next_section_toc else section_toc
-        )
-        # NOTE(yuming): map section_toc to the section title after TOC
-        # to find the start of the section
-        section_start_element = get_element_by_title(
-            reversed(doc_after_section_toc.elements), section_toc.text, self.filing_type
-        )
-        if section_start_element is None:
-            return []
-        doc_after_section_heading = self.after_element(section_start_element)
-
-        # NOTE(yuming): Checks if section_toc is the last section in toc based on
-        # the structure of the report filings or fails to find the section title in TOC.
-        # returns everything up to the next Title element
-        # to avoid the worst case of returning the entire doc.
-        if self._is_last_section_in_report(section, toc) or next_section_toc is None:
-            # returns everything after section_start_element in doc
-            return get_narrative_texts(doc_after_section_heading, up_to_next_title=True)
-
-        # NOTE(yuming): map next_section_toc to the section title after TOC
-        # to find the start of the next section, which is also the end of the section we want
-        section_end_element = get_element_by_title(
-            doc_after_section_heading.elements, next_section_toc.text, self.filing_type
+        toc_sections = {section: self._get_toc_sections(section, toc_idxs) for section in sections}
+        title_idxs = features.find_titles(
+            elements[idx].text
+            for section_toc, next_section_toc in toc_sections.values()
+            for idx in (section_toc, next_section_toc)
+            if idx is not None
         )
 
-        if section_end_element is None:
-            # NOTE(yuming): returns everything up to the next Title element
+        section_narratives: Dict[SECSection, List[NarrativeText]] = {}
+        for section, (section_toc, next_section_toc) in toc_sections.items():
+            section_narratives[section] = []
+            if section_toc is None:
+                # NOTE(yuming): fail to find the section title in TOC
+                continue
+
+            # NOTE(yuming): we use doc after next_section_toc instead of after toc
+            # to workaround an issue where the TOC grabbed too many elements by
+            # starting to parse after the section matched in the TOC
+            start_bound = self._index_after_element(
+                next_section_toc if next_section_toc is not None else section_toc
+            )
+            # NOTE(yuming): map section_toc to the section title after TOC
+            # to find the start of the section, the last match below the bound.
+            start_idxs = title_idxs[elements[section_toc].text]
+            if not start_idxs or start_idxs[-1] < start_bound:
+                continue
+            range_after_section_heading = range(
+                self._index_after_element(start_idxs[-1]), len(elements)
+            )
+
+            # NOTE(yuming): Checks if section_toc is the last section in toc based on
+            # the structure of the report filings or fails to find the section title in TOC.
+            # returns everything up to the next Title element
             # to avoid the worst case of returning the entire doc.
-            return get_narrative_texts(doc_after_section_heading, up_to_next_title=True)
+            if self._is_last_section_in_report(section, toc_idxs) or next_section_toc is None:
+                # returns everything after section_start_element in doc
+                section_narratives[section] = get_narrative_texts(
+                    self, up_to_next_title=True, element_range=range_after_section_heading
+                )
+                continue
+
+            # NOTE(yuming): map next_section_toc to the section title after TOC
+            # to find the start of the next section, which is also the end of the section we want
+            end_idxs = title_idxs[elements[next_section_toc].text]
+            end = bisect_left(end_idxs, range_after_section_heading.start)
+            if end == len(end_idxs):
+                # NOTE(yuming): returns everything up to the next Title element
+                # to avoid the worst case of returning the entire doc.
+                section_narratives[section] = get_narrative_texts(
+                    self, up_to_next_title=True, element_range=range_after_section_heading
+                )
+                continue
+
+            section_narratives[section] = get_narrative_texts(
+                self,
+                element_range=range(range_after_section_heading.start, end_idxs[end]),
+            )
+        return section_narratives
 
-        return get_narrative_texts(doc_after_section_heading.before_element(section_end_element))
+    def _index_after_element(self, idx: int) -> int:
+        """Returns the index where after_element of the element at idx would start."""
+        # NOTE: after_element starts after the first element equal to the given one,
+        # which may be an earlier element with the same text.
+        return self._element_features().first_equal_idx(self.elements, idx) + 1
 
     def get_risk_narrative(self) -> List[NarrativeText]:
         """Identifies narrative text sections that fall under the "risk" heading"""
@@ -222,6 +444,9 @@ class SECDocument(HTMLDocument):
         if not inplace:
             # NOTE(alan): Copy filing_type since this attribute isn't in the base class
             new_doc.filing_type = self.filing_type
+        else:
+            # NOTE: cleaners change element texts, so features are computed again.
+            self._features = None
         return new_doc
 
     def _read_xml(self, content):
@@ -232,7 +457,7 @@ class SECDocument(HTMLDocument):
             self.filing_type = type_tag.text.strip()
         return self.document_tree
 
-    def _is_last_section_in_report(self, section: SECSection, toc: HTMLDocument) -> bool:
+    def _is_last_section_in_report(self, section: SECSection, toc_idxs: List[int]) -> bool:
         """Checks to see if the section is the last section in toc for a report types filing."""
         # Note(yuming): This method assume the section already exists in toc.
         if self.filing_type in ["10-K", "10-K/A"]:
@@ -240,10 +465,11 @@ class SECDocument(HTMLDocument):
             if section == SECSection.FORM_SUMMARY:
                 return True
             if section == SECSection.EXHIBITS:
+                features = self._element_features()
                 form_summary_section = first(
-                    el
-                    for el in toc.elements
-                    if is_section_elem(SECSection.FORM_SUMMARY, el, self.filing_type)
+                    idx
+                    for idx in toc_idxs
+                    if features.is_section(SECSection.FORM_SUMMARY, idx)
                 )
                 # if FORM_SUMMARY is not in toc, the last section is EXHIBITS
                 if form_summary_section is None:
@@ -255,21 +481,27 @@ class SECDocument(HTMLDocument):
         return False
 
 
-def get_narrative_texts(doc: HTMLDocument, up_to_next_title: Optional[bool] = False) -> List[Text]:
+def get_narrative_texts(
+    doc: HTMLDocument,
+    up_to_next_title: Optional[bool] = False,
+    element_range: Optional[range] = None,
+) -> List[Text]:
     """Returns a list of NarrativeText or ListItem from document,
-    with option to return narrative texts only up to next Title element."""
+    with option to return narrative texts only up to next Title element.
+    If element_range is given, only elements at indices within the range are considered."""
+    elements: Iterable[Element] = doc.elements
+    if element_range is not None:
+        elements = map(doc.elements.__getitem__, element_range)
     if up_to_next_title:
         narrative_texts = []
-        for el in doc.elements:
+        for el in elements:
             if isinstance(el, NarrativeText) or isinstance(el, ListItem):
                 narrative_texts.append(el)
             else:
                 break
         return narrative_texts
     else:
-        return [
-            el for el in doc.elements if isinstance(el, NarrativeText) or isinstance(el, ListItem)
-        ]
+        return [el for el in elements if isinstance(el, NarrativeText) or isinstance(el, ListItem)]
 
 
 def is_section_elem(section: SECSection, elem: Text, filing_type: Optional[str]) -> bool:
@@ -334,28 +566,6 @@ def is_s1_risk_title(title: str) -> bool:
     return title.strip().lower() == "risk factors"
 
 
-def to_sklearn_format(elements: List[Element]) -> npt.NDArray[np.float32]:
-    """The input to clustering needs to be locations in euclidean space, so we need to interpret
-    the locations of Titles within the sequence of elements as locations in 1d space
-    """
-    is_title: npt.NDArray[np.bool_] = np.array(
-        [is_possible_title(el.text) for el in elements][: len(elements)], dtype=bool
-    )
-    title_locs = np.arange(len(is_title)).astype(np.float32)[is_title].reshape(-1, 1)
-    return title_locs
-
-
-def cluster_num_to_indices(
-    num: int, elem_idxs: npt.NDArray[np.float32], res: npt.NDArray[np.int_]
-) -> List[int]:
-    """Keeping in mind the input to clustering was indices in a list of elements interpreted as
-    location in 1-d space, this function gives back the original indices of elements that are
-    members of the cluster with the given number.
-    """
-    idxs = elem_idxs[res == num].astype(int).flatten().tolist()
-    return idxs
-
-
 def first(it: Iterable) -> Any:
     """Grabs the first item in an iterator."""
     try:
@@ -387,22 +597,29 @@ def remove_item_from_section_text(text: str) -> str:
     return re.sub(ITEM_TITLE_RE, "", text).strip()
 
 
+def _get_toc_title_matcher(filing_type: Optional[str]) -> Callable[[str, str], bool]:
+    """Returns the function matching cleaned TOC titles to cleaned element texts
+    for a given filing type"""
+    _raise_for_invalid_filing_type(filing_type)
+    if filing_type in REPORT_TYPES:
+        return match_10k_toc_title_to_section
+    return match_s1_toc_title_to_section
+
+
 def get_element_by_title(
-    elements: Iterator[Element],
+    elements: Union[Iterator[Element], Sequence[Element]],
     title: str,
     filing_type: Optional[str],
+    element_range: Optional[Iterable[int]] = None,
 ) -> Optional[Element]:
-    """Get element from Element list whose text approximately matches title"""
-    _raise_for_invalid_filing_type(filing_type)
-    if filing_type in REPORT_TYPES:
-        match = match_10k_toc_title_to_section
-    elif filing_type in S1_TYPES:
-        match = match_s1_toc_title_to_section
+    """Get element from Element list whose text approximately matches title.
+    If element_range is given, elements must be a sequence, and only elements at indices
+    from element_range are searched, in its order."""
+    match = _get_toc_title_matcher(filing_type)
+    if element_range is not None:
+        elements = map(elements.__getitem__, element_range)  # type: ignore
+    clean_title = clean_sec_text(title, lowercase=True)
     return first(
-        el
-        for el in elements
-        if match(
-            clean_sec_text(el.text, lowercase=True),
-            clean_sec_text(title, lowercase=True),
-        )
+        el for el in elements if match(clean_sec_text(el.text, lowercase=True), clean_title)
     )
+
@@ -0,0 +1,207 @@
+"""Tests of prepline_sec_filings.sec_document and clustering functions."""
+
+import importlib.util
+from pathlib import Path
+import random
+import sys
+from typing import List
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+HAS_SKLEARN = importlib.util.find_spec("sklearn") is not None
+HAS_UNSTRUCTURED = importlib.util.find_spec("unstructured") is not None
+
+
+@unittest.skipUnless(HAS_SKLEARN, "sklearn is not installed")
+class ClusterTitleLocsTest(unittest.TestCase):
+    """cluster_title_locs labels locations the same way as sklearn DBSCAN does."""
+
+    def assert_same_as_dbscan(self, locs: List[int], eps: int = 6, min_samples: int = 5):
+        from sklearn.cluster import DBSCAN  # pylint:disable=import-outside-toplevel
+        from prepline_sec_filings.clustering import (  # pylint:disable=import-outside-toplevel
+            cluster_title_locs,
+        )
+
+        title_locs = np.array(sorted(set(locs)), dtype=int)
+        labels = cluster_title_locs(title_locs, eps, min_samples)
+        if len(title_locs) == 0:
+            expected = np.array([], dtype=int)
+        else:
+            expected = DBSCAN(eps=float(eps), min_samples=min_samples).fit_predict(
+                title_locs.astype(np.float32).reshape(-1, 1)
+            )
+        np.testing.assert_array_equal(
+            labels, expected, err_msg=f"locs={title_locs.tolist()} eps={eps} "
+            f"min_samples={min_samples}"
+        )
+
+    def test_edge_cases(self):
+        for locs in [[], [0], [0, 6, 12, 18, 24], list(range(5)), [0, 1, 2, 3, 10],
+                     [0, 6, 7, 8, 9, 10, 16]]:
+            with self.subTest(locs=locs):
+                self.assert_same_as_dbscan(locs)
+
+    def test_random_layouts(self):
+        rnd = random.Random(0)
+        for _ in range(500):
+            layout = rnd.choice(["uniform", "bursty", "toc"])
+            n = rnd.randint(0, 300)
+            if layout == "uniform":
+                locs = rnd.sample(range(rnd.randint(n, 3 * n + 10)), n)
+            elif layout == "bursty":
+                locs, pos = [], 0
+                while len(locs) < n:
+                    pos += rnd.choice([1, 1, 2, 3, 5, 6, 7, 8, 12, 40])
+                    locs.append(pos)
+            else:
+                # NOTE: a dense table of contents among scattered titles.
+                locs = list(range(10, 10 + rnd.randint(0, 80), rnd.choice([1, 2, 3])))
+                locs += [rnd.randint(0, 5000) for _ in range(n)]
+            self.assert_same_as_dbscan(
+                locs, rnd.choice([6, 6, 6, 1, 3, 10]), rnd.choice([5, 5, 5, 1, 2, 3, 8])
+            )
+
+
+def _filing_elements():
+    """Elements of a 10-K filing with a table of contents."""
+    from unstructured.documents.elements import (  # pylint:disable=import-outside-toplevel
+        ListItem,
+        NarrativeText,
+        Title,
+    )
+
+    items = [
+        ("Item 1", "Business"),
+        ("Item 1A", "Risk Factors"),
+        ("Item 2", "Properties"),
+        ("Item 3", "Legal Proceedings"),
+        ("Item 7", "Management's Discussion and Analysis"),
+        ("Item 9A", "Controls and Procedures"),
+        ("Item 15", "Exhibits"),
+    ]
+    elements = [
+        NarrativeText("This annual report is filed with the Securities and Exchange Commission."),
+        Title("Table of Contents"),
+        Title("PART I"),
+    ]
+    elements += [Title(f"{item} {title}") for item, title in items]
+    elements += [
+        Title("PART II"),
+        NarrativeText("This report contains forward-looking statements about our business."),
+        Title("PART I"),
+    ]
+    for item, title in items:
+        elements.append(Title(f"{item.upper()} {title.upper()}"))
+        elements.append(NarrativeText(f"The first paragraph of {title} describes the company."))
+        elements.append(ListItem(f"A list item of {title} follows the paragraph."))
+        if title == "Risk Factors":
+            elements.append(Title("Risks Related to Our Business"))
+        elements.append(NarrativeText(f"The last paragraph of {title} ends the section."))
+    return elements
+
+
+@unittest.skipUnless(HAS_UNSTRUCTURED, "unstructured is not installed")
+class SectionNarrativesTest(unittest.TestCase):
+    """All sections found in one pass are the same as sections found one by one."""
+
+    def test_same_as_section_narrative(self):
+        from prepline_sec_filings.sec_document import (  # pylint:disable=import-outside-toplevel
+            SECDocument,
+        )
+        from prepline_sec_filings.sections import (  # pylint:disable=import-outside-toplevel
+            SECTIONS_10K,
+        )
+
+        for toc in [True, False]:
+            elements = _filing_elements()
+            if not toc:
+                elements = elements[3:]
+            doc = SECDocument.from_elements(elements)
+            doc.filing_type = "10-K"
+            narratives = doc.get_all_section_narratives(SECTIONS_10K)
+            with self.subTest(toc=toc):
+                self.assertEqual(list(narratives), list(SECTIONS_10K))
+                self.assertTrue(any(narratives.values()))
+                for section in SECTIONS_10K:
+                    self.assertEqual(
+                        narratives[section], doc.get_section_narrative(section), section
+                    )
+
+
+_TITLE_TEXTS = [
+    "Item 1. Business",
+    "ITEM 1A: RISK FACTORS",
+    "Item  1 Business",
+    "Item 1A. Risk Factors Summary",
+    "Item 7. Management's Discussion and Analysis",
+    "Item 7A - Quantitative and Qualitative Disclosures About Market Risk",
+    "Item 10. Directors, Executive Officers and Corporate Governance",
+    "Item 13. Certain Relationships and Related Transactions",
+    "Item 15.",
+    "Exhibits and Financial Statement Schedules",
+    "Table of Contents",
+    "  Index. ",
+    "PART I",
+    "PROSPECTUS SUMMARY",
+    "Summary",
+    "About this Prospectus",
+    "Forward-Looking Statements",
+    "Use of Proceeds",
+    "Dividend Policy",
+    "Capitalization",
+    "Dilution",
+    "Management",
+    "Our Management",
+    "Executive Compensation",
+    "Principal Stockholders",
+    "Security Ownership of Certain Beneficial Owners and Management",
+    "Description of Capital Stock",
+    "Description of the Debt Securities",
+    "Shares Eligible for Future Sale",
+    "Material U.S. Federal Income Tax Consequences",
+    "Underwriting",
+    "Legal Matters",
+    "Experts",
+    "Where You Can Find More Information",
+    "This paragraph mentions risk factors and ends with a period.",
+]
+
+
+@unittest.skipUnless(HAS_UNSTRUCTURED, "unstructured is not installed")
+class ElementFeaturesTest(unittest.TestCase):
+    """Feature columns are the same as the per-element checks."""
+
+    def test_same_as_element_checks(self):
+        from unstructured.documents.elements import Title  # pylint:disable=import-outside-toplevel
+        from prepline_sec_filings.sec_document import (  # pylint:disable=import-outside-toplevel
+            VALID_FILING_TYPES,
+            _ElementFeatures,
+            is_item_title,
+            is_section_elem,
+            is_toc_title,
+        )
+        from prepline_sec_filings.sections import SECSection  # pylint:disable=import-outside-toplevel
+
+        elements = [Title(text) for text in _TITLE_TEXTS]
+        for filing_type in VALID_FILING_TYPES:
+            features = _ElementFeatures(elements, filing_type)
+            features.match_sections(range(len(elements)))
+            for idx, element in enumerate(elements):
+                with self.subTest(filing_type=filing_type, text=element.text):
+                    self.assertEqual(
+                        features.is_item_title[idx], is_item_title(element.text, filing_type)
+                    )
+                    self.assertEqual(features.is_toc_title[idx], is_toc_title(element.text))
+                    for section in SECSection:
+                        self.assertEqual(
+                            features.is_section(section, idx),
+                            is_section_elem(section, element, filing_type),
+                            section,
+                        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -297,8 +297,8 @@ def main():
                 else:
                     sections = SECTIONS_10Q
                 all_sections = {}
-                for sec in sections:
-                    sec_texts = doc.get_section_narrative(sec)
+                for sec, sec_texts in doc.get_all_section_narratives(
+                        sections).items():
                     if not sec_texts:
                         continue
                     texts = [n.text for n in sec_texts]
@@ -15,17 +15,38 @@
 
 import argparse
 from concurrent import futures
+import configparser
 import datetime
 import logging
 import os
-import subprocess
 import sys
 import threading
+import time
 import typing
+import urllib.request
 
-from sfdc2bq_launcher import replicate_sfdc_object_to_bq
+from sfdc2bq_launcher import (open_run_history,
+                              plan_sfdc_object_replication,
+                              submit_sfdc_object_replication)
+from sfdc2bq.api_limit_governor import (ApiLimitGovernor,
+                                        ReplicationDeferredError)
+from sfdc2bq.profiler import SamplingProfiler
+from sfdc2bq.replication_plan import ReplicationPlan, format_plans
+from sfdc2bq.run_history import (STATUS_FAILED, STATUS_SUCCEEDED,
+                                 ReplicationRunStats, find_regressions,
+                                 format_cost_summary, format_report,
+                                 record_run)
+
+# Replication classes are imported when replication starts.
+if typing.TYPE_CHECKING:
+    from sfdc2bq import SubmittedReplication  # type: ignore
 
 PARALLEL_EXECUTION_THREAD_NUM = 5  # Number of threads for replication.
+_PROJECT_ENV_VARS = ["GOOGLE_CLOUD_PROJECT", "GCLOUD_PROJECT",
+                     "CLOUDSDK_CORE_PROJECT"]
+_METADATA_PROJECT_URL = ("http://metadata.google.internal/"
+                         "computeMetadata/v1/project/project-id")
+_METADATA_TIMEOUT_SECONDS = 1.0
 
 
 def _initialize_console_logging(debug: bool = False,
@@ -52,27 +73,217 @@ def _initialize_console_logging(debug: bool = False,
                         force=True)
 
 
-def _run_object_replication(sfdc_auth_parameters: typing.Union[str, typing.Dict[str, str]],
-                            api_name: str,
-                            bq_project_id: str,
-                            bq_dataset_name: str,
-                            bq_output_table_name: typing.Optional[str] = None,
-                            bq_location: str = "US",
-                            store_metadata: bool = False,
-                            csv_delimiter: str = "COMMA"):
+def _get_default_project() -> str:
+    """Resolves default Google Cloud project without running gcloud CLI:
+        1. From environment variables.
+        2. From gcloud CLI active configuration file.
+        3. From GCE/Cloud Run metadata server.
+
+    Returns:
+        str: project id or empty string if it cannot be resolved.
+    """
+    for env_var in _PROJECT_ENV_VARS:
+        project = os.getenv(env_var, "").strip()
+        if project:
+            return project
+
+    config_dir = os.getenv("CLOUDSDK_CONFIG",
+                           os.path.expanduser("~/.config/gcloud"))
+    try:
+        with open(os.path.join(config_dir, "active_config"),
+                  encoding="utf-8") as file:
+            config_name = file.read().strip() or "default"
+    except OSError:
+        config_name = "default"
+    config = configparser.ConfigParser()
+    try:
+        config.read(os.path.join(config_dir, "configurations",
+                                 f"config_{config_name}"), encoding="utf-8")
+        project = config.get("core", "project", fallback="").strip()
+        if project:
+            return project
+    except configparser.Error:
+        pass
+
+    request = urllib.request.Request(_METADATA_PROJECT_URL,
+                                     headers={"Metadata-Flavor": "Google"})
+    try:
+        with urllib.request.urlopen(
+                request, timeout=_METADATA_TIMEOUT_SECONDS) as response:
+            return response.read().decode("utf-8").strip()
+    except OSError:
+        return ""
+
+
+def _submit_object_replication(sfdc_auth_parameters: typing.Union[str, typing.Dict[str, str]],
+                               api_name: str,
+                               bq_project_id: str,
+                               bq_dataset_name: str,
+                               bq_output_table_name: typing.Optional[str] = None,
+                               bq_location: str = "US",
+                               store_metadata: bool = False,
+                               csv_delimiter: str = "COMMA",
+                               row_hash: bool = False,
+                               reuse_bulk_jobs: bool = False,
+                               api_governor: typing.Optional[ApiLimitGovernor] = None,
+                               low_priority: bool = False,
+                               local_sink_path: typing.Optional[str] = None,
+                               change_log: bool = False,
+                               force_full_reload: bool = False,
+                               run_stats: typing.Optional[ReplicationRunStats] = None,
+                               column_group_size: typing.Optional[int] = None,
+                               reconcile: bool = False,
+                               backfill_new_fields: bool = False,
+                               blob_location: typing.Optional[str] = None,
+                               cdc: bool = False
+                               ) -> typing.Optional["SubmittedReplication"]:
     threading.current_thread().name = f"SFDC: `{api_name}`"
     try:
-        replicate_sfdc_object_to_bq(
+        replication = submit_sfdc_object_replication(
             sfdc_auth_parameters=sfdc_auth_parameters, api_name=api_name,
             bq_project_id=bq_project_id, bq_dataset_name=bq_dataset_name,
             bq_output_table_name=bq_output_table_name,
             bq_location=bq_location,
             store_metadata=store_metadata,
-            csv_delimiter=csv_delimiter)
+            csv_delimiter=csv_delimiter,
+            row_hash=row_hash,
+            reuse_bulk_jobs=reuse_bulk_jobs,
+            api_governor=api_governor,
+            low_priority=low_priority,
+            local_sink_path=local_sink_path,
+            change_log=change_log,
+            force_full_reload=force_full_reload,
+            run_stats=run_stats,
+            column_group_size=column_group_size,
+            reconcile=reconcile,
+            backfill_new_fields=backfill_new_fields,
+            blob_location=blob_location,
+            cdc=cdc)
+    except ReplicationDeferredError:
+        raise
     except:
+        if run_stats:
+            run_stats.finish(STATUS_FAILED)
         logging.exception(
             "Fatal error when trying to replicate %s:", api_name)
         raise
+    if not replication and run_stats:
+        run_stats.finish(STATUS_SUCCEEDED)
+    return replication
+
+
+def _complete_object_replication(replication: "SubmittedReplication",
+                                 run_stats: ReplicationRunStats):
+    threading.current_thread().name = f"SFDC: `{replication.api_name}`"
+    try:
+        replication.complete()
+    except:
+        run_stats.finish(STATUS_FAILED)
+        logging.exception(
+            "Fatal error when trying to replicate %s:", replication.api_name)
+        raise
+    run_stats.finish(STATUS_SUCCEEDED)
+
+
+def _run_object_plan(sfdc_auth_parameters: typing.Union[str, typing.Dict[str, str]],
+                     api_name: str,
+                     bq_project_id: str,
+                     bq_dataset_name: str,
+                     bq_location: str = "US",
+                     row_hash: bool = False,
+                     local_sink_path: typing.Optional[str] = None,
+                     change_log: bool = False,
+                     force_full_reload: bool = False,
+                     column_group_size: typing.Optional[int] = None,
+                     blob_location: typing.Optional[str] = None,
+                     cdc: bool = False) -> ReplicationPlan:
+    threading.current_thread().name = f"SFDC: `{api_name}`"
+    try:
+        return plan_sfdc_object_replication(
+            sfdc_auth_parameters=sfdc_auth_parameters, api_name=api_name,
+            bq_project_id=bq_project_id, bq_dataset_name=bq_dataset_name,
+            bq_location=bq_location, row_hash=row_hash,
+            local_sink_path=local_sink_path, change_log=change_log,
+            force_full_reload=force_full_reload,
+            column_group_size=column_group_size,
+            blob_location=blob_location, cdc=cdc)
+    except:
+        logging.exception(
+            "Fatal error when trying to plan replication of %s:", api_name)
+        raise
+
+
+def _plan(sfdc_auth_parameters: str,
+          sfdc_objects: typing.List[str],
+          bq_project_id: str,
+          bq_dataset_name: str,
+          bq_location: str,
+          thread_num: int,
+          row_hash: bool = False,
+          local_sink_path: typing.Optional[str] = None,
+          change_log: bool = False,
+          force_full_reload: bool = False,
+          column_group_size: typing.Optional[int] = None,
+          blob_location: typing.Optional[str] = None,
+          cdc: bool = False) -> int:
+    """Estimates replication of SFDC objects and prints the plan."""
+    pool = futures.ThreadPoolExecutor(thread_num)
+    logging.info(f"Planning replication of {len(sfdc_objects)} SFDC object(s).")
+    plan_futures = [pool.submit(_run_object_plan,
+                                sfdc_auth_parameters=sfdc_auth_parameters,
+                                api_name=obj, bq_project_id=bq_project_id,
+                                bq_dataset_name=bq_dataset_name,
+                                bq_location=bq_location,
+                                row_hash=row_hash,
+                                local_sink_path=local_sink_path,
+                                change_log=change_log,
+                                force_full_reload=force_full_reload,
+                                column_group_size=column_group_size,
+                                blob_location=blob_location, cdc=cdc)
+                    for obj in sfdc_objects]
+    plans = []
+    err = 0
+    # Keeping the order of objects.
+    for f in plan_futures:
+        try:
+            plans.append(f.result())
+        except Exception:
+            err += 1
+    if plans:
+        print(format_plans(plans))
+    if err > 0:
+        logging.warning("%d object replication plan(s) failed.", err)
+    return err
+
+
+def _report(run_history: str,
+            sfdc_objects: typing.List[str],
+            bq_project_id: str,
+            bq_dataset_name: str,
+            bq_location: str,
+            days: int,
+            threshold: float) -> int:
+    """Prints replication run trends and regressions.
+
+    Returns:
+        int: exit code, 1 if any regressions were detected, otherwise 0.
+    """
+    store = open_run_history(run_history, bq_project_id, bq_dataset_name,
+                             bq_location)
+    since = (datetime.datetime.now(datetime.timezone.utc) -
+             datetime.timedelta(days=days))
+    runs = store.fetch_runs(since, sfdc_objects)
+    if not runs:
+        logging.warning("No replication runs in the last %d day(s).", days)
+        return 0
+    regressions = find_regressions(runs, threshold)
+    print(format_report(runs, regressions))
+    if regressions:
+        logging.warning("%d replication regression(s) detected.",
+                        len(regressions))
+        # Exit codes wrap at 256, so the count is only logged.
+        return 1
+    return 0
 
 
 def main(args: typing.Sequence[str]) -> int:
@@ -135,6 +346,170 @@ def main(args: typing.Sequence[str]) -> int:
         choices=["COMMA", "TAB", "PIPE", "SEMICOLON", "BACKQUOTE", "CARET"],
         default="COMMA"
     )
+    parser.add_argument(
+        "--row-hash",
+        help=("Keep a hash of replicated fields in every row, "
+              "and skip rows with unchanged content when merging."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--reuse-sfdc-jobs",
+        help=("Persist SFDC Bulk API jobs and reuse their results "
+              "if a replication fails after the job was submitted."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--low-priority-objects",
+        help=("Comma-separated list of objects to defer "
+              "when SFDC API budget is low."),
+        type=str,
+        required=False,
+        default=""
+    )
+    parser.add_argument(
+        "--sfdc-api-reserve",
+        help=("Fraction of SFDC daily API and Bulk API result limits "
+              "to leave for other integrations. 0.1 by default."),
+        type=float,
+        required=False,
+        default=0.1
+    )
+    parser.add_argument(
+        "--local-sink-path",
+        help=("Replicate to local Parquet files in this directory "
+              "instead of BigQuery (requires duckdb package)."),
+        type=str,
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--profile",
+        help=("Profile replication threads and write collapsed stacks "
+              "and CPU/wait time summary per stage at exit."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--profile-output",
+        help=("Path prefix of profile files (.collapsed and .txt). "
+              "'sfdc2bq_profile' by default."),
+        type=str,
+        required=False,
+        default="sfdc2bq_profile"
+    )
+    parser.add_argument(
+        "--change-log",
+        help=("Append replicated rows, including deleted ones, to "
+              "TABLE_changelog partitioned by replication time, "
+              "and expose the current state as view TABLE."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--force-full-reload",
+        help=("Replicate all records of every object "
+              "replacing existing tables. With --change-log, "
+              "records missing in SFDC are appended as deleted."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--run-history",
+        help=("Record every replication run to the run history: "
+              "'bigquery' for _sfdc_replication_runs table in the dataset, "
+              "or a path to a local SQLite file. Costs of BigQuery jobs "
+              "by object, stage and merge strategy go to "
+              "_sfdc_replication_costs table."),
+        type=str,
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--report",
+        help=("Print replication trends from the run history "
+              "and flag regressed objects, without replicating."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--report-days",
+        help="Number of days of run history to report. 30 by default.",
+        type=int,
+        required=False,
+        default=30
+    )
+    parser.add_argument(
+        "--report-threshold",
+        help=("Relative change of duration or throughput compared to "
+              "the median of previous runs that counts as a regression. "
+              "0.5 by default."),
+        type=float,
+        required=False,
+        default=0.5
+    )
+    parser.add_argument(
+        "--column-group-size",
+        help=("Maximum number of fields per SFDC Bulk API job. "
+              "Wider objects are extracted by concurrent jobs of column groups "
+              "joined on Id. Objects which query exceeds SOQL length limit "
+              "are always split."),
+        type=int,
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--reconcile",
+        help=("Compare record counts and newest modification timestamps "
+              "by CreatedDate month between SFDC and BigQuery, "
+              "and re-replicate only months that differ."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--backfill-new-fields",
+        help=("Backfill fields that are new to existing BigQuery tables "
+              "with SFDC jobs extracting only Id and the new fields."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--blob-location",
+        help=("Cloud Storage location (gs://bucket/prefix) or local "
+              "directory to store contents of base64 fields in. "
+              "BigQuery tables get {field}_BlobUri columns instead."),
+        type=str,
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--cdc",
+        help=("Write replicated rows directly to the destination table "
+              "declaring Id as its primary key, as upserts and deletes "
+              "with BigQuery Storage Write API CDC, "
+              "instead of merging a temporary table. "
+              "Requires google-cloud-bigquery-storage package."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--plan",
+        help=("Dry-run mode. Only estimate replication volume "
+              "and strategy per object, without extracting data."),
+        action="store_true",
+        default=False,
+        required=False,
+    )
 
     options, _ = parser.parse_known_args(args)
 
@@ -149,18 +524,7 @@ def main(args: typing.Sequence[str]) -> int:
     if project == "<PROJECT-ID>":
         project = ""
     if project == "":
-        gcloud_result = subprocess.run(("gcloud config list --format "
-                                        "'value(core.project)'"),
-                                       stdout=subprocess.PIPE,
-                                       shell=True,
-                                       check=False)
-        if (gcloud_result and gcloud_result.stdout
-                and gcloud_result.returncode == 0):
-            project_candidate = gcloud_result.stdout.decode("utf-8").strip()
-            if " " not in project_candidate:
-                project = project_candidate
-
-    options, _ = parser.parse_known_args(args)
+        project = _get_default_project()
 
     threading.current_thread().name = "cli"
     _initialize_console_logging(options.debug, logging.INFO)
@@ -173,6 +537,9 @@ def main(args: typing.Sequence[str]) -> int:
     store_metadata = (options.store_sfdc_metadata.lower() == "true")
 
     csv_delimiter = options.sfdc_csv_delimiter
+    low_priority_objects = [i.strip().lower()
+                            for i in options.low_priority_objects.split(",")
+                            if i.strip()]
 
     # Handle multi-task runs
     if task_count > 1:
@@ -191,43 +558,138 @@ def main(args: typing.Sequence[str]) -> int:
                            for i in range(task_count)]
             sfdc_objects = split_lists[task_index]
 
-    threads = []
-    pool = futures.ThreadPoolExecutor(
-        PARALLEL_EXECUTION_THREAD_NUM if task_count <= 1 else 1)
+    thread_num = PARALLEL_EXECUTION_THREAD_NUM if task_count <= 1 else 1
+
+    if options.plan:
+        return _plan(auth_secret, sfdc_objects, project, dataset, location,
+                     thread_num,
+                     row_hash=options.row_hash,
+                     local_sink_path=options.local_sink_path or None,
+                     change_log=options.change_log,
+                     force_full_reload=options.force_full_reload,
+                     column_group_size=options.column_group_size,
+                     blob_location=options.blob_location,
+                     cdc=options.cdc)
+    if options.report:
+        if not options.run_history:
+            logging.error("--report requires --run-history.")
+            return 1
+        return _report(options.run_history, sfdc_objects, project, dataset,
+                       location, options.report_days,
+                       options.report_threshold)
+
+    run_history = (open_run_history(options.run_history, project, dataset,
+                                    location)
+                   if options.run_history else None)
+
+    profiler = SamplingProfiler() if options.profile else None
+    if profiler:
+        profiler.start()
+
+    # Download and load workers.
+    pool = futures.ThreadPoolExecutor(thread_num)
+    api_governor = ApiLimitGovernor(max_concurrency=thread_num,
+                                    reserve_ratio=options.sfdc_api_reserve)
 
     logging.info(
         f"Starting replication of {len(sfdc_objects)} SFDC object(s).")
     start_time = datetime.datetime.now(datetime.timezone.utc)
 
     err = 0
+    deferred = 0
+    run_stats: typing.List[ReplicationRunStats] = []
+    # SFDC jobs of all objects are submitted first,
+    # so they run in SFDC regardless of the number of workers.
+    submitted: typing.List[typing.Tuple["SubmittedReplication",
+                                        ReplicationRunStats]] = []
     for obj in sfdc_objects:
+        stats = ReplicationRunStats(obj)
+        run_stats.append(stats)
         try:
-            threads.append(
-                pool.submit(_run_object_replication,
-                            sfdc_auth_parameters=auth_secret, api_name=obj,
-                            bq_project_id=project, bq_dataset_name=dataset,
-                            bq_location=location,
-                            store_metadata=store_metadata,
-                            csv_delimiter=csv_delimiter))
+            replication = _submit_object_replication(
+                sfdc_auth_parameters=auth_secret, api_name=obj,
+                bq_project_id=project, bq_dataset_name=dataset,
+                bq_location=location,
+                store_metadata=store_metadata,
+                csv_delimiter=csv_delimiter,
+                row_hash=options.row_hash,
+                reuse_bulk_jobs=options.reuse_sfdc_jobs,
+                api_governor=api_governor,
+                low_priority=obj.lower() in low_priority_objects,
+                local_sink_path=options.local_sink_path or None,
+                change_log=options.change_log,
+                force_full_reload=options.force_full_reload,
+                run_stats=stats,
+                column_group_size=options.column_group_size,
+                reconcile=options.reconcile,
+                backfill_new_fields=options.backfill_new_fields,
+                blob_location=options.blob_location,
+                cdc=options.cdc)
+        except ReplicationDeferredError:
+            deferred += 1
+            continue
         except Exception:
-            logging.exception("Fatal error when trying to replicate %s:", obj)
             err += 1
-    if len(threads) > 0:
-        for f in futures.as_completed(threads):
+            record_run(run_history, stats)
+            continue
+        if replication:
+            submitted.append((replication, stats))
+        else:
+            record_run(run_history, stats)
+    threading.current_thread().name = "cli"
+
+    # Jobs are polled together. Replications which jobs completed
+    # are handed to workers in the order of completion.
+    load_futures: typing.Dict[futures.Future, ReplicationRunStats] = {}
+    while submitted:
+        running = []
+        for replication, stats in submitted:
             try:
-                f.result()
+                if replication.poll():
+                    load_futures[pool.submit(_complete_object_replication,
+                                             replication, stats)] = stats
+                else:
+                    running.append((replication, stats))
             except Exception:
+                stats.finish(STATUS_FAILED)
+                logging.exception("Fatal error when trying to replicate %s:",
+                                  replication.api_name)
                 err += 1
+                record_run(run_history, stats)
+        submitted = running
+        if submitted:
+            time.sleep(api_governor.job_status_interval())
+
+    for f in futures.as_completed(load_futures):
+        try:
+            f.result()
+        except Exception:
+            err += 1
+        record_run(run_history, load_futures[f])
+
+    if profiler:
+        profiler.stop()
+        profiler.write_reports(options.profile_output)
+
+    cost_summary = format_cost_summary(run_stats)
+    if cost_summary:
+        logging.info("BigQuery job costs:\n%s", cost_summary)
 
     end_time = datetime.datetime.now(datetime.timezone.utc)
     delta = (end_time - start_time).total_seconds()
 
+    if deferred > 0:
+        logging.warning("%d object replication(s) deferred.", deferred)
     if err > 0:
-        ok_reps = len(sfdc_objects) - err
+        ok_reps = len(sfdc_objects) - err - deferred
         logging.warning("%d object replication(s) failed.", err)
         logging.info(
             "%d object replication(s) to `%s.%s` completed successfully in %f seconds.",
             ok_reps, project, dataset, delta)
+    elif deferred > 0:
+        logging.info(
+            "%d object replication(s) to `%s.%s` completed successfully in %f seconds.",
+            len(sfdc_objects) - deferred, project, dataset, delta)
     else:
         logging.info(
             "All %d object replication(s) to `%s.%s` completed successfully in %f seconds.",
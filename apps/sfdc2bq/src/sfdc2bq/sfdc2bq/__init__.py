@@ -17,18 +17,35 @@ import os
 import sys
 import typing
 
-from google.cloud import bigquery
-from simple_salesforce import Salesforce  # type: ignore
+from .api_limit_governor import ApiLimitGovernor, ReplicationDeferredError  # pylint:disable=wrong-import-position
+from .blob_store import BlobStore  # pylint:disable=wrong-import-position
+from .replication_plan import ReplicationPlan  # pylint:disable=wrong-import-position
+from .run_history import ReplicationRunStats, RunHistoryStore  # pylint:disable=wrong-import-position
 
-from .salesforce_to_bigquery import SalesforceToBigquery  # pylint:disable=wrong-import-position
+# BigQuery and Salesforce client libraries take a while to import,
+# so they are only imported when replication or planning starts.
+if typing.TYPE_CHECKING:
+    from google.cloud import bigquery
+    from simple_salesforce import Salesforce  # type: ignore
+    from .salesforce_to_bigquery import (SalesforceToBigquery,
+                                         SubmittedReplication)
 
 sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 
 
+def __getattr__(name: str) -> typing.Any:
+    """Imports SalesforceToBigquery and SubmittedReplication
+    on first access."""
+    if name in ["SalesforceToBigquery", "SubmittedReplication"]:
+        from . import salesforce_to_bigquery  # pylint:disable=import-outside-toplevel
+        return getattr(salesforce_to_bigquery, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def sfdc2bq_replicate(
-        simple_sf_connection: Salesforce,
+        simple_sf_connection: "Salesforce",
         api_name: str,
-        bq_client: bigquery.Client,
+        bq_client: "bigquery.Client",
         project_id: str,
         dataset_name: str,
         output_table_name: typing.Optional[str] = None,
@@ -37,7 +54,20 @@ def sfdc2bq_replicate(
                                                   typing.Iterable[str]] = False,
         exclude_standard_fields: typing.Optional[typing.Iterable[str]] = None,
         store_metadata: bool = False,
-        csv_delimiter: str = "COMMA") -> None:
+        csv_delimiter: str = "COMMA",
+        row_hash: bool = False,
+        reuse_bulk_jobs: bool = False,
+        api_governor: typing.Optional[ApiLimitGovernor] = None,
+        low_priority: bool = False,
+        local_sink_path: typing.Optional[str] = None,
+        change_log: bool = False,
+        force_full_reload: bool = False,
+        run_stats: typing.Optional[ReplicationRunStats] = None,
+        column_group_size: typing.Optional[int] = None,
+        reconcile: bool = False,
+        backfill_new_fields: bool = False,
+        blob_store: typing.Optional[BlobStore] = None,
+        cdc: bool = False) -> None:
     """Method to extract data from Salesforce to BigQuery
 
     Args:
@@ -57,7 +87,50 @@ def sfdc2bq_replicate(
         csv_delimiter (str, optional): The column delimiter used for CSV when
                                        exporting from Salesforce and loading
                                        to BigQuery. Defaults to "COMMA".
+        row_hash (bool, optional): Whether to skip rows with unchanged
+                                   content when merging. Defaults to False.
+        reuse_bulk_jobs (bool, optional): Whether to reuse results of SFDC
+                                          Bulk API jobs of failed replications
+                                          with identical queries. Defaults to False.
+        api_governor (ApiLimitGovernor, optional): SFDC API limits governor
+                                                   shared by concurrent
+                                                   replications. Defaults to None.
+        low_priority (bool, optional): Whether the replication may be deferred
+                                       when SFDC API budget is low.
+                                       Defaults to False.
+        local_sink_path (str, optional): Directory to replicate to as local
+                                         Parquet files instead of BigQuery.
+                                         Defaults to None.
+        change_log (bool, optional): Whether to append replicated rows to
+                                     a change log table and expose the current
+                                     state as a view. Defaults to False.
+        force_full_reload (bool, optional): Whether to replicate all records
+                                            replacing the existing table.
+                                            Defaults to False.
+        run_stats (ReplicationRunStats, optional): Run statistics to fill in
+                                                    for the run history.
+                                                    Defaults to None.
+        column_group_size (int, optional): Maximum number of fields
+            extracted by one SFDC Bulk API job. Objects with more fields
+            are split into column groups extracted concurrently.
+            Defaults to None.
+        reconcile (bool, optional): Whether to replace only CreatedDate
+            months of the destination table that differ from SFDC
+            instead of replicating changed records. Defaults to False.
+        backfill_new_fields (bool, optional): Whether to backfill fields
+            missing in the existing destination table for all records
+            with a Bulk API job extracting only Id and these fields.
+            Defaults to False.
+        blob_store (BlobStore, optional): Store to offload contents
+            of base64 fields to. Defaults to None.
+        cdc (bool, optional): Whether to write replicated rows directly
+            to the destination table with Id primary key
+            as BigQuery CDC upserts and deletes
+            instead of merging a temporary table.
+            Requires google-cloud-bigquery-storage package.
+            Defaults to False.
     """
+    from .salesforce_to_bigquery import SalesforceToBigquery  # pylint:disable=import-outside-toplevel,redefined-outer-name
 
     SalesforceToBigquery.replicate(
         simple_sf_connection=simple_sf_connection,
@@ -70,4 +143,141 @@ def sfdc2bq_replicate(
         include_non_standard_fields=include_non_standard_fields,
         exclude_standard_fields=exclude_standard_fields,
         store_metadata=store_metadata,
-        csv_delimiter=csv_delimiter)
+        csv_delimiter=csv_delimiter,
+        row_hash=row_hash,
+        reuse_bulk_jobs=reuse_bulk_jobs,
+        api_governor=api_governor,
+        low_priority=low_priority,
+        local_sink_path=local_sink_path,
+        change_log=change_log,
+        force_full_reload=force_full_reload,
+        run_stats=run_stats,
+        column_group_size=column_group_size,
+        reconcile=reconcile,
+        backfill_new_fields=backfill_new_fields,
+        blob_store=blob_store,
+        cdc=cdc)
+
+
+def sfdc2bq_submit(
+        simple_sf_connection: "Salesforce",
+        api_name: str,
+        bq_client: "bigquery.Client",
+        project_id: str,
+        dataset_name: str,
+        output_table_name: typing.Optional[str] = None,
+        text_encoding: str = "utf-8",
+        include_non_standard_fields: typing.Union[bool,
+                                                  typing.Iterable[str]] = False,
+        exclude_standard_fields: typing.Optional[typing.Iterable[str]] = None,
+        store_metadata: bool = False,
+        csv_delimiter: str = "COMMA",
+        row_hash: bool = False,
+        reuse_bulk_jobs: bool = False,
+        api_governor: typing.Optional[ApiLimitGovernor] = None,
+        low_priority: bool = False,
+        local_sink_path: typing.Optional[str] = None,
+        change_log: bool = False,
+        force_full_reload: bool = False,
+        run_stats: typing.Optional[ReplicationRunStats] = None,
+        column_group_size: typing.Optional[int] = None,
+        reconcile: bool = False,
+        backfill_new_fields: bool = False,
+        blob_store: typing.Optional[BlobStore] = None,
+        cdc: bool = False) -> typing.Optional["SubmittedReplication"]:
+    """Method to prepare Salesforce to BigQuery replication
+    and submit its SFDC Bulk API jobs without waiting for them.
+
+    Args:
+        See sfdc2bq_replicate.
+
+    Returns:
+        SubmittedReplication: replication to poll and complete,
+            or None if the destination is in sync with SFDC.
+    """
+    from .salesforce_to_bigquery import SalesforceToBigquery  # pylint:disable=import-outside-toplevel,redefined-outer-name
+
+    return SalesforceToBigquery.submit(
+        simple_sf_connection=simple_sf_connection,
+        api_name=api_name,
+        bq_client=bq_client,
+        project_id=project_id,
+        dataset_name=dataset_name,
+        output_table_name=output_table_name,
+        text_encoding=text_encoding,
+        include_non_standard_fields=include_non_standard_fields,
+        exclude_standard_fields=exclude_standard_fields,
+        store_metadata=store_metadata,
+        csv_delimiter=csv_delimiter,
+        row_hash=row_hash,
+        reuse_bulk_jobs=reuse_bulk_jobs,
+        api_governor=api_governor,
+        low_priority=low_priority,
+        local_sink_path=local_sink_path,
+        change_log=change_log,
+        force_full_reload=force_full_reload,
+        run_stats=run_stats,
+        column_group_size=column_group_size,
+        reconcile=reconcile,
+        backfill_new_fields=backfill_new_fields,
+        blob_store=blob_store,
+        cdc=cdc)
+
+
+def sfdc2bq_plan(
+        simple_sf_connection: "Salesforce",
+        api_name: str,
+        bq_client: "bigquery.Client",
+        project_id: str,
+        dataset_name: str,
+        output_table_name: typing.Optional[str] = None,
+        include_non_standard_fields: typing.Union[bool,
+                                                  typing.Iterable[str]] = False,
+        exclude_standard_fields: typing.Optional[typing.Iterable[str]] = None,
+        row_hash: bool = False,
+        local_sink_path: typing.Optional[str] = None,
+        change_log: bool = False,
+        force_full_reload: bool = False,
+        column_group_size: typing.Optional[int] = None,
+        blob_store: typing.Optional[BlobStore] = None,
+        cdc: bool = False
+) -> ReplicationPlan:
+    """Method to estimate Salesforce to BigQuery replication
+    without extracting data.
+
+    Args:
+        simple_sf_connection (Salesforce): Simple Salesforce connection
+        api_name (str): Salesforce object name to replicate
+        bq_client (bigquery.Client): BigQuery client
+        project_id (str): destination GCP project id
+        dataset_name (str): destination dataset name
+        output_table_name (str, optional): destination table
+        include_non_standard_fields (bool, Iterable[str]|): whether to replicate
+            non-standard fields, True/False or a list of names
+        exclude_standard_fields (Iterable[str]): list of standard fields
+            to exclude from replication
+        row_hash, local_sink_path, change_log, force_full_reload,
+        column_group_size, blob_store, cdc: replication options
+            to plan for, see sfdc2bq_replicate.
+
+    Returns:
+        ReplicationPlan: replication plan.
+    """
+    from .salesforce_to_bigquery import SalesforceToBigquery  # pylint:disable=import-outside-toplevel,redefined-outer-name
+
+    return SalesforceToBigquery.plan(
+        simple_sf_connection=simple_sf_connection,
+        api_name=api_name,
+        bq_client=bq_client,
+        project_id=project_id,
+        dataset_name=dataset_name,
+        output_table_name=output_table_name,
+        include_non_standard_fields=include_non_standard_fields,
+        exclude_standard_fields=exclude_standard_fields,
+        row_hash=row_hash,
+        local_sink_path=local_sink_path,
+        change_log=change_log,
+        force_full_reload=force_full_reload,
+        column_group_size=column_group_size,
+        blob_store=blob_store,
+        cdc=cdc)
@@ -0,0 +1,196 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Salesforce API limits governor for concurrent replications.  """
+
+import contextlib
+import logging
+import math
+import threading
+import time
+import typing
+
+
+class ReplicationDeferredError(RuntimeError):
+    """Replication was deferred because of low SFDC API budget."""
+
+
+class ApiLimitGovernor:
+    """Tracks remaining Salesforce API calls and Bulk API result storage
+    shared by all replications of the org, and derives how many
+    replications may run concurrently and how often jobs are polled.
+
+    The budget is a fraction of daily limits remaining.
+    The governor keeps `reserve_ratio` of daily limits untouched
+    for other integrations. When the remaining budget goes below twice
+    the reserve, concurrency and polling frequency are reduced,
+    and low-priority objects are deferred.
+    """
+
+    _LIMITS_REFRESH_INTERVAL_ = 60.0
+    _MAX_POLL_INTERVAL_ = 60.0
+    _API_LIMIT_NAME_ = "DailyApiRequests"
+    _BULK_RESULTS_LIMIT_NAME_ = "DailyBulkV2QueryFileStorageMB"
+
+    def __init__(self,
+                 max_concurrency: int,
+                 reserve_ratio: float = 0.1,
+                 job_status_interval: float = 10.0):
+        """ApiLimitGovernor constructor.
+
+        Args:
+            max_concurrency (int): Maximum number of replications
+                downloading and loading results concurrently.
+            reserve_ratio (float, optional): Fraction of daily API limits
+                to leave for other integrations. Defaults to 0.1.
+            job_status_interval (float, optional): Job status polling interval
+                in seconds when the budget is not low. Defaults to 10.0.
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.reserve_ratio = reserve_ratio
+        self.base_job_status_interval = job_status_interval
+
+        self._lock = threading.Condition()
+        self._active = 0
+        self._last_refresh = 0.0
+        self._api_remaining: typing.Optional[int] = None
+        self._api_max: typing.Optional[int] = None
+        self._bulk_remaining_bytes: typing.Optional[int] = None
+        self._bulk_max_bytes: typing.Optional[int] = None
+
+    def refresh_limits(self, sfdc_connection: typing.Any,
+                       force: bool = False):
+        """Retrieves org limits using /limits endpoint
+        if they weren't retrieved recently.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection.
+            force (bool, optional): Refresh regardless of the last refresh
+                time. Defaults to False.
+        """
+        with self._lock:
+            if (not force and time.monotonic() - self._last_refresh <
+                    ApiLimitGovernor._LIMITS_REFRESH_INTERVAL_):
+                return
+            self._last_refresh = time.monotonic()
+        try:
+            limits = sfdc_connection.limits()
+        except Exception:  # pylint:disable=broad-except
+            logging.warning("⚠️ Cannot retrieve SFDC org limits.",
+                            exc_info=True)
+            return
+        api_limit = limits.get(ApiLimitGovernor._API_LIMIT_NAME_, {})
+        bulk_limit = limits.get(ApiLimitGovernor._BULK_RESULTS_LIMIT_NAME_, {})
+        with self._lock:
+            if "Max" in api_limit:
+                self._api_max = api_limit["Max"]
+                self._api_remaining = api_limit["Remaining"]
+            if "Max" in bulk_limit:
+                self._bulk_max_bytes = bulk_limit["Max"] * 1024 * 1024
+                self._bulk_remaining_bytes = (bulk_limit["Remaining"] *
+                                              1024 * 1024)
+            self._lock.notify_all()
+        logging.info("SFDC API budget: %.1f%% remaining.",
+                     self.budget_ratio() * 100)
+
+    def update_from_connection(self, sfdc_connection: typing.Any):
+        """Updates remaining API calls from Sforce-Limit-Info header
+        of the last response received by the connection.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection.
+        """
+        usage = getattr(sfdc_connection, "api_usage", {}).get("api-usage")
+        if not usage:
+            return
+        with self._lock:
+            self._api_max = usage.total
+            self._api_remaining = usage.total - usage.used
+            self._lock.notify_all()
+
+    def record_result_bytes(self, num_bytes: int):
+        """Accounts for Bulk API results downloaded since the last refresh.
+
+        Args:
+            num_bytes (int): number of downloaded bytes.
+        """
+        with self._lock:
+            if self._bulk_remaining_bytes is not None:
+                self._bulk_remaining_bytes = max(
+                    self._bulk_remaining_bytes - num_bytes, 0)
+
+    def budget_ratio(self) -> float:
+        """Fraction of daily limits remaining (the lowest of API calls
+        and Bulk API results). 1.0 if limits are unknown."""
+        with self._lock:
+            ratios = [1.0]
+            if self._api_max:
+                ratios.append(self._api_remaining / self._api_max)  # type: ignore
+            if self._bulk_max_bytes:
+                ratios.append(self._bulk_remaining_bytes /  # type: ignore
+                              self._bulk_max_bytes)
+            return min(ratios)
+
+    def _available_ratio(self) -> float:
+        """How much of the budget above the reserve is left,
+        relative to the reserve. 1.0 and above means the budget isn't low."""
+        if self.reserve_ratio <= 0:
+            return 1.0
+        return (self.budget_ratio() - self.reserve_ratio) / self.reserve_ratio
+
+    def is_budget_low(self) -> bool:
+        """Whether the remaining budget is below twice the reserve."""
+        return self._available_ratio() < 1.0
+
+    def concurrency(self) -> int:
+        """Number of replications allowed to run concurrently."""
+        available = self._available_ratio()
+        if available >= 1.0:
+            return self.max_concurrency
+        return max(1, math.floor(self.max_concurrency * max(available, 0.0)))
+
+    def job_status_interval(self) -> float:
+        """Job status polling interval in seconds."""
+        available = self._available_ratio()
+        if available >= 1.0:
+            return self.base_job_status_interval
+        return min(self.base_job_status_interval / max(available, 0.01),
+                   max(ApiLimitGovernor._MAX_POLL_INTERVAL_,
+                       self.base_job_status_interval))
+
+    def should_defer(self, low_priority: bool) -> bool:
+        """Whether a replication should be deferred.
+
+        Args:
+            low_priority (bool): Whether the replicated object
+                is low-priority.
+
+        Returns:
+            bool: True if the replication should be deferred.
+        """
+        return low_priority and self.is_budget_low()
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Context manager that waits until the replication is allowed
+        to download and load results concurrently with others."""
+        with self._lock:
+            while self._active >= self.concurrency():
+                self._lock.wait(self.job_status_interval())
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._lock.notify_all()
@@ -16,18 +16,50 @@
 from datetime import datetime, timezone, timedelta
 import logging
 from pathlib import Path
+import re
+import time
 import typing
 
-from google.cloud.exceptions import NotFound, GoogleCloudError
+from google.api_core.exceptions import ServerError, TooManyRequests
+from google.cloud.exceptions import (BadRequest, Conflict, NotFound,
+                                     GoogleCloudError)
 from google.cloud import bigquery
+import requests
 
+from .job_costs import (JOB_STAGE_BACKFILL, JOB_STAGE_BULK_JOBS,
+                        JOB_STAGE_INSPECT, JOB_STAGE_JOIN, JOB_STAGE_LOAD,
+                        JOB_STAGE_MERGE, JOB_STAGE_WATERMARK,
+                        STRATEGY_CHANGE_LOG, STRATEGY_MERGE, STRATEGY_PROMOTE,
+                        STRATEGY_REPLACE, STRATEGY_TRANSACTION, JobCostLedger)
+from .reconciliation import BucketSummary, CreatedRange, MonthBucket
+from .replication_sink import ReplicationSink, StagedModstamps
 
-class BigQueryHelper:
+
+class BigQueryHelper(ReplicationSink):
     """BigQuery-specific operations of SFDC ingestion"""
 
     _TEMP_TABLE_EXPIRATION_DAYS_ = 1
     _JOB_LABEL_KEY = "requestor"
     _JOB_LABEL_VALUE = "sfdc2bq"
+    _BULK_JOBS_TABLE_ = "_sfdc_bulk_jobs"
+    # Rows with unchanged row hashes keep their Recordstamp,
+    # so the last job timestamp of row hash tables is kept here too.
+    _WATERMARKS_TABLE_ = "_sfdc_watermarks"
+    _CHANGE_LOG_TABLE_SUFFIX_ = "_changelog"
+    supports_column_groups = True
+    supports_reconciliation = True
+    supports_column_backfill = True
+    # Staging table name suffix of column backfills.
+    _BACKFILL_STAGING_NAME_ = "backfill"
+    # Staged deltas up to these sizes are merged with a single MERGE
+    # statement at interactive priority. Larger ones are merged
+    # with a transaction at batch priority.
+    _SMALL_DELTA_MAX_ROWS_ = 10000
+    _SMALL_DELTA_MAX_BYTES_ = 64 * 1024 * 1024
+    # Loading a batch is retried with exponential backoff
+    # starting from _LOAD_RETRY_DELAY_ seconds.
+    _MAX_LOAD_ATTEMPTS_ = 5
+    _LOAD_RETRY_DELAY_ = 5.0
 
     def __init__(
         self,
@@ -42,6 +74,11 @@ class BigQueryHelper:
         bigquery_client: typing.Optional[bigquery.Client] = None,
         csv_delimiter: str = ",",
         text_encoding: str = "utf-8",
+        row_hash_field_name: typing.Optional[str] = None,
+        row_hash_exclude_fields: typing.Optional[typing.Iterable[str]] = None,
+        change_log: bool = False,
+        force_full_reload: bool = False,
+        job_costs: typing.Optional[JobCostLedger] = None,
     ):
         """BigQueryHelper constructor.
 
@@ -60,44 +97,295 @@ class BigQueryHelper:
                                            loading to BigQuery.
                                            Defaults to ",".
             text_encoding (str, optional): CSV text encoding. Defaults to "utf-8"
+            row_hash_field_name (str, optional): Name of the row hash field.
+                If specified, the destination table keeps a hash of every row,
+                and merging skips rows with unchanged content.
+                Defaults to None.
+            row_hash_exclude_fields (typing.Iterable[str], optional): Fields
+                to exclude from the row hash, such as SystemModstamp.
+                Defaults to None.
+            change_log (bool, optional): Whether to append replicated rows,
+                including deleted ones, to a change log table
+                `{target_table_name}_changelog` partitioned by the job
+                timestamp, and expose the current state as view
+                `{target_table_name}` instead of merging into a table.
+                Defaults to False.
+            force_full_reload (bool, optional): Whether to perform
+                full ingestion replacing the existing destination table.
+                In change log mode, records missing from the full
+                extraction are appended as deleted. Defaults to False.
+            job_costs (JobCostLedger, optional): Ledger to record
+                costs of BigQuery jobs to. Defaults to a new ledger.
+
+        Raises:
+            RuntimeError: thrown in change log mode
+                if the destination is a table, or if full reload
+                is forced for an object without IsDeleted field.
         """
+        super().__init__(target_table_name, job_timestamp, job_costs)
         self.client = bigquery_client if bigquery_client else bigquery.Client()
         self.project_id = project_id
         self.dataset_name = dataset_name
-        self.target_table_name = target_table_name
         self.schema = []
         self.job_config: typing.Optional[bigquery.LoadJobConfig] = None
-        self.last_job_timestamp: typing.Optional[datetime] = None
         self.csv_delimiter = csv_delimiter
         self.text_encoding = text_encoding.upper()
 
         self._ingestion_started = False
+        # Whether the temporary table of a resumed job was kept,
+        # so batches loaded by that job don't need to be loaded again.
+        self._resumed_temp_table = False
+        # Ids of load jobs submitted by this instance.
+        self._submitted_load_jobs: typing.Set[str] = set()
+        # Creation date field and ranges replaced by reconciliation.
+        self._replaced_ranges: typing.Optional[
+            typing.Tuple[str, typing.List[CreatedRange]]] = None
 
         self.timestamp_field_name = timestamp_field_name
         self.id_field_name = id_field_name
         self.has_is_deleted = has_is_deleted
         self.has_is_archived = has_is_archived
+        self.row_hash_field_name = row_hash_field_name
+        self.row_hash_exclude_fields = [
+            f.lower() for f in (row_hash_exclude_fields or [])]
 
         self.target_table_ref = bigquery.TableReference(
             bigquery.DatasetReference(self.project_id, self.dataset_name),
             self.target_table_name,
         )
+        self.change_log = change_log
+        self.change_log_table_ref = bigquery.TableReference(
+            bigquery.DatasetReference(self.project_id, self.dataset_name),
+            (f"{self.target_table_name}"
+             f"{BigQueryHelper._CHANGE_LOG_TABLE_SUFFIX_}"),
+        )
+
+        if self.change_log:
+            if force_full_reload and not has_is_deleted:
+                raise RuntimeError(
+                    "Forced full reload in change log mode requires "
+                    "IsDeleted field to record deleted records.")
+            self._check_change_log_target()
+        self._set_job_timestamp(job_timestamp)
+        self._retrieve_last_job_timestamp()
+        if force_full_reload and self.last_job_timestamp:
+            logging.info("Forcing full reload of %s.", self.target_table_ref)
+            self.last_job_timestamp = None
+
+    def _check_change_log_target(self):
+        """Makes sure the change log mode destination is a view,
+        before anything is extracted from SFDC or created in BigQuery."""
+        try:
+            target_obj = self.client.get_table(self.target_table_ref)
+        except NotFound:
+            return
+        if target_obj.table_type != "VIEW":
+            raise RuntimeError(
+                f"Change log mode requires {self.target_table_ref} "
+                "to be a view, but it is a table.")
 
+    def _promotes_staging_table(self) -> bool:
+        """Whether full ingestion makes the temporary table
+        the destination table instead of copying rows to it."""
+        return (self.full_ingestion and not self.change_log and
+                not self.row_hash_field_name)
+
+    def _set_job_timestamp(self, job_timestamp: datetime):
         self.job_timestamp = job_timestamp
         timestamp_now = int(self.job_timestamp.timestamp() * 1e9)
-        self.temp_table_name = f"Δ_{target_table_name}_{timestamp_now}"
+        self.temp_table_name = f"Δ_{self.target_table_name}_{timestamp_now}"
 
         self.temp_table_ref = bigquery.TableReference(
             bigquery.DatasetReference(self.project_id, self.dataset_name),
             self.temp_table_name,
         )
-        self._retrieve_last_job_timestamp()
 
-    full_ingestion = property(lambda self: self.last_job_timestamp is None)
-    """ Performing full ingestion """
+    def resume_job_timestamp(self, job_timestamp: datetime):
+        """Switches ingestion to the timestamp of a previous job
+        which results are being reused.
+        Keeps the temporary table left by that job,
+        so batches it has loaded are not loaded again.
+
+        Args:
+            job_timestamp (datetime): Previous job start time.
+
+        Raises:
+            RuntimeError: thrown if the ingestion was started before.
+        """
+        if self._ingestion_started:
+            raise RuntimeError("Ingestion already started.")
+        self._set_job_timestamp(job_timestamp)
+        try:
+            _ = self.client.get_table(self.temp_table_ref)
+            self._resumed_temp_table = True
+            logging.info("Resuming ingestion to %s.", self.temp_table_ref)
+        except NotFound:
+            self._resumed_temp_table = False
+
+    def store_bulk_job(self, job_id: str, query: str):
+        """Persists SFDC Bulk API job id and query
+        along with the current job timestamp,
+        so the job results can be reused if the ingestion fails.
+
+        Args:
+            job_id (str): SFDC Bulk API job id.
+            query (str): SFDC job query.
+        """
+        jobs_table = self._bulk_jobs_table_name()
+        table = bigquery.Table(jobs_table,
+                               schema=[
+                                   bigquery.SchemaField(
+                                       "table_name", "STRING"),
+                                   bigquery.SchemaField(
+                                       "job_id", "STRING"),
+                                   bigquery.SchemaField(
+                                       "query", "STRING"),
+                                   bigquery.SchemaField(
+                                       "recordstamp", "TIMESTAMP"),
+                                   bigquery.SchemaField(
+                                       "created_at", "TIMESTAMP")
+                               ])
+        _ = self.client.create_table(table, exists_ok=True)
+        self._run_service_table_query(
+            f"""
+            INSERT INTO `{jobs_table}`
+              (table_name, job_id, query, recordstamp, created_at)
+            VALUES (@table_name, @job_id, @query, @recordstamp,
+                    CURRENT_TIMESTAMP())
+            """,
+            [
+                bigquery.ScalarQueryParameter(
+                    "job_id", "STRING", job_id),
+                bigquery.ScalarQueryParameter(
+                    "query", "STRING", query),
+                bigquery.ScalarQueryParameter(
+                    "recordstamp", "TIMESTAMP", self.job_timestamp)
+            ])
+
+    def retrieve_bulk_jobs(
+        self, max_age: timedelta
+    ) -> typing.List[typing.Tuple[str, str, datetime]]:
+        """Retrieves SFDC Bulk API jobs persisted with store_bulk_job
+        for the target table.
+
+        Args:
+            max_age (timedelta): maximum age of jobs to retrieve.
+
+        Returns:
+            typing.List[typing.Tuple[str, str, datetime]]: list of tuples
+                (job id, query, job timestamp).
+        """
+        try:
+            rows = self._run_service_table_query(
+                f"""
+                SELECT job_id, query, recordstamp
+                FROM `{self._bulk_jobs_table_name()}`
+                WHERE table_name = @table_name
+                AND created_at >= @min_created_at
+                ORDER BY created_at DESC
+                """,
+                [
+                    bigquery.ScalarQueryParameter(
+                        "min_created_at", "TIMESTAMP",
+                        datetime.now(timezone.utc) - max_age)
+                ])
+        except NotFound:
+            return []
+        return [(r[0], r[1], r[2]) for r in rows]
+
+    def clear_bulk_jobs(self):
+        """Removes SFDC Bulk API jobs of the target table
+        persisted with store_bulk_job."""
+        try:
+            self._run_service_table_query(
+                f"""
+                DELETE FROM `{self._bulk_jobs_table_name()}`
+                WHERE table_name = @table_name
+                """)
+        except NotFound:
+            pass
+
+    def _bulk_jobs_table_name(self) -> str:
+        return (f"{self.project_id}.{self.dataset_name}."
+                f"{BigQueryHelper._BULK_JOBS_TABLE_}")
+
+    def _watermarks_table_name(self) -> str:
+        return (f"{self.project_id}.{self.dataset_name}."
+                f"{BigQueryHelper._WATERMARKS_TABLE_}")
+
+    def _store_watermark(self):
+        """Stores the current job timestamp as the last job timestamp
+        of the destination table."""
+        watermarks_table = self._watermarks_table_name()
+        self.client.create_table(
+            bigquery.Table(watermarks_table,
+                           schema=[
+                               bigquery.SchemaField("table_name", "STRING"),
+                               bigquery.SchemaField(
+                                   "recordstamp", "TIMESTAMP"),
+                           ]),
+            exists_ok=True)
+        self._run_service_table_query(
+            f"""
+            MERGE INTO `{watermarks_table}` AS T
+            USING (SELECT @table_name AS table_name,
+                          @recordstamp AS recordstamp) AS S
+            ON T.table_name = S.table_name
+            WHEN MATCHED THEN UPDATE SET recordstamp = S.recordstamp
+            WHEN NOT MATCHED THEN INSERT (table_name, recordstamp)
+              VALUES (S.table_name, S.recordstamp)
+            """,
+            [
+                bigquery.ScalarQueryParameter(
+                    "recordstamp", "TIMESTAMP", self.job_timestamp)
+            ],
+            JOB_STAGE_WATERMARK)
+
+    def _retrieve_watermark(self) -> typing.Optional[datetime]:
+        """Retrieves the last job timestamp stored by _store_watermark.
 
-    incremental_ingestion = property(lambda self: not self.full_ingestion)
-    """ Performing incremental ingestion """
+        Returns:
+            typing.Optional[datetime]: last job timestamp,
+                None if it wasn't stored.
+        """
+        try:
+            rows = self._run_service_table_query(
+                f"""
+                SELECT recordstamp FROM `{self._watermarks_table_name()}`
+                WHERE table_name = @table_name
+                """,
+                stage=JOB_STAGE_WATERMARK)
+        except NotFound:
+            return None
+        return rows[0][0] if rows else None
+
+    def _run_service_table_query(
+        self,
+        query: str,
+        query_parameters: typing.Optional[
+            typing.List[bigquery.ScalarQueryParameter]] = None,
+        stage: str = JOB_STAGE_BULK_JOBS
+    ) -> typing.List[typing.Any]:
+        query_config = (self.client.default_query_job_config or
+                        bigquery.QueryJobConfig())
+        query_config.labels = query_config.labels or {}
+        query_config.labels[BigQueryHelper._JOB_LABEL_KEY] = (
+            BigQueryHelper._JOB_LABEL_VALUE
+        )
+        query_config.query_parameters = [
+            bigquery.ScalarQueryParameter(
+                "table_name", "STRING", self.target_table_name)
+        ] + (query_parameters or [])
+        # Workaround for concurrent updates error.
+        while True:
+            try:
+                query_job = self.client.query(query, job_config=query_config)
+                rows = list(query_job)
+                self._add_job_statistics(query_job, stage)
+                return rows
+            except BadRequest as ex:
+                if "Could not serialize access to table" not in ex.message:
+                    raise
 
     def start_ingestion(self, bq_fields: typing.List[typing.Tuple[str, str]]):
         """Initializes BigQuery ingestion:
@@ -142,22 +430,51 @@ class BigQueryHelper:
         # Making sure timestamp field (Recordstamp)
         # id in the schema.
         if self.timestamp_field_name.lower() not in dest_fields_lower:
-            self.schema.append(
-                bigquery.SchemaField(name=self.timestamp_field_name,
-                                     field_type="TIMESTAMP"))
+            if self._promotes_staging_table():
+                # Loaded rows get the job timestamp as a default value,
+                # so the temporary table can become the destination table
+                # without rewriting it.
+                recordstamp_str = self.job_timestamp.strftime(
+                    "%Y-%m-%dT%H:%M:%S.%fZ")
+                self.schema.append(
+                    bigquery.SchemaField(
+                        name=self.timestamp_field_name,
+                        field_type="TIMESTAMP",
+                        default_value_expression=(
+                            f"TIMESTAMP('{recordstamp_str}')")))
+            else:
+                self.schema.append(
+                    bigquery.SchemaField(name=self.timestamp_field_name,
+                                         field_type="TIMESTAMP"))
 
         table_obj = self.client.create_table(bigquery.Table(
             self.temp_table_ref, self.schema),
-            exists_ok=False)
+            exists_ok=self._resumed_temp_table)
         table_obj.expires = datetime.now(timezone.utc) + timedelta(
             days=BigQueryHelper._TEMP_TABLE_EXPIRATION_DAYS_)
         self.client.update_table(table_obj, ["expires"])
         self.temp_table_ref = table_obj.reference
 
-        self.job_config = bigquery.LoadJobConfig(
+        load_schema = table_obj.schema
+        if self._promotes_staging_table():
+            # Recordstamp is filled with its default value.
+            load_schema = [
+                f for f in load_schema
+                if f.name.lower() != self.timestamp_field_name.lower()
+            ]
+        self.job_config = self._make_load_job_config(load_schema)
+
+        self._ingestion_started = True
+
+    def _make_load_job_config(
+        self,
+        load_schema: typing.List[bigquery.SchemaField]
+    ) -> bigquery.LoadJobConfig:
+        """Makes CSV load job configuration of a staging table."""
+        return bigquery.LoadJobConfig(
             autodetect=True,
             skip_leading_rows=1,
-            schema=table_obj.schema,
+            schema=load_schema,
             schema_update_options=[
                 # New fields will make it too
                 bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION
@@ -174,16 +491,21 @@ class BigQueryHelper:
             encoding=self.text_encoding
         )
 
-        self._ingestion_started = True
-
     def load_batch_csv(
         self,
-        csv_batch_file: str
+        csv_batch_file: str,
+        batch_number: typing.Optional[int] = None
     ) -> int:
         """Loads CSV file into BigQuery
 
+        If batch number is specified, load jobs get deterministic ids,
+        so retrying a load after a transient error
+        cannot append the same batch twice.
+
         Args:
             csv_batch_file (str): CSV file path.
+            batch_number (int, optional): 1-based number of the result batch
+                in the SFDC job. Defaults to None.
 
         Returns:
             int: Number of inserted rows.
@@ -192,29 +514,234 @@ class BigQueryHelper:
         if not self.schema or len(self.schema) == 0:
             raise RuntimeError("BigQuery parameters are not initialized."
                                "Use start_ingestion first.")
+        return self._load_csv(csv_batch_file, self.temp_table_ref,
+                              self.job_config, batch_number)  # type: ignore
+
+    def _load_csv(self,
+                  csv_batch_file: str,
+                  table_ref: bigquery.TableReference,
+                  job_config: bigquery.LoadJobConfig,
+                  batch_number: typing.Optional[int] = None,
+                  staging_name: typing.Optional[str] = None) -> int:
+        """Loads CSV file into a staging table
+        retrying transient errors (see load_batch_csv).
+
+        Args:
+            csv_batch_file (str): CSV file path.
+            table_ref (bigquery.TableReference): Staging table.
+            job_config (bigquery.LoadJobConfig): Load job configuration.
+            batch_number (int, optional): 1-based number of the result batch
+                in the SFDC job. Defaults to None.
+            staging_name (str, optional): Name of the staging table
+                relative to the temporary table, if it's not
+                the temporary table. Defaults to None.
 
+        Returns:
+            int: Number of inserted rows.
+        """
         logging.info(
             "Loading a data batch from %s (%i bytes) to BigQuery table %s.",
             csv_batch_file,
             Path(csv_batch_file).stat().st_size,
-            self.temp_table_ref,
+            table_ref,
         )
 
-        with open(csv_batch_file, "rb") as file:
-            job = self.client.load_table_from_file(
-                file,
-                self.temp_table_ref,
-                job_config=self.job_config,
-                project=self.temp_table_ref.project,
-            )
-            job.result()
-            logging.info("Done. %i rows were added.", job.output_rows)
-            return job.output_rows  # type: ignore
+        # Retries count every transient error, while job id attempts
+        # advance only when a job with the current id cannot be used.
+        retry = 1
+        attempt = 1
+        while True:
+            job_id = (self._load_job_id(batch_number, attempt, staging_name)
+                      if batch_number else None)
+            job = None
+            try:
+                job = self._submit_load_job(csv_batch_file, table_ref,
+                                            job_config, job_id)
+                if job is None:
+                    # Job with this id exists and cannot be used.
+                    if attempt >= BigQueryHelper._MAX_LOAD_ATTEMPTS_:
+                        raise RuntimeError(
+                            f"Failed to load batch {batch_number}: "
+                            f"all {attempt} load job ids were used.")
+                    attempt += 1
+                    continue
+                job.result()
+                self._add_job_statistics(
+                    job, JOB_STAGE_BACKFILL
+                    if staging_name == BigQueryHelper._BACKFILL_STAGING_NAME_
+                    else JOB_STAGE_LOAD)
+                logging.info("Done. %i rows were added.", job.output_rows)
+                return job.output_rows  # type: ignore
+            except (ServerError, TooManyRequests,
+                    requests.exceptions.ConnectionError) as ex:
+                if retry >= BigQueryHelper._MAX_LOAD_ATTEMPTS_:
+                    raise
+                delay = BigQueryHelper._LOAD_RETRY_DELAY_ * 2**(retry - 1)
+                logging.warning(
+                    "⚠️ Failed to load batch %s (attempt %i): %s."
+                    " Retrying in %.0f seconds.",
+                    batch_number, retry, ex, delay)
+                time.sleep(delay)
+                retry += 1
+                # A failed job cannot be resumed, the next attempt
+                # needs a new job id. Otherwise, the same job id
+                # makes sure the batch isn't loaded twice.
+                if job is not None and job.error_result:
+                    attempt += 1
+
+    def loaded_batch_rows(self, batch_number: int) -> typing.Optional[int]:
+        """Checks if a result batch of a resumed job was loaded before
+        to the temporary table.
+
+        Args:
+            batch_number (int): 1-based number of the result batch
+                in the SFDC job.
+
+        Returns:
+            typing.Optional[int]: Number of rows loaded from the batch,
+                or None if the batch needs to be loaded.
+        """
+        if not self._resumed_temp_table:
+            return None
+        for attempt in range(1, BigQueryHelper._MAX_LOAD_ATTEMPTS_ + 1):
+            try:
+                job = self.client.get_job(
+                    self._load_job_id(batch_number, attempt),
+                    project=self.temp_table_ref.project)
+            except NotFound:
+                # Attempts use job ids in order.
+                return None
+            if job.state != "DONE":
+                try:
+                    job.result()
+                except GoogleCloudError:
+                    continue
+            if not job.error_result:
+                return job.output_rows  # type: ignore
+        return None
+
+    def staged_modstamps(
+            self,
+            mod_stamp_field_name: str) -> typing.Optional[StagedModstamps]:
+        """Summarizes modification timestamps of rows
+        in the temporary table.
+        Must be called before finish_ingestion.
+
+        Args:
+            mod_stamp_field_name (str): Name of the modification
+                timestamp field in BigQuery.
+
+        Returns:
+            typing.Optional[StagedModstamps]: modification timestamps,
+                or None if the temporary table is empty.
+        """
+        temp_table = (f"{self.project_id}.{self.dataset_name}."
+                      f"{self.temp_table_name}")
+        if self.last_job_timestamp:
+            last_job_timestamp_str = self.last_job_timestamp.strftime(
+                "%Y-%m-%dT%H:%M:%S.%fZ")
+            overlap_str = (f"COUNTIF({mod_stamp_field_name} <= "
+                           f"TIMESTAMP('{last_job_timestamp_str}'))")
+        else:
+            overlap_str = "0"
+        query = f"""
+            SELECT MIN({mod_stamp_field_name}),
+                   MAX({mod_stamp_field_name}),
+                   TIMESTAMP_MICROS(CAST(
+                       AVG(UNIX_MICROS({mod_stamp_field_name})) AS INT64)),
+                   {overlap_str}
+            FROM `{temp_table}`
+        """
+        query_config = (self.client.default_query_job_config or
+                        bigquery.QueryJobConfig())
+        query_config.labels = query_config.labels or {}
+        query_config.labels[BigQueryHelper._JOB_LABEL_KEY] = (
+            BigQueryHelper._JOB_LABEL_VALUE
+        )
+        query_job = self.client.query(query=query,
+                                      project=self.temp_table_ref.project,
+                                      job_config=query_config)
+        rows = list(query_job.result())
+        self._add_job_statistics(query_job, JOB_STAGE_INSPECT)
+        if not rows or rows[0][1] is None:
+            return None
+        return StagedModstamps(*rows[0])
+
+    def _add_job_statistics(
+            self,
+            job: typing.Union[bigquery.QueryJob, bigquery.LoadJob,
+                              bigquery.CopyJob],
+            stage: str,
+            strategy: str = ""):
+        """Records billed bytes and slot time of a finished job
+        to the sink's job cost ledger."""
+        self.job_costs.record(stage, job, strategy)
+
+    def _load_job_id(self,
+                     batch_number: int,
+                     attempt: int,
+                     staging_name: typing.Optional[str] = None) -> str:
+        """Makes a deterministic id of a batch load job."""
+        timestamp_now = int(self.job_timestamp.timestamp() * 1e9)
+        job_id = (f"sfdc2bq_load_{self.dataset_name}_{self.target_table_name}_"
+                  f"{timestamp_now}_")
+        if staging_name is not None:
+            job_id += f"{staging_name}_"
+        job_id += str(batch_number)
+        if attempt > 1:
+            job_id += f"_{attempt}"
+        return re.sub(r"[^a-zA-Z0-9_-]", "_", job_id)
+
+    def _submit_load_job(
+            self,
+            csv_batch_file: str,
+            table_ref: bigquery.TableReference,
+            job_config: bigquery.LoadJobConfig,
+            job_id: typing.Optional[str]
+    ) -> typing.Optional[bigquery.LoadJob]:
+        """Starts a load job of a CSV file to a staging table.
+
+        Args:
+            csv_batch_file (str): CSV file path.
+            table_ref (bigquery.TableReference): Staging table.
+            job_config (bigquery.LoadJobConfig): Load job configuration.
+            job_id (str, optional): Load job id.
+
+        Returns:
+            typing.Optional[bigquery.LoadJob]: load job,
+                or None if a job with this id exists and cannot be used.
+        """
+        try:
+            with open(csv_batch_file, "rb") as file:
+                job = self.client.load_table_from_file(
+                    file,
+                    table_ref,
+                    job_config=job_config,
+                    job_id=job_id,
+                    project=table_ref.project,
+                )
+        except Conflict:
+            # The job was created by an earlier attempt.
+            job = self.client.get_job(job_id, project=table_ref.project)
+            if (job_id not in self._submitted_load_jobs and
+                    not self._resumed_temp_table):
+                # Job of a previous ingestion to a temporary table
+                # that doesn't exist anymore.
+                return None
+            if job.state == "DONE" and job.error_result:
+                return None
+            logging.info("Load job %s already exists.", job_id)
+        if job_id:
+            self._submitted_load_jobs.add(job_id)
+        return job
 
     def finish_ingestion(self, finish_empty_job: bool):
         """Finalizes BigQuery ingestion:
             1. Extends destination table schema if needed.
             2. Executes merging from temporary table to the destination.
+               Small incremental deltas are merged with a single MERGE
+               at interactive priority, the rest with a transaction
+               at batch priority.
             3. Deletes temporary table.
 
         Args:
@@ -225,12 +752,21 @@ class BigQueryHelper:
             raise RuntimeError(
                 "Nothing to finish. Call start_ingestion first.")
 
+        if self.change_log:
+            self._finish_change_log_ingestion(finish_empty_job)
+            return
+        if self._promotes_staging_table():
+            # An empty staging table replaces the destination too.
+            self._promote_staging_table()
+            return
+
         logging.info("Committing replicated data to %s", self.target_table_ref)
 
         # Extending target table's schema if needed
         modified_schema = False
         # for start, it's just temp table schema
         destination_schema = self.schema.copy()
+        existing_target = True
         try:
             table_obj = self.client.get_table(self.target_table_ref)
             self.target_table_ref = table_obj.reference
@@ -248,6 +784,12 @@ class BigQueryHelper:
                 ]:
                     modified_schema = True
                     destination_schema.append(tmp_schema[i])
+            if (self.row_hash_field_name and self.row_hash_field_name.lower()
+                    not in existing_schema_fields):
+                # Existing rows get NULL hash, so they will be updated
+                # next time they come from SFDC.
+                modified_schema = True
+                destination_schema.append(self._row_hash_schema_field())
 
             if modified_schema:
                 table_obj.schema = destination_schema
@@ -258,9 +800,18 @@ class BigQueryHelper:
             # remove IsDeleted and IsArchived
             # if they present in the schema,
             # and create the destination table.
+            existing_target = False
             for f in destination_schema.copy():
                 if f.name.lower() in ["isdeleted", "isarchived"]:
                     destination_schema.remove(f)
+            # Recordstamp default value only belongs to the temporary table.
+            destination_schema = [
+                bigquery.SchemaField(name=f.name, field_type=f.field_type)
+                if f.default_value_expression else f
+                for f in destination_schema
+            ]
+            if self.row_hash_field_name:
+                destination_schema.append(self._row_hash_schema_field())
 
             table_obj = self.client.create_table(
                 bigquery.Table(self.target_table_ref, destination_schema),)
@@ -268,59 +819,132 @@ class BigQueryHelper:
 
         # If have data to copy/merge, construct and run merging query
         try:
+            replace_condition = None
+            recordstamp = self.job_timestamp
+            if self._replaced_ranges:
+                replace_condition = self._created_range_condition(
+                    *self._replaced_ranges)
+                # Reconciled rows don't move the watermark.
+                recordstamp = self.last_job_timestamp  # type: ignore
+                # Ranges without SFDC records must be emptied too.
+                finish_empty_job = False
+            elif self.full_ingestion and existing_target:
+                # Full reload of an existing table replaces all rows,
+                # even if SFDC returned none.
+                replace_condition = "TRUE"
+                finish_empty_job = False
             if not finish_empty_job:
-                # Starting a transaction
-                query = "BEGIN TRANSACTION; "
-                recordstamp_str = self.job_timestamp.strftime(
+                small_delta = self._is_small_delta()
+                recordstamp_str = recordstamp.strftime(
                     "%Y-%m-%dT%H:%M:%S.%fZ")
+                target_table = (f"{self.project_id}.{self.dataset_name}."
+                                f"{self.target_table_name}")
+                temp_table = (f"{self.project_id}.{self.dataset_name}."
+                              f"{self.temp_table_name}")
 
-                if self.last_job_timestamp:
-                    # Query for deleting rows with Id that are present
-                    # in the temporary table.
-                    delete_query = f"""
-                        DELETE FROM `{self.project_id}.{self.dataset_name}.{self.target_table_name}`
-                        WHERE {self.id_field_name} IN
-                        (SELECT {self.id_field_name} FROM `{self.project_id}.{self.dataset_name}.{self.temp_table_name}`
-                        );
-                    """
-                    query += delete_query
-
-                # Query for copying data from the temp table
-                # to the destination table
-
-                # SELECT all fields except IsDeleted, IsArchived and Recordstamp
+                # SELECT all fields except IsDeleted, IsArchived, Recordstamp
+                # and the row hash.
+                non_selected_fields = ["isdeleted", "isarchived",
+                                       self.timestamp_field_name.lower()]
+                if self.row_hash_field_name:
+                    non_selected_fields.append(
+                        self.row_hash_field_name.lower())
                 select_fields = [
                     f.name
                     for f in destination_schema
-                    if f.name.lower() not in [
-                        "isdeleted", "isarchived",
-                        self.timestamp_field_name.lower()
-                    ]
+                    if f.name.lower() not in non_selected_fields
                 ]
                 select_fields_str = ",".join(select_fields)
-                # INSERT statement includes Recordstamp as a value.
-                insert_field_str = (f"{select_fields_str},"
-                                    f"{self.timestamp_field_name}")
 
-                query += f"""
-                    INSERT INTO `{self.project_id}.{self.dataset_name}.{self.target_table_name}`
-                    ({insert_field_str})
-                    SELECT {select_fields_str},
-                    TIMESTAMP('{recordstamp_str}') AS {self.timestamp_field_name}
-                    FROM `{self.project_id}.{self.dataset_name}.{self.temp_table_name}`
-                """
+                # Rows removed in SFDC
+                removed_conditions = []
                 if self.has_is_deleted:
-                    query += " WHERE NOT IsDeleted"
+                    removed_conditions.append("IsDeleted")
                 if self.has_is_archived:
-                    if self.has_is_deleted:
-                        query += " AND NOT IsArchived"
-                    else:
-                        query += " WHERE NOT IsArchived"
-                query += ";"
+                    removed_conditions.append("IsArchived")
+
+                if self.row_hash_field_name:
+                    hash_fields_str = ",".join(
+                        f for f in select_fields
+                        if f.lower() not in self.row_hash_exclude_fields)
+                    row_hash = (f"FARM_FINGERPRINT(TO_JSON_STRING("
+                                f"STRUCT({hash_fields_str})))")
 
-                # Committing the transaction.
-                # If it fails before, BigQuery will roll it back automatically.
-                query += " COMMIT TRANSACTION;"
+                if (self.last_job_timestamp and small_delta and
+                        not replace_condition):
+                    # A single MERGE statement avoids the overhead
+                    # of a multi-statement transaction for small deltas.
+                    strategy = STRATEGY_MERGE
+                    query = self._make_small_delta_merge_query(
+                        target_table, temp_table, select_fields,
+                        removed_conditions, recordstamp_str,
+                        row_hash if self.row_hash_field_name else None)
+                else:
+                    strategy = (STRATEGY_REPLACE if replace_condition
+                                else STRATEGY_TRANSACTION)
+                    # Starting a transaction
+                    query = "BEGIN TRANSACTION; "
+                    if replace_condition:
+                        query += (f"DELETE FROM `{target_table}` "
+                                  f"WHERE {replace_condition}; ")
+                    elif self.last_job_timestamp:
+                        if self.row_hash_field_name:
+                            # Only deleting rows that were removed in SFDC
+                            # or have changed.
+                            changed_conditions = removed_conditions + [
+                                f"T.{self.row_hash_field_name} "
+                                f"IS DISTINCT FROM {row_hash}"]
+                            delete_query = f"""
+                                DELETE FROM `{target_table}` AS T
+                                WHERE EXISTS
+                                (SELECT 1 FROM `{temp_table}`
+                                 WHERE {self.id_field_name} =
+                                       T.{self.id_field_name}
+                                 AND ({" OR ".join(changed_conditions)})
+                                );
+                            """
+                        else:
+                            # Query for deleting rows with Id that are present
+                            # in the temporary table.
+                            delete_query = f"""
+                                DELETE FROM `{target_table}`
+                                WHERE {self.id_field_name} IN
+                                (SELECT {self.id_field_name} FROM `{temp_table}`
+                                );
+                            """
+                        query += delete_query
+
+                    # INSERT statement includes Recordstamp as a value.
+                    insert_field_str = (f"{select_fields_str},"
+                                        f"{self.timestamp_field_name}")
+                    select_values_str = (f"{select_fields_str},"
+                                         f"TIMESTAMP('{recordstamp_str}')")
+                    if self.row_hash_field_name:
+                        insert_field_str += f",{self.row_hash_field_name}"
+                        select_values_str += f",{row_hash}"
+
+                    query += f"""
+                        INSERT INTO `{target_table}`
+                        ({insert_field_str})
+                        SELECT {select_values_str}
+                        FROM `{temp_table}` AS S
+                    """
+                    insert_conditions = [f"NOT {c}" for c in removed_conditions]
+                    if (self.row_hash_field_name and self.last_job_timestamp
+                            and not replace_condition):
+                        # Unchanged rows are still in the destination table.
+                        insert_conditions.append(
+                            f"NOT EXISTS (SELECT 1 FROM `{target_table}` AS T "
+                            f"WHERE T.{self.id_field_name} = "
+                            f"S.{self.id_field_name})")
+                    if insert_conditions:
+                        query += " WHERE " + " AND ".join(insert_conditions)
+                    query += ";"
+
+                    # Committing the transaction.
+                    # If it fails before,
+                    # BigQuery will roll it back automatically.
+                    query += " COMMIT TRANSACTION;"
 
                 query_config = (self.client.default_query_job_config or
                                 bigquery.QueryJobConfig())
@@ -328,22 +952,29 @@ class BigQueryHelper:
                 query_config.labels[BigQueryHelper._JOB_LABEL_KEY] = (
                     BigQueryHelper._JOB_LABEL_VALUE
                 )
-                query_config.priority = bigquery.QueryPriority.BATCH
+                query_config.priority = (
+                    bigquery.QueryPriority.INTERACTIVE if small_delta
+                    else bigquery.QueryPriority.BATCH)
                 query_job = self.client.query(query=query,
                                               project=table_obj.project,
                                               location=table_obj.location,  # type: ignore
                                               job_config=query_config)
                 query_job.result()
+                self._add_job_statistics(query_job, JOB_STAGE_MERGE, strategy)
                 bytes_processes = query_job.total_bytes_processed
                 slot_milliseconds = query_job.slot_millis
 
                 logging.info(
-                    "%s: bytes processed %f, slot seconds %f.",
+                    "%s: %s, bytes processed %f, slot seconds %f.",
                     self.target_table_ref,
+                    strategy,
                     bytes_processes,
                     slot_milliseconds / 1000,  # type: ignore
                 )
 
+            if self.row_hash_field_name and not self._replaced_ranges:
+                self._store_watermark()
+
             # Delete temporary table.
             logging.info("Deleting temporary resources: %s",
                          self.temp_table_ref)
@@ -361,14 +992,596 @@ class BigQueryHelper:
                           exc_info=True)
             raise
 
+    def _is_small_delta(self) -> bool:
+        """Checks whether the staged delta is small enough
+        to be merged at interactive priority.
+
+        Returns:
+            bool: True if the temporary table has no more than
+                _SMALL_DELTA_MAX_ROWS_ rows and _SMALL_DELTA_MAX_BYTES_ bytes.
+        """
+        tmp_table = self.client.get_table(self.temp_table_ref)
+        num_rows = tmp_table.num_rows or 0
+        num_bytes = tmp_table.num_bytes or 0
+        small_delta = (num_rows <= BigQueryHelper._SMALL_DELTA_MAX_ROWS_ and
+                       num_bytes <= BigQueryHelper._SMALL_DELTA_MAX_BYTES_)
+        logging.info("%s: staged %d rows (%d bytes), merging at %s priority.",
+                     self.target_table_ref, num_rows, num_bytes,
+                     "interactive" if small_delta else "batch")
+        return small_delta
+
+    def _make_small_delta_merge_query(self,
+                                      target_table: str,
+                                      temp_table: str,
+                                      select_fields: typing.List[str],
+                                      removed_conditions: typing.List[str],
+                                      recordstamp_str: str,
+                                      row_hash: typing.Optional[str]) -> str:
+        """Makes a single MERGE statement applying an incremental delta.
+
+        Args:
+            target_table (str): full destination table name.
+            temp_table (str): full temporary table name.
+            select_fields (typing.List[str]): fields copied
+                from the temporary table.
+            removed_conditions (typing.List[str]): fields marking rows
+                removed in SFDC (IsDeleted, IsArchived).
+            recordstamp_str (str): Recordstamp value of merged rows.
+            row_hash (typing.Optional[str]): row hash expression,
+                None if row hashes are not stored.
+
+        Returns:
+            str: MERGE statement.
+        """
+        id_field = self.id_field_name
+        # MERGE requires at most one source row per destination row.
+        source_fields = "*"
+        if row_hash:
+            source_fields += f", {row_hash} AS _sfdc2bq_row_hash"
+        source_query = (f"SELECT {source_fields} FROM `{temp_table}` "
+                        f"WHERE TRUE QUALIFY ROW_NUMBER() "
+                        f"OVER (PARTITION BY {id_field}) = 1")
+
+        insert_fields = select_fields + [self.timestamp_field_name]
+        insert_values = [f"S.{f}" for f in select_fields]
+        insert_values.append(f"TIMESTAMP('{recordstamp_str}')")
+        if row_hash:
+            insert_fields.append(self.row_hash_field_name)
+            insert_values.append("S._sfdc2bq_row_hash")
+        update_str = ", ".join(f"{f} = {v}"
+                               for f, v in zip(insert_fields, insert_values))
+
+        query = f"""
+            MERGE `{target_table}` AS T
+            USING ({source_query}) AS S
+            ON T.{id_field} = S.{id_field}
+        """
+        insert_condition = ""
+        if removed_conditions:
+            # Same semantics as the transaction:
+            # rows that are not inserted are deleted.
+            insert_condition = "IFNULL({}, FALSE)".format(" AND ".join(
+                f"NOT S.{c}" for c in removed_conditions))
+            query += f"""
+                WHEN MATCHED AND NOT {insert_condition} THEN DELETE
+            """
+            insert_condition = f" AND {insert_condition}"
+        update_condition = ""
+        if row_hash:
+            # Unchanged rows are left as they are.
+            update_condition = (f" AND T.{self.row_hash_field_name} "
+                                f"IS DISTINCT FROM S._sfdc2bq_row_hash")
+        query += f"""
+            WHEN MATCHED{update_condition} THEN UPDATE SET {update_str}
+        """
+        query += f"""
+            WHEN NOT MATCHED{insert_condition} THEN
+            INSERT ({",".join(insert_fields)})
+            VALUES ({",".join(insert_values)});
+        """
+        return query
+
+    def bucket_summary(
+        self, created_field_name: str, mod_stamp_field_name: str
+    ) -> typing.Dict[MonthBucket, BucketSummary]:
+        """Counts destination rows by creation date month,
+        along with their newest modification timestamp.
+
+        Args:
+            created_field_name (str): Creation date field name.
+            mod_stamp_field_name (str): Modification timestamp field name.
+
+        Returns:
+            typing.Dict[MonthBucket, BucketSummary]: bucket summaries.
+        """
+        target_table = (f"{self.project_id}.{self.dataset_name}."
+                        f"{self.target_table_name}")
+        query = f"""
+            SELECT EXTRACT(YEAR FROM {created_field_name}),
+                   EXTRACT(MONTH FROM {created_field_name}),
+                   COUNT(*),
+                   MAX({mod_stamp_field_name})
+            FROM `{target_table}`
+            GROUP BY 1, 2
+        """
+        query_config = (self.client.default_query_job_config or
+                        bigquery.QueryJobConfig())
+        query_config.labels = query_config.labels or {}
+        query_config.labels[BigQueryHelper._JOB_LABEL_KEY] = (
+            BigQueryHelper._JOB_LABEL_VALUE
+        )
+        query_job = self.client.query(query=query,
+                                      project=self.target_table_ref.project,
+                                      job_config=query_config)
+        summaries: typing.Dict[MonthBucket, BucketSummary] = {}
+        for year, month, count, max_modstamp in query_job.result():
+            bucket = (year, month) if year is not None else None
+            summaries[bucket] = BucketSummary(count, max_modstamp)
+        self._add_job_statistics(query_job, JOB_STAGE_INSPECT)
+        return summaries
+
+    def replace_created_ranges(self,
+                               created_field_name: str,
+                               ranges: typing.List[CreatedRange]):
+        """Makes finish_ingestion replace destination rows
+        created within ranges with staged rows instead of merging by Id.
+        Replaced rows get the last replication timestamp,
+        so the watermark doesn't move.
+
+        Args:
+            created_field_name (str): Creation date field name.
+            ranges (typing.List[CreatedRange]): creation date ranges.
+
+        Raises:
+            RuntimeError: thrown if the destination table doesn't exist.
+        """
+        if self.full_ingestion:
+            raise RuntimeError("Only existing tables can be reconciled.")
+        self._replaced_ranges = (created_field_name, list(ranges))
+
+    @staticmethod
+    def _created_range_condition(created_field_name: str,
+                                 ranges: typing.List[CreatedRange]) -> str:
+        """Makes SQL condition selecting rows in creation date ranges."""
+        conditions = []
+        for start, end in ranges:
+            if start is None or end is None:
+                conditions.append(f"{created_field_name} IS NULL")
+            else:
+                conditions.append(
+                    f"({created_field_name} >= "
+                    f"TIMESTAMP('{start.strftime('%Y-%m-%dT%H:%M:%SZ')}') AND "
+                    f"{created_field_name} < "
+                    f"TIMESTAMP('{end.strftime('%Y-%m-%dT%H:%M:%SZ')}'))")
+        return "(" + " OR ".join(conditions) + ")"
+
+    def _promote_staging_table(self):
+        """Finalizes full BigQuery ingestion without copying rows:
+            1. Removes rows deleted or archived in SFDC, if any,
+               and IsDeleted and IsArchived columns.
+            2. Makes the temporary table permanent.
+            3. Renames it to the destination table if that doesn't exist,
+               or replaces the destination table with a table copy.
+        """
+        logging.info("Promoting %s to %s", self.temp_table_ref,
+                     self.target_table_ref)
+
+        temp_table = (f"{self.project_id}.{self.dataset_name}."
+                      f"{self.temp_table_name}")
+        recordstamp_str = self.job_timestamp.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        tmp_schema = self.client.get_table(self.temp_table_ref).schema
+        removed_fields = [f.name for f in tmp_schema
+                          if f.name.lower() in ["isdeleted", "isarchived"]]
+
+        # Full ingestion doesn't query deleted records,
+        # so these statements normally don't modify any rows.
+        query = ""
+        if removed_fields:
+            query += f"""
+                DELETE FROM `{temp_table}`
+                WHERE {" OR ".join(f"IFNULL({f}, FALSE)" for f in removed_fields)};
+            """
+        query += f"""
+            UPDATE `{temp_table}`
+            SET {self.timestamp_field_name} = TIMESTAMP('{recordstamp_str}')
+            WHERE {self.timestamp_field_name} IS NULL;
+            ALTER TABLE `{temp_table}`
+            ALTER COLUMN {self.timestamp_field_name} DROP DEFAULT;
+        """
+        if removed_fields:
+            query += f"""
+                ALTER TABLE `{temp_table}`
+                {", ".join(f"DROP COLUMN {f}" for f in removed_fields)};
+            """
+        query += f"""
+            ALTER TABLE `{temp_table}`
+            SET OPTIONS (expiration_timestamp = NULL);
+        """
+
+        try:
+            try:
+                target_obj = self.client.get_table(self.target_table_ref)
+            except NotFound:
+                target_obj = None
+            if not target_obj:
+                query += f"""
+                    ALTER TABLE `{temp_table}`
+                    RENAME TO `{self.target_table_name}`;
+                """
+
+            query_config = (self.client.default_query_job_config or
+                            bigquery.QueryJobConfig())
+            query_config.labels = query_config.labels or {}
+            query_config.labels[BigQueryHelper._JOB_LABEL_KEY] = (
+                BigQueryHelper._JOB_LABEL_VALUE
+            )
+            query_job = self.client.query(query=query,
+                                          project=self.temp_table_ref.project,
+                                          job_config=query_config)
+            query_job.result()
+            self._add_job_statistics(query_job, JOB_STAGE_MERGE,
+                                     STRATEGY_PROMOTE)
+            logging.info(
+                "%s: bytes processed %f, slot seconds %f.",
+                self.temp_table_ref,
+                query_job.total_bytes_processed,
+                (query_job.slot_millis or 0) / 1000,
+            )
+
+            if target_obj:
+                # Table copy within a dataset doesn't re-process the data.
+                copy_config = bigquery.CopyJobConfig(
+                    write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+                    labels={
+                        BigQueryHelper._JOB_LABEL_KEY:
+                        BigQueryHelper._JOB_LABEL_VALUE
+                    })
+                copy_job = self.client.copy_table(self.temp_table_ref,
+                                                  target_obj.reference,
+                                                  job_config=copy_config)
+                copy_job.result()
+                self._add_job_statistics(copy_job, JOB_STAGE_MERGE,
+                                         STRATEGY_PROMOTE)
+                logging.info("Deleting temporary resources: %s",
+                             self.temp_table_ref)
+                self.client.delete_table(self.temp_table_ref)
+
+            logging.info("Finished ingestion to %s", self.target_table_ref)
+
+            self._ingestion_started = False
+        except TimeoutError:
+            logging.fatal("⛔️ Operation failed with timeout error: %s\n",
+                          exc_info=True)
+            raise
+        except GoogleCloudError:
+            logging.fatal("⛔️ Google Cloud Operation failed: %s\n",
+                          exc_info=True)
+            raise
+
+    def _finish_change_log_ingestion(self, finish_empty_job: bool):
+        """Finalizes BigQuery ingestion in change log mode:
+            1. Creates change log table or extends its schema if needed.
+            2. Appends rows from temporary table to the change log,
+               including deleted and archived rows as tombstones.
+               Full reload also appends tombstones of records
+               missing from the temporary table.
+            3. (Re)creates the current state view.
+            4. Deletes temporary table.
+
+        Args:
+            finish_empty_job (bool): True if no rows were ingested.
+        """
+        logging.info("Appending replicated data to %s",
+                     self.change_log_table_ref)
+
+        tmp_schema = self.client.get_table(self.temp_table_ref).schema
+        existing_change_log = True
+        try:
+            table_obj = self.client.get_table(self.change_log_table_ref)
+            change_log_schema = table_obj.schema
+            existing_schema_fields = [f.name.lower() for f in change_log_schema]
+            new_fields = [f for f in tmp_schema
+                          if f.name.lower() not in existing_schema_fields]
+            if new_fields:
+                table_obj.schema = change_log_schema + new_fields
+                table_obj = self.client.update_table(table_obj, ["schema"])
+        except NotFound:
+            # Partitioning by the job timestamp makes appends
+            # and incremental reads of the change log cheap.
+            table = bigquery.Table(self.change_log_table_ref, tmp_schema)
+            table.time_partitioning = bigquery.TimePartitioning(
+                type_=bigquery.TimePartitioningType.DAY,
+                field=self.timestamp_field_name)
+            table.clustering_fields = [self.id_field_name]
+            table_obj = self.client.create_table(table)
+            existing_change_log = False
+        self.change_log_table_ref = table_obj.reference
+
+        change_log_table = (f"{self.project_id}.{self.dataset_name}."
+                            f"{self.change_log_table_ref.table_id}")
+        target_table = (f"{self.project_id}.{self.dataset_name}."
+                        f"{self.target_table_name}")
+        temp_table = (f"{self.project_id}.{self.dataset_name}."
+                      f"{self.temp_table_name}")
+
+        query = ""
+        # Appending rows and recreating the view are cheap for small deltas.
+        small_delta = finish_empty_job or self._is_small_delta()
+        recordstamp_str = self.job_timestamp.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        if self.full_ingestion and existing_change_log:
+            # Full extraction doesn't return records deleted in SFDC,
+            # so records missing from it get tombstones.
+            query += f"""
+                INSERT INTO `{change_log_table}`
+                ({self.id_field_name},IsDeleted,{self.timestamp_field_name})
+                SELECT {self.id_field_name},TRUE,TIMESTAMP('{recordstamp_str}')
+                FROM `{change_log_table}` AS L
+                WHERE TRUE
+                QUALIFY ROW_NUMBER() OVER (
+                  PARTITION BY {self.id_field_name}
+                  ORDER BY {self.timestamp_field_name} DESC) = 1
+                AND NOT IFNULL(IsDeleted, FALSE)
+                AND NOT EXISTS (SELECT 1 FROM `{temp_table}` AS S
+                                WHERE S.{self.id_field_name} =
+                                      L.{self.id_field_name});
+            """
+        if not finish_empty_job:
+            select_fields = [
+                f.name for f in tmp_schema
+                if f.name.lower() != self.timestamp_field_name.lower()
+            ]
+            select_fields_str = ",".join(select_fields)
+            query += f"""
+                INSERT INTO `{change_log_table}`
+                ({select_fields_str},{self.timestamp_field_name})
+                SELECT {select_fields_str},TIMESTAMP('{recordstamp_str}')
+                FROM `{temp_table}`;
+            """
+
+        # The latest version of every record,
+        # unless it was deleted or archived in SFDC.
+        removed_fields = [f.name for f in tmp_schema
+                          if f.name.lower() in ["isdeleted", "isarchived"]]
+        except_str = (f" EXCEPT({','.join(removed_fields)})"
+                      if removed_fields else "")
+        view_query = f"""
+            SELECT *{except_str} FROM (
+              SELECT * FROM `{change_log_table}`
+              WHERE TRUE
+              QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY {self.id_field_name}
+                ORDER BY {self.timestamp_field_name} DESC) = 1
+            )
+        """
+        if removed_fields:
+            view_query += " WHERE " + " AND ".join(
+                f"NOT IFNULL({f}, FALSE)" for f in removed_fields)
+        query += f"""
+            CREATE OR REPLACE VIEW `{target_table}` AS {view_query};
+        """
+
+        query_config = (self.client.default_query_job_config or
+                        bigquery.QueryJobConfig())
+        query_config.labels = query_config.labels or {}
+        query_config.labels[BigQueryHelper._JOB_LABEL_KEY] = (
+            BigQueryHelper._JOB_LABEL_VALUE
+        )
+        query_config.priority = (
+            bigquery.QueryPriority.INTERACTIVE if small_delta
+            else bigquery.QueryPriority.BATCH)
+        try:
+            query_job = self.client.query(query=query,
+                                          project=table_obj.project,
+                                          location=table_obj.location,  # type: ignore
+                                          job_config=query_config)
+            query_job.result()
+            self._add_job_statistics(query_job, JOB_STAGE_MERGE,
+                                     STRATEGY_CHANGE_LOG)
+            logging.info(
+                "%s: bytes processed %f, slot seconds %f.",
+                self.change_log_table_ref,
+                query_job.total_bytes_processed,
+                (query_job.slot_millis or 0) / 1000,
+            )
+
+            logging.info("Deleting temporary resources: %s",
+                         self.temp_table_ref)
+            self.client.delete_table(self.temp_table_ref)
+
+            logging.info("Finished ingestion to %s", self.change_log_table_ref)
+
+            self._ingestion_started = False
+        except TimeoutError:
+            logging.fatal("⛔️ Operation failed with timeout error: %s\n",
+                          exc_info=True)
+            raise
+        except GoogleCloudError:
+            logging.fatal("⛔️ Google Cloud Operation failed: %s\n",
+                          exc_info=True)
+            raise
+
+    def column_group_sink(self, group_index: int) -> ReplicationSink:
+        """Makes a staging sink of a column group of this ingestion.
+
+        Args:
+            group_index (int): 0-based column group index.
+
+        Returns:
+            ReplicationSink: column group sink.
+        """
+        if not self._ingestion_started:
+            raise RuntimeError("Ingestion is not started. "
+                               "Use start_ingestion first.")
+        return _ColumnGroupStaging(self, group_index)
+
+    def join_column_groups(self,
+                           group_sinks: typing.List[ReplicationSink],
+                           join_field_names: typing.List[str]) -> int:
+        """Joins column group staging tables into the temporary table
+        and deletes them.
+
+        Rows which don't match in all groups are skipped.
+        Such rows were modified while column group jobs were running,
+        and the next replication picks them up.
+
+        Args:
+            group_sinks (typing.List[ReplicationSink]): column group sinks
+                made with column_group_sink.
+            join_field_names (typing.List[str]): fields to join groups on
+                (Id and modification timestamp).
+
+        Returns:
+            int: Number of joined rows.
+        """
+        groups = typing.cast(typing.List[_ColumnGroupStaging], group_sinks)
+        logging.info("Joining %i column groups into %s.",
+                     len(groups), self.temp_table_ref)
+
+        insert_fields = []
+        select_fields = []
+        for group in groups:
+            for name in group.field_names:
+                if name.lower() in [f.lower() for f in insert_fields]:
+                    continue
+                insert_fields.append(name)
+                select_fields.append(f"g{group.group_index}.`{name}`")
+        query = (f"INSERT INTO `{self.temp_table_ref}` "
+                 f"({', '.join(f'`{f}`' for f in insert_fields)})\n"
+                 f"SELECT {', '.join(select_fields)}\n"
+                 f"FROM `{groups[0].table_ref}` AS g{groups[0].group_index}")
+        for group in groups[1:]:
+            join_conditions = " AND ".join(
+                f"g{groups[0].group_index}.`{f}` = g{group.group_index}.`{f}`"
+                for f in join_field_names)
+            query += (f"\nINNER JOIN `{group.table_ref}` "
+                      f"AS g{group.group_index} ON {join_conditions}")
+
+        query_config = (self.client.default_query_job_config or
+                        bigquery.QueryJobConfig())
+        query_config.labels = query_config.labels or {}
+        query_config.labels[BigQueryHelper._JOB_LABEL_KEY] = (
+            BigQueryHelper._JOB_LABEL_VALUE
+        )
+        try:
+            query_job = self.client.query(query=query,
+                                          project=self.temp_table_ref.project,
+                                          job_config=query_config)
+            query_job.result()
+            self._add_job_statistics(query_job, JOB_STAGE_JOIN)
+        except Exception:
+            logging.error("Failed to run query: %s", query)
+            raise
+        joined_rows = query_job.num_dml_affected_rows or 0
+        logging.info("Done. %i rows were joined.", joined_rows)
+
+        for group in groups:
+            self.client.delete_table(group.table_ref, not_found_ok=True)
+        return joined_rows
+
+    def new_target_fields(self,
+                          field_names: typing.List[str]) -> typing.List[str]:
+        """Finds fields missing in the destination table.
+
+        Args:
+            field_names (typing.List[str]): replicated field names.
+
+        Returns:
+            typing.List[str]: fields missing in the destination table,
+                none if the table doesn't exist.
+        """
+        try:
+            table_obj = self.client.get_table(self.target_table_ref)
+        except NotFound:
+            return []
+        existing_fields = [f.name.lower() for f in table_obj.schema]
+        return [
+            f for f in field_names
+            if f.lower() not in existing_fields and
+            f.lower() not in ["isdeleted", "isarchived"]
+        ]
+
+    def backfill_sink(self) -> ReplicationSink:
+        """Makes a staging sink of a column backfill
+        for backfill_columns.
+
+        Returns:
+            ReplicationSink: column backfill sink.
+        """
+        return _ColumnGroupStaging(
+            self, 0, BigQueryHelper._BACKFILL_STAGING_NAME_)
+
+    def backfill_columns(self, backfill_sink: ReplicationSink) -> int:
+        """Updates columns of existing destination rows
+        with values staged by a column backfill sink,
+        and deletes its staging table.
+        Must be called after finish_ingestion added the columns.
+
+        Args:
+            backfill_sink (ReplicationSink): column backfill sink
+                made with backfill_sink, which fields include the Id field.
+
+        Returns:
+            int: Number of updated rows.
+        """
+        staging = typing.cast(_ColumnGroupStaging, backfill_sink)
+        target_table = (f"{self.project_id}.{self.dataset_name}."
+                        f"{self.target_table_name}")
+        update_fields = [f for f in staging.field_names
+                         if f.lower() != self.id_field_name.lower()]
+        logging.info("Backfilling %s in %s.", ", ".join(update_fields),
+                     self.target_table_ref)
+        # UPDATE requires at most one source row per destination row.
+        query = f"""
+            UPDATE `{target_table}` AS T
+            SET {", ".join(f"`{f}` = S.`{f}`" for f in update_fields)}
+            FROM (
+              SELECT * FROM `{staging.table_ref}`
+              WHERE TRUE
+              QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY {self.id_field_name}) = 1
+            ) AS S
+            WHERE T.{self.id_field_name} = S.{self.id_field_name}
+        """
+        query_config = (self.client.default_query_job_config or
+                        bigquery.QueryJobConfig())
+        query_config.labels = query_config.labels or {}
+        query_config.labels[BigQueryHelper._JOB_LABEL_KEY] = (
+            BigQueryHelper._JOB_LABEL_VALUE
+        )
+        query_config.priority = bigquery.QueryPriority.BATCH
+        try:
+            query_job = self.client.query(query=query,
+                                          project=self.target_table_ref.project,
+                                          job_config=query_config)
+            query_job.result()
+            self._add_job_statistics(query_job, JOB_STAGE_BACKFILL)
+        except Exception:
+            logging.error("Failed to run query: %s", query)
+            raise
+        updated_rows = query_job.num_dml_affected_rows or 0
+        logging.info("Done. %i rows were backfilled.", updated_rows)
+
+        self.client.delete_table(staging.table_ref, not_found_ok=True)
+        return updated_rows
+
+    def _row_hash_schema_field(self) -> bigquery.SchemaField:
+        return bigquery.SchemaField(name=self.row_hash_field_name,
+                                    field_type="INT64")
+
     def _retrieve_last_job_timestamp(self):
         """Retrieves maximum value of record timestamp field
         from the destination table.
         """
         try:
             self.timestamp_field_name = self.timestamp_field_name
-            table_obj = self.client.get_table(self.target_table_ref)
-            self.target_table_ref = table_obj.reference
+            # In change log mode, the target is a view over the change log
+            # which is more expensive to query.
+            if self.change_log:
+                table_obj = self.client.get_table(self.change_log_table_ref)
+                self.change_log_table_ref = table_obj.reference
+            else:
+                table_obj = self.client.get_table(self.target_table_ref)
+                self.target_table_ref = table_obj.reference
             query_config = (self.client.default_query_job_config or
                             bigquery.QueryJobConfig())
             query_config.labels = query_config.labels or {}
@@ -377,11 +1590,17 @@ class BigQueryHelper:
             )
             query_job = self.client.query(
                 f"SELECT MAX({self.timestamp_field_name})"
-                f" FROM `{self.target_table_ref}`",
+                f" FROM `{table_obj.reference}`",
                 job_config=query_config)
 
             # This query is guaranteed to return one column and one row.
             last_update_timestamp = list(query_job)[0][0]
+            self._add_job_statistics(query_job, JOB_STAGE_WATERMARK)
+            if self.row_hash_field_name and not self.change_log:
+                watermark = self._retrieve_watermark()
+                if watermark and (not last_update_timestamp or
+                                  watermark > last_update_timestamp):
+                    last_update_timestamp = watermark
 
             self.last_job_timestamp = last_update_timestamp
 
@@ -391,3 +1610,79 @@ class BigQueryHelper:
                 self.target_table_ref,
             )
             self.last_job_timestamp = None
+
+
+class _ColumnGroupStaging(ReplicationSink):
+    """Staging table of a column group of BigQueryHelper ingestion.
+
+    Every column group is extracted by its own SFDC Bulk API job
+    and loaded to its own staging table.
+    BigQueryHelper.join_column_groups joins them
+    into the temporary table of the ingestion.
+    The staging table of a column backfill is applied
+    to the destination table by BigQueryHelper.backfill_columns.
+    """
+
+    def __init__(self,
+                 parent: BigQueryHelper,
+                 group_index: int,
+                 staging_name: typing.Optional[str] = None):
+        """_ColumnGroupStaging constructor.
+
+        Args:
+            parent (BigQueryHelper): Helper of the ingestion.
+            group_index (int): 0-based column group index.
+            staging_name (str, optional): Staging table name suffix.
+                Defaults to "g{group_index}".
+        """
+        super().__init__(parent.target_table_name, parent.job_timestamp,
+                         parent.job_costs)
+        self.last_job_timestamp = parent.last_job_timestamp
+        self.parent = parent
+        self.group_index = group_index
+        self.staging_name = staging_name or f"g{group_index}"
+        self.table_ref = bigquery.TableReference(
+            bigquery.DatasetReference(parent.project_id, parent.dataset_name),
+            f"{parent.temp_table_name}_{self.staging_name}",
+        )
+        self.field_names: typing.List[str] = []
+        self.job_config: typing.Optional[bigquery.LoadJobConfig] = None
+
+    def start_ingestion(self, bq_fields: typing.List[typing.Tuple[str, str]]):
+        """Creates the column group staging table.
+
+        Args:
+            bq_fields (typing.List[typing.Tuple[str, str]]): Column group
+                schema as a list of tuples (Field Name, BigQuery Type)
+        """
+        schema = [bigquery.SchemaField(name=f[0], field_type=f[1])
+                  for f in bq_fields]
+        table_obj = self.parent.client.create_table(
+            bigquery.Table(self.table_ref, schema), exists_ok=False)
+        table_obj.expires = datetime.now(timezone.utc) + timedelta(
+            days=BigQueryHelper._TEMP_TABLE_EXPIRATION_DAYS_)
+        self.parent.client.update_table(table_obj, ["expires"])
+        self.table_ref = table_obj.reference
+        self.field_names = [f[0] for f in bq_fields]
+        self.job_config = self.parent._make_load_job_config(  # pylint:disable=protected-access
+            table_obj.schema)
+
+    def load_batch_csv(self,
+                       csv_batch_file: str,
+                       batch_number: typing.Optional[int] = None) -> int:
+        """Loads CSV file into the column group staging table.
+
+        Args:
+            csv_batch_file (str): CSV file path.
+            batch_number (int, optional): 1-based number of the result batch
+                in the SFDC job. Defaults to None.
+
+        Returns:
+            int: Number of inserted rows.
+        """
+        if not self.job_config:
+            raise RuntimeError("Column group staging is not initialized."
+                               "Use start_ingestion first.")
+        return self.parent._load_csv(  # pylint:disable=protected-access
+            csv_batch_file, self.table_ref, self.job_config,
+            batch_number, staging_name=self.staging_name)
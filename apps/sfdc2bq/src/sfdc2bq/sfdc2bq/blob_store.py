@@ -0,0 +1,127 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Storage of SFDC base64 field contents offloaded from replicated rows.  """
+
+import os
+from pathlib import Path
+import shutil
+import typing
+
+
+def _import_storage() -> typing.Any:
+    try:
+        from google.cloud import storage  # type: ignore # pylint:disable=import-outside-toplevel
+    except ImportError as ex:
+        raise RuntimeError(
+            "Cloud Storage blob store requires google-cloud-storage package. "
+            "Install it with `pip install google-cloud-storage`.") from ex
+    return storage
+
+
+class BlobStore:
+    """Storage of base64 field contents.
+
+    Every blob is addressed by SFDC object, field and record Id,
+    so replicating a record again replaces its blob.
+    """
+
+    def put(self,
+            object_name: str,
+            field_name: str,
+            record_id: str,
+            content: typing.BinaryIO) -> str:
+        """Stores field content of a record, reading it in chunks.
+
+        Args:
+            object_name (str): SFDC object name.
+            field_name (str): base64 field name.
+            record_id (str): record Id.
+            content (typing.BinaryIO): stream of decoded field content.
+
+        Returns:
+            str: URI of the stored blob.
+        """
+        raise NotImplementedError()
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs in a local directory, `{base_path}/{object}/{field}/{Id}`."""
+
+    def __init__(self, base_path: str):
+        """LocalBlobStore constructor.
+
+        Args:
+            base_path (str): Blob directory.
+        """
+        self.base_path = os.path.abspath(base_path)
+
+    def put(self,
+            object_name: str,
+            field_name: str,
+            record_id: str,
+            content: typing.BinaryIO) -> str:
+        directory = os.path.join(self.base_path, object_name, field_name)
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        path = os.path.join(directory, record_id)
+        # Readers never see partially written blobs.
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            shutil.copyfileobj(content, file)
+        os.replace(temp_path, path)
+        return Path(path).as_uri()
+
+
+class GcsBlobStore(BlobStore):
+    """Blobs in a Cloud Storage bucket,
+    `gs://{bucket}/{prefix}/{object}/{field}/{Id}`."""
+
+    def __init__(self, uri: str, storage_client: typing.Any = None):
+        """GcsBlobStore constructor.
+
+        Args:
+            uri (str): Cloud Storage location, `gs://bucket[/prefix]`.
+            storage_client (storage.Client, optional): Cloud Storage client.
+                Defaults to None.
+        """
+        storage = _import_storage()
+        bucket_name, _, prefix = uri[len("gs://"):].partition("/")
+        self.prefix = prefix.strip("/")
+        self.client = storage_client or storage.Client()
+        self.bucket = self.client.bucket(bucket_name)
+
+    def put(self,
+            object_name: str,
+            field_name: str,
+            record_id: str,
+            content: typing.BinaryIO) -> str:
+        blob_name = "/".join(
+            p for p in [self.prefix, object_name, field_name, record_id] if p)
+        # Content of unknown size is sent with a resumable upload.
+        self.bucket.blob(blob_name).upload_from_file(
+            content, content_type="application/octet-stream")
+        return f"gs://{self.bucket.name}/{blob_name}"
+
+
+def open_blob_store(location: str) -> BlobStore:
+    """Makes a blob store for a location.
+
+    Args:
+        location (str): `gs://bucket[/prefix]` or a local directory.
+
+    Returns:
+        BlobStore: blob store.
+    """
+    if location.startswith("gs://"):
+        return GcsBlobStore(location)
+    return LocalBlobStore(location)
@@ -0,0 +1,563 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" BigQuery change data capture (CDC) sink: upserts and deletes
+    written to a primary-keyed table with the Storage Write API.  """
+
+import csv
+from datetime import date, datetime, timezone
+import logging
+from pathlib import Path
+import typing
+
+from google.cloud.exceptions import NotFound
+from google.cloud import bigquery
+
+from .job_costs import (JOB_STAGE_MERGE, JOB_STAGE_WATERMARK,
+                        STRATEGY_REPLACE, JobCostLedger)
+from .replication_sink import ReplicationSink
+
+# BigQuery CDC pseudo-column and its values.
+CHANGE_TYPE_FIELD = "_CHANGE_TYPE"
+CHANGE_UPSERT = "UPSERT"
+CHANGE_DELETE = "DELETE"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _import_storage_write() -> typing.Any:
+    try:
+        from google.cloud import bigquery_storage_v1  # type: ignore # pylint:disable=import-outside-toplevel
+    except ImportError as ex:
+        raise RuntimeError(
+            "CDC mode requires google-cloud-bigquery-storage package. "
+            "Install it with `pip install google-cloud-bigquery-storage`."
+        ) from ex
+    return bigquery_storage_v1
+
+
+def _parse_csv_value(value: str, bq_type: str) -> typing.Any:
+    """Converts a Bulk API CSV value to a Python value of a BigQuery type.
+    Empty values are NULL."""
+    if value == "":
+        return None
+    if bq_type == "BOOL":
+        return value.lower() == "true"
+    if bq_type == "INT64":
+        return int(value)
+    if bq_type == "FLOAT64":
+        return float(value)
+    if bq_type == "TIMESTAMP":
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if bq_type == "DATE":
+        return date.fromisoformat(value)
+    if bq_type == "TIME":
+        # SFDC returns TIME values with "Z" suffix.
+        return value.rstrip("Z")
+    return value
+
+
+class CdcWriter:
+    """Writer of CDC rows to a BigQuery table with a primary key.
+
+    Every row has a _CHANGE_TYPE value, UPSERT or DELETE.
+    Rows are applied in the order they are written.
+    """
+
+    def open(self, fields: typing.List[typing.Tuple[str, str]]):
+        """Prepares writing rows with given fields.
+
+        Args:
+            fields (typing.List[typing.Tuple[str, str]]): Table schema
+                as a list of tuples (Field Name, BigQuery Type).
+        """
+        raise NotImplementedError()
+
+    def write(self, rows: typing.List[typing.Dict[str, typing.Any]]):
+        """Writes CDC rows and waits until they are committed.
+
+        Args:
+            rows (typing.List[typing.Dict[str, typing.Any]]): rows
+                with Python values of table fields and _CHANGE_TYPE.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """Releases writer resources."""
+
+
+class StorageWriteCdcWriter(CdcWriter):
+    """Writes CDC rows to the default stream of a table
+    with BigQuery Storage Write API."""
+
+    # Append requests must not exceed 10 MB.
+    _MAX_REQUEST_BYTES_ = 8 * 1024 * 1024
+    _MESSAGE_NAME_ = "CdcRow"
+
+    def __init__(self,
+                 project_id: str,
+                 dataset_name: str,
+                 table_name: str,
+                 write_client: typing.Any = None):
+        """StorageWriteCdcWriter constructor.
+
+        Args:
+            project_id (str): Table's GCP Project id.
+            dataset_name (str): Table's Dataset name.
+            table_name (str): Table name.
+            write_client (bigquery_storage_v1.BigQueryWriteClient, optional):
+                Storage Write API client. Defaults to None.
+        """
+        self._storage = _import_storage_write()
+        self.client = write_client or self._storage.BigQueryWriteClient()
+        self.stream_name = (
+            f"{self.client.table_path(project_id, dataset_name, table_name)}"
+            "/streams/_default")
+        self.fields: typing.List[typing.Tuple[str, str]] = []
+        self._message_class: typing.Any = None
+        self._append_stream: typing.Any = None
+
+    def open(self, fields: typing.List[typing.Tuple[str, str]]):
+        # pylint:disable=import-outside-toplevel
+        from google.protobuf import (descriptor_pb2, descriptor_pool,
+                                     message_factory)
+        from google.cloud.bigquery_storage_v1 import types, writer  # type: ignore
+
+        proto_types = {
+            "BOOL": descriptor_pb2.FieldDescriptorProto.TYPE_BOOL,
+            "INT64": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+            "FLOAT64": descriptor_pb2.FieldDescriptorProto.TYPE_DOUBLE,
+            # Microseconds since the epoch.
+            "TIMESTAMP": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+            # Days since the epoch.
+            "DATE": descriptor_pb2.FieldDescriptorProto.TYPE_INT32,
+        }
+        self.fields = list(fields) + [(CHANGE_TYPE_FIELD, "STRING")]
+        row_proto = descriptor_pb2.DescriptorProto(
+            name=StorageWriteCdcWriter._MESSAGE_NAME_)
+        for number, (name, bq_type) in enumerate(self.fields, start=1):
+            row_proto.field.add(
+                name=name,
+                number=number,
+                type=proto_types.get(
+                    bq_type, descriptor_pb2.FieldDescriptorProto.TYPE_STRING),
+                label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL)
+        file_proto = descriptor_pb2.FileDescriptorProto(
+            name=f"{StorageWriteCdcWriter._MESSAGE_NAME_}.proto",
+            syntax="proto2",
+            message_type=[row_proto])
+        pool = descriptor_pool.DescriptorPool()
+        pool.Add(file_proto)
+        self._message_class = message_factory.GetMessageClass(
+            pool.FindMessageTypeByName(StorageWriteCdcWriter._MESSAGE_NAME_))
+
+        request_template = types.AppendRowsRequest(
+            write_stream=self.stream_name,
+            proto_rows=types.AppendRowsRequest.ProtoData(
+                writer_schema=types.ProtoSchema(proto_descriptor=row_proto)))
+        self._append_stream = writer.AppendRowsStream(self.client,
+                                                      request_template)
+
+    def write(self, rows: typing.List[typing.Dict[str, typing.Any]]):
+        if self._append_stream is None:
+            raise RuntimeError("Writer is not open. Use open first.")
+        serialized_rows: typing.List[bytes] = []
+        request_bytes = 0
+        for row in rows:
+            message = self._message_class()
+            for name, bq_type in self.fields:
+                value = row.get(name)
+                if value is None:
+                    continue
+                if bq_type == "TIMESTAMP":
+                    value = (value - _EPOCH) // (
+                        datetime.resolution)  # type: ignore
+                elif bq_type == "DATE":
+                    value = (value - _EPOCH.date()).days  # type: ignore
+                elif bq_type not in ["BOOL", "INT64", "FLOAT64"]:
+                    value = str(value)
+                setattr(message, name, value)
+            serialized = message.SerializeToString()
+            if (serialized_rows and request_bytes + len(serialized) >
+                    StorageWriteCdcWriter._MAX_REQUEST_BYTES_):
+                self._append(serialized_rows)
+                serialized_rows = []
+                request_bytes = 0
+            serialized_rows.append(serialized)
+            request_bytes += len(serialized)
+        if serialized_rows:
+            self._append(serialized_rows)
+
+    def _append(self, serialized_rows: typing.List[bytes]):
+        types = self._storage.types
+        proto_rows = types.ProtoRows()
+        proto_rows.serialized_rows.extend(serialized_rows)
+        request = types.AppendRowsRequest(
+            proto_rows=types.AppendRowsRequest.ProtoData(rows=proto_rows))
+        # Waiting for every request keeps changes of a record in order.
+        self._append_stream.send(request).result()
+
+    def close(self):
+        if self._append_stream is not None:
+            self._append_stream.close()
+            self._append_stream = None
+
+
+class LocalCdcWriter(CdcWriter):
+    """Applies CDC rows to an in-memory table, for testing."""
+
+    def __init__(self, id_field_name: str = "Id"):
+        """LocalCdcWriter constructor.
+
+        Args:
+            id_field_name (str, optional): Primary key field name.
+                Defaults to "Id".
+        """
+        self.id_field_name = id_field_name
+        self.fields: typing.List[typing.Tuple[str, str]] = []
+        # Rows by primary key.
+        self.rows: typing.Dict[typing.Any, typing.Dict[str, typing.Any]] = {}
+        self.written_rows = 0
+
+    def open(self, fields: typing.List[typing.Tuple[str, str]]):
+        self.fields = list(fields)
+
+    def write(self, rows: typing.List[typing.Dict[str, typing.Any]]):
+        for row in rows:
+            key = row[self.id_field_name]
+            if row[CHANGE_TYPE_FIELD] == CHANGE_DELETE:
+                self.rows.pop(key, None)
+            else:
+                self.rows[key] = {name: row.get(name)
+                                  for name, _ in self.fields}
+            self.written_rows += 1
+
+
+class CdcSink(ReplicationSink):
+    """Replicates SFDC objects to a BigQuery table
+    with Id as its primary key, without a temporary table.
+
+    Every result page is written to the destination table
+    as upserts of replicated records and deletes of records
+    deleted or archived in SFDC. The last replication timestamp
+    is kept in a watermark table and moves only when
+    the replication finishes, so a failed replication is repeated
+    by the next one.
+    """
+
+    _JOB_LABEL_KEY = "requestor"
+    _JOB_LABEL_VALUE = "sfdc2bq"
+    _WATERMARKS_TABLE_ = "_sfdc_cdc_watermarks"
+
+    def __init__(
+        self,
+        project_id: str,
+        dataset_name: str,
+        target_table_name: str,
+        job_timestamp: datetime,
+        id_field_name: str,
+        timestamp_field_name: str,
+        has_is_deleted: bool,
+        has_is_archived: bool,
+        bigquery_client: typing.Optional[bigquery.Client] = None,
+        csv_delimiter: str = ",",
+        text_encoding: str = "utf-8",
+        cdc_writer: typing.Optional[CdcWriter] = None,
+        force_full_reload: bool = False,
+        job_costs: typing.Optional[JobCostLedger] = None,
+    ):
+        """CdcSink constructor.
+
+        Args:
+            project_id (str): Target GCP Project id.
+            dataset_name (str): Target Dataset name.
+            target_table_name (str): Target Table name.
+            job_timestamp (datetime): Current job start time.
+            id_field_name (str): Name of the Id field.
+            timestamp_field_name (str): Name of the job timestamp field.
+            has_is_deleted (bool): Whether the table has IsDeleted field.
+            has_is_archived (bool): Whether the table has IsArchived field.
+            bigquery_client (bigquery.Client, optional): BigQuery client to use.
+                Defaults to None.
+            csv_delimiter (str, optional): The column delimiter used for CSV.
+                                           Defaults to ",".
+            text_encoding (str, optional): CSV text encoding.
+                                           Defaults to "utf-8"
+            cdc_writer (CdcWriter, optional): Writer of CDC rows.
+                Defaults to StorageWriteCdcWriter of the destination table
+                created by start_ingestion.
+            force_full_reload (bool, optional): Whether to perform
+                full ingestion replacing the existing destination table.
+                Defaults to False.
+            job_costs (JobCostLedger, optional): Ledger to record
+                costs of BigQuery jobs to. Defaults to a new ledger.
+        """
+        super().__init__(target_table_name, job_timestamp, job_costs)
+        self.client = bigquery_client if bigquery_client else bigquery.Client()
+        self.project_id = project_id
+        self.dataset_name = dataset_name
+        self.id_field_name = id_field_name
+        self.timestamp_field_name = timestamp_field_name
+        self.has_is_deleted = has_is_deleted
+        self.has_is_archived = has_is_archived
+        self.csv_delimiter = csv_delimiter
+        self.text_encoding = text_encoding
+        self.cdc_writer = cdc_writer
+        self.force_full_reload = force_full_reload
+        self.schema: typing.List[typing.Tuple[str, str]] = []
+        self.target_table_ref = bigquery.TableReference(
+            bigquery.DatasetReference(self.project_id, self.dataset_name),
+            self.target_table_name,
+        )
+        self._ingestion_started = False
+
+        self._retrieve_last_job_timestamp()
+        if force_full_reload and self.last_job_timestamp:
+            logging.info("Forcing full reload of %s.", self.target_table_ref)
+            self.last_job_timestamp = None
+
+    def start_ingestion(self, bq_fields: typing.List[typing.Tuple[str, str]]):
+        """Initializes CDC ingestion:
+            1. Creates the destination table with Id primary key,
+               or extends its schema and adds the primary key if needed.
+            2. Empties an existing destination table on full ingestion.
+            3. Opens the CDC writer.
+
+        Args:
+            bq_fields (typing.List[typing.Tuple[str, str]]): Table schema
+                as a list of tuples (Field Name, BigQuery Type)
+
+        Raises:
+            RuntimeError: thrown if the ingestion was started before,
+                or the destination table has a primary key other than Id.
+        """
+        if self._ingestion_started:
+            raise RuntimeError("Ingestion already started.")
+
+        self.schema = list(bq_fields)
+        # Removed records are deleted, so the destination
+        # doesn't keep IsDeleted and IsArchived.
+        target_fields = [
+            f for f in bq_fields
+            if f[0].lower() not in ["isdeleted", "isarchived",
+                                    self.timestamp_field_name.lower()]
+        ] + [(self.timestamp_field_name, "TIMESTAMP")]
+
+        try:
+            table_obj = self.client.get_table(self.target_table_ref)
+        except NotFound:
+            table_obj = None
+        if table_obj is None:
+            columns = ", ".join(f"{f[0]} {f[1]}" for f in target_fields)
+            self._run_query(
+                f"CREATE TABLE IF NOT EXISTS `{self._target_table()}` "
+                f"({columns}, PRIMARY KEY ({self.id_field_name}) NOT ENFORCED)",
+                JOB_STAGE_MERGE)
+        else:
+            existing_fields = [f.name.lower() for f in table_obj.schema]
+            new_fields = [f for f in target_fields
+                          if f[0].lower() not in existing_fields]
+            if new_fields:
+                table_obj.schema = list(table_obj.schema) + [
+                    bigquery.SchemaField(name=f[0], field_type=f[1])
+                    for f in new_fields]
+                self.client.update_table(table_obj, ["schema"])
+            self._ensure_primary_key(table_obj)
+            if self.full_ingestion:
+                # A table replicated before without CDC, or a forced
+                # full reload, is replaced with the full extraction.
+                self._run_query(f"TRUNCATE TABLE `{self._target_table()}`",
+                                JOB_STAGE_MERGE, STRATEGY_REPLACE)
+
+        if not self.cdc_writer:
+            self.cdc_writer = StorageWriteCdcWriter(
+                self.project_id, self.dataset_name, self.target_table_name)
+        self.cdc_writer.open(target_fields)
+        self._ingestion_started = True
+
+    def _ensure_primary_key(self, table_obj: bigquery.Table):
+        """Declares Id the primary key of an existing destination table,
+        which CDC upserts and deletes require.
+
+        Args:
+            table_obj (bigquery.Table): Destination table.
+
+        Raises:
+            RuntimeError: thrown if the table has another primary key.
+        """
+        constraints = table_obj.table_constraints
+        primary_key = constraints.primary_key if constraints else None
+        if primary_key is None:
+            logging.info("Adding primary key %s to %s.", self.id_field_name,
+                         self.target_table_ref)
+            self._run_query(
+                f"ALTER TABLE `{self._target_table()}` "
+                f"ADD PRIMARY KEY ({self.id_field_name}) NOT ENFORCED",
+                JOB_STAGE_MERGE)
+        elif [c.lower() for c in primary_key.columns] != [
+                self.id_field_name.lower()]:
+            raise RuntimeError(
+                f"Table {self.target_table_ref} has primary key "
+                f"({', '.join(primary_key.columns)}), "
+                f"CDC mode requires ({self.id_field_name}).")
+
+    def load_batch_csv(self,
+                       csv_batch_file: str,
+                       batch_number: typing.Optional[int] = None) -> int:
+        """Writes CSV file rows to the destination table
+        as upserts and deletes. Writing the same batch again
+        applies the same changes.
+
+        Args:
+            csv_batch_file (str): CSV file path.
+            batch_number (int, optional): 1-based number of the result batch
+                in the SFDC job. Defaults to None.
+
+        Returns:
+            int: Number of written rows.
+        """
+        if not self._ingestion_started:
+            raise RuntimeError("CDC sink is not initialized."
+                               "Use start_ingestion first.")
+        logging.info(
+            "Writing a data batch from %s (%i bytes) to BigQuery table %s.",
+            csv_batch_file,
+            Path(csv_batch_file).stat().st_size,
+            self.target_table_ref,
+        )
+
+        removed_fields = []
+        if self.has_is_deleted:
+            removed_fields.append("isdeleted")
+        if self.has_is_archived:
+            removed_fields.append("isarchived")
+        rows = []
+        with open(csv_batch_file, encoding=self.text_encoding,
+                  newline="") as file:
+            reader = csv.reader(file, delimiter=self.csv_delimiter)
+            next(reader, None)
+            for values in reader:
+                # CSV columns follow the schema order.
+                row = {
+                    name: _parse_csv_value(value, bq_type)
+                    for (name, bq_type), value in zip(self.schema, values)
+                }
+                removed = any(row.get(name) for name in [
+                    f[0] for f in self.schema
+                    if f[0].lower() in removed_fields])
+                if removed:
+                    rows.append({self.id_field_name: row[self.id_field_name],
+                                 CHANGE_TYPE_FIELD: CHANGE_DELETE})
+                else:
+                    row[self.timestamp_field_name] = self.job_timestamp
+                    row[CHANGE_TYPE_FIELD] = CHANGE_UPSERT
+                    rows.append(row)
+        self.cdc_writer.write(rows)  # type: ignore
+        logging.info("Done. %i rows were written.", len(rows))
+        return len(rows)
+
+    def finish_ingestion(self, finish_empty_job: bool):
+        """Finalizes CDC ingestion:
+            1. Closes the CDC writer.
+            2. Moves the last replication timestamp to the job timestamp.
+
+        Args:
+            finish_empty_job (bool): True if no rows were ingested.
+        """
+        if not self._ingestion_started:
+            raise RuntimeError(
+                "Nothing to finish. Call start_ingestion first.")
+        self.cdc_writer.close()  # type: ignore
+
+        watermarks_table = self._watermarks_table()
+        self.client.create_table(
+            bigquery.Table(watermarks_table,
+                           schema=[
+                               bigquery.SchemaField("table_name", "STRING"),
+                               bigquery.SchemaField(
+                                   "recordstamp", "TIMESTAMP"),
+                           ]),
+            exists_ok=True)
+        self._run_query(
+            f"""
+            MERGE INTO `{watermarks_table}` AS T
+            USING (SELECT @table_name AS table_name,
+                          @recordstamp AS recordstamp) AS S
+            ON T.table_name = S.table_name
+            WHEN MATCHED THEN UPDATE SET recordstamp = S.recordstamp
+            WHEN NOT MATCHED THEN INSERT (table_name, recordstamp)
+              VALUES (S.table_name, S.recordstamp)
+            """,
+            JOB_STAGE_WATERMARK,
+            query_parameters=[
+                bigquery.ScalarQueryParameter(
+                    "recordstamp", "TIMESTAMP", self.job_timestamp)
+            ])
+        logging.info("Finished ingestion to %s", self.target_table_ref)
+        self._ingestion_started = False
+
+    def _retrieve_last_job_timestamp(self):
+        """Retrieves the last replication timestamp
+        of the destination table from the watermark table.
+        """
+        self.last_job_timestamp = None
+        try:
+            _ = self.client.get_table(self.target_table_ref)
+        except NotFound:
+            logging.info(
+                "Target table '%s' does not exist. It will be created.",
+                self.target_table_ref,
+            )
+            return
+        try:
+            rows = self._run_query(
+                f"SELECT recordstamp FROM `{self._watermarks_table()}` "
+                "WHERE table_name = @table_name",
+                JOB_STAGE_WATERMARK)
+            self.last_job_timestamp = rows[0][0] if rows else None
+        except NotFound:
+            pass
+        if self.last_job_timestamp is None:
+            logging.info("No CDC watermark of '%s'. "
+                         "Performing full ingestion.", self.target_table_ref)
+
+    def _target_table(self) -> str:
+        return (f"{self.project_id}.{self.dataset_name}."
+                f"{self.target_table_name}")
+
+    def _watermarks_table(self) -> str:
+        return (f"{self.project_id}.{self.dataset_name}."
+                f"{CdcSink._WATERMARKS_TABLE_}")
+
+    def _run_query(
+        self,
+        query: str,
+        stage: str,
+        strategy: str = "",
+        query_parameters: typing.Optional[
+            typing.List[bigquery.ScalarQueryParameter]] = None
+    ) -> typing.List[typing.Any]:
+        query_config = (self.client.default_query_job_config or
+                        bigquery.QueryJobConfig())
+        query_config.labels = query_config.labels or {}
+        query_config.labels[CdcSink._JOB_LABEL_KEY] = CdcSink._JOB_LABEL_VALUE
+        query_config.query_parameters = [
+            bigquery.ScalarQueryParameter(
+                "table_name", "STRING", self.target_table_name)
+        ] + (query_parameters or [])
+        query_job = self.client.query(query=query,
+                                      project=self.project_id,
+                                      job_config=query_config)
+        rows = list(query_job.result())
+        self.job_costs.record(stage, query_job, strategy)
+        return rows
@@ -0,0 +1,105 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Cost accounting of BigQuery jobs issued by replication.  """
+
+import threading
+import typing
+
+# Stages of BigQuery jobs.
+# Retrieving the last replication timestamp (watermark).
+JOB_STAGE_WATERMARK = "watermark"
+# Storing SFDC object metadata.
+JOB_STAGE_METADATA = "metadata"
+# Persisting and retrieving SFDC Bulk API jobs for reuse.
+JOB_STAGE_BULK_JOBS = "bulk_jobs"
+# Loading result pages to staging tables.
+JOB_STAGE_LOAD = "load"
+# Joining column group staging tables.
+JOB_STAGE_JOIN = "join"
+# Summarizing staged rows and destination buckets.
+JOB_STAGE_INSPECT = "inspect"
+# Merging staged rows into the destination.
+JOB_STAGE_MERGE = "merge"
+# Backfilling new columns of existing rows.
+JOB_STAGE_BACKFILL = "backfill"
+
+# Merge strategies.
+# Single MERGE statement of a small incremental delta.
+STRATEGY_MERGE = "merge"
+# DELETE and INSERT transaction.
+STRATEGY_TRANSACTION = "transaction"
+# Transaction replacing reconciled or fully reloaded rows.
+STRATEGY_REPLACE = "replace"
+# Full ingestion making the temporary table the destination.
+STRATEGY_PROMOTE = "promote"
+# Appending to the change log.
+STRATEGY_CHANGE_LOG = "change_log"
+
+
+class JobCost(typing.NamedTuple):
+    """Totals of BigQuery jobs."""
+    jobs: int = 0
+    bytes_billed: int = 0
+    bytes_processed: int = 0
+    slot_millis: int = 0
+
+    def __add__(self, other: typing.Any) -> "JobCost":
+        return JobCost(*(a + b for a, b in zip(self, other)))
+
+
+class JobCostLedger:
+    """Costs of BigQuery jobs of a replication
+    by stage and merge strategy."""
+
+    def __init__(self):
+        self._costs: typing.Dict[typing.Tuple[str, str], JobCost] = {}
+        # Column groups load concurrently.
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, job: typing.Any, strategy: str = ""):
+        """Adds a finished job to the ledger.
+
+        Args:
+            stage (str): Job stage, one of JOB_STAGE_* values.
+            job (typing.Any): Finished BigQuery job.
+                Load and copy jobs are not billed and don't report
+                bytes or slot time, so they count as jobs only.
+            strategy (str, optional): Merge strategy of the job,
+                one of STRATEGY_* values. Defaults to "".
+        """
+        cost = JobCost(1,
+                       getattr(job, "total_bytes_billed", 0) or 0,
+                       getattr(job, "total_bytes_processed", 0) or 0,
+                       getattr(job, "slot_millis", 0) or 0)
+        with self._lock:
+            self._costs[(stage, strategy)] = (
+                self._costs.get((stage, strategy), JobCost()) + cost)
+
+    def costs(self) -> typing.Dict[typing.Tuple[str, str], JobCost]:
+        """Returns recorded costs.
+
+        Returns:
+            typing.Dict[typing.Tuple[str, str], JobCost]: job totals
+                by (stage, strategy).
+        """
+        with self._lock:
+            return dict(self._costs)
+
+    def total(self) -> JobCost:
+        """Returns totals of all recorded jobs.
+
+        Returns:
+            JobCost: job totals.
+        """
+        return sum(self.costs().values(), JobCost())
@@ -0,0 +1,353 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Local columnar sink: Parquet files merged with DuckDB.  """
+
+from datetime import datetime, timezone
+import logging
+import os
+from pathlib import Path
+import shutil
+import typing
+
+from .replication_sink import ReplicationSink, StagedModstamps
+
+# BigQuery types of replicated fields -> DuckDB types
+_DUCKDB_TYPES = {
+    "STRING": "VARCHAR",
+    "FLOAT64": "DOUBLE",
+    "INT64": "BIGINT",
+    "BOOL": "BOOLEAN",
+    "DATE": "DATE",
+    "TIME": "TIME",
+    "TIMESTAMP": "TIMESTAMPTZ",
+}
+
+
+def _import_duckdb() -> typing.Any:
+    try:
+        import duckdb  # type: ignore # pylint:disable=import-outside-toplevel
+    except ImportError as ex:
+        raise RuntimeError(
+            "Local Parquet sink requires duckdb package. "
+            "Install it with `pip install duckdb`.") from ex
+    return duckdb
+
+
+def _literal(value: str) -> str:
+    """Makes a DuckDB string literal."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _identifier(name: str) -> str:
+    """Makes a DuckDB quoted identifier."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class LocalParquetSink(ReplicationSink):
+    """Replicates SFDC objects to local Parquet files.
+
+    Every result page is converted to a Parquet file
+    in a temporary directory next to the target file.
+    When ingestion finishes, DuckDB merges staged rows
+    with the target file `{base_path}/{target_table_name}.parquet`
+    and atomically replaces it.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        target_table_name: str,
+        job_timestamp: datetime,
+        id_field_name: str,
+        timestamp_field_name: str,
+        has_is_deleted: bool,
+        has_is_archived: bool,
+        csv_delimiter: str = ",",
+        text_encoding: str = "utf-8",
+        force_full_reload: bool = False,
+    ):
+        """LocalParquetSink constructor.
+
+        Args:
+            base_path (str): Directory of target Parquet files.
+            target_table_name (str): Target Table name.
+            job_timestamp (datetime): Current job start time.
+            id_field_name (str): Name of the Id field.
+            timestamp_field_name (str): Name of the job timestamp field.
+            has_is_deleted (bool): Whether the table has IsDeleted field.
+            has_is_archived (bool): Whether the table has IsArchived field.
+            csv_delimiter (str, optional): The column delimiter used for CSV.
+                                           Defaults to ",".
+            text_encoding (str, optional): CSV text encoding.
+                                           Defaults to "utf-8"
+            force_full_reload (bool, optional): Whether to perform
+                full ingestion replacing the existing target file.
+                Defaults to False.
+        """
+        super().__init__(target_table_name, job_timestamp)
+        duckdb = _import_duckdb()
+        self.base_path = base_path
+        self.id_field_name = id_field_name
+        self.timestamp_field_name = timestamp_field_name
+        self.has_is_deleted = has_is_deleted
+        self.has_is_archived = has_is_archived
+        self.csv_delimiter = csv_delimiter
+        self.text_encoding = text_encoding.lower()
+        self.schema: typing.List[typing.Tuple[str, str]] = []
+        self.target_path = os.path.join(base_path,
+                                        f"{target_table_name}.parquet")
+
+        self._ingestion_started = False
+        self._batch_count = 0
+
+        Path(base_path).mkdir(parents=True, exist_ok=True)
+        self._connection = duckdb.connect()
+        # Timestamps are stored and compared in UTC.
+        self._connection.execute("SET TimeZone='UTC'")
+
+        self._set_job_timestamp(job_timestamp)
+        self._retrieve_last_job_timestamp()
+        if force_full_reload and self.last_job_timestamp:
+            logging.info("Forcing full reload of %s.", self.target_path)
+            self.last_job_timestamp = None
+
+    def _set_job_timestamp(self, job_timestamp: datetime):
+        self.job_timestamp = job_timestamp
+        timestamp_now = int(self.job_timestamp.timestamp() * 1e9)
+        self.staging_path = os.path.join(
+            self.base_path, f"Δ_{self.target_table_name}_{timestamp_now}")
+
+    def resume_job_timestamp(self, job_timestamp: datetime):
+        """Switches ingestion to the timestamp of a previous job
+        which results are being reused.
+        Removes the staging directory left by that job.
+
+        Args:
+            job_timestamp (datetime): Previous job start time.
+
+        Raises:
+            RuntimeError: thrown if the ingestion was started before.
+        """
+        if self._ingestion_started:
+            raise RuntimeError("Ingestion already started.")
+        self._set_job_timestamp(job_timestamp)
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+
+    def start_ingestion(self, bq_fields: typing.List[typing.Tuple[str, str]]):
+        """Initializes local ingestion by creating the staging directory.
+
+        Args:
+            bq_fields (typing.List[typing.Tuple[str, str]]): Table schema
+                as a list of tuples (Field Name, BigQuery Type)
+
+        Raises:
+            RuntimeError: thrown if the ingestion was started before.
+        """
+        if self._ingestion_started:
+            raise RuntimeError("Ingestion already started.")
+        self.schema = list(bq_fields)
+        self._batch_count = 0
+        Path(self.staging_path).mkdir(parents=True, exist_ok=True)
+        self._ingestion_started = True
+
+    def load_batch_csv(self,
+                       csv_batch_file: str,
+                       batch_number: typing.Optional[int] = None) -> int:
+        """Converts CSV file to a Parquet file in the staging directory.
+        Loading the same batch number again replaces its Parquet file.
+
+        Args:
+            csv_batch_file (str): CSV file path.
+            batch_number (int, optional): 1-based number of the result batch
+                in the SFDC job. Defaults to None.
+
+        Returns:
+            int: Number of inserted rows.
+        """
+        if not self._ingestion_started:
+            raise RuntimeError("Local sink is not initialized."
+                               "Use start_ingestion first.")
+
+        self._batch_count += 1
+        part_number = batch_number or self._batch_count
+        part_path = os.path.join(self.staging_path,
+                                 f"part-{part_number:05d}.parquet")
+        logging.info(
+            "Loading a data batch from %s (%i bytes) to %s.",
+            csv_batch_file,
+            Path(csv_batch_file).stat().st_size,
+            part_path,
+        )
+
+        # SFDC returns TIME values with "Z" suffix,
+        # so they are read as text and converted afterwards.
+        read_columns = ", ".join(
+            f"{_literal(name)}: "
+            f"{_literal('VARCHAR' if bq_type == 'TIME' else _DUCKDB_TYPES[bq_type])}"
+            for name, bq_type in self.schema)
+        select_list = ", ".join(
+            f"CAST(rtrim({_identifier(name)}, 'Z') AS TIME) "
+            f"AS {_identifier(name)}"
+            if bq_type == "TIME" else _identifier(name)
+            for name, bq_type in self.schema)
+        encoding = ("" if self.text_encoding in ["utf-8", "utf8"]
+                    else f", encoding={_literal(self.text_encoding)}")
+        row_count = self._connection.execute(
+            f"""
+            COPY (
+                SELECT {select_list}
+                FROM read_csv({_literal(csv_batch_file)},
+                              header=true,
+                              delim={_literal(self.csv_delimiter)},
+                              quote='"',
+                              escape='"',
+                              nullstr='',
+                              columns={{{read_columns}}}{encoding})
+            ) TO {_literal(part_path)} (FORMAT PARQUET)
+            """).fetchone()[0]
+        logging.info("Done. %i rows were added.", row_count)
+        return row_count
+
+    def staged_modstamps(
+            self,
+            mod_stamp_field_name: str) -> typing.Optional[StagedModstamps]:
+        """Summarizes modification timestamps of staged rows.
+        Must be called before finish_ingestion.
+
+        Args:
+            mod_stamp_field_name (str): Name of the modification
+                timestamp field.
+
+        Returns:
+            typing.Optional[StagedModstamps]: modification timestamps,
+                or None if nothing was staged.
+        """
+        if not self._ingestion_started or self._batch_count == 0:
+            return None
+        staged = (f"read_parquet("
+                  f"{_literal(os.path.join(self.staging_path, '*.parquet'))})")
+        mod_stamp_field = _identifier(mod_stamp_field_name)
+        if self.last_job_timestamp:
+            last_job_timestamp_str = self.last_job_timestamp.strftime(
+                "%Y-%m-%d %H:%M:%S.%f")
+            overlap_str = (f"count(*) FILTER ({mod_stamp_field} <= "
+                           f"TIMESTAMPTZ '{last_job_timestamp_str}+00')")
+        else:
+            overlap_str = "0"
+        row = self._connection.execute(
+            f"""
+            SELECT min({mod_stamp_field})::TIMESTAMP,
+                   max({mod_stamp_field})::TIMESTAMP,
+                   make_timestamp(CAST(avg(epoch_us({mod_stamp_field}))
+                                       AS BIGINT)),
+                   {overlap_str}
+            FROM {staged}
+            """).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return StagedModstamps(*(value.replace(tzinfo=timezone.utc)
+                                 for value in row[:3]), row[3])
+
+    def finish_ingestion(self, finish_empty_job: bool):
+        """Finalizes local ingestion:
+            1. Merges staged rows with the target file
+               into a new file, extending the schema if needed.
+            2. Replaces the target file with the new one.
+            3. Deletes the staging directory.
+
+        Args:
+            finish_empty_job (bool): True if no rows were ingested.
+        """
+        if not self._ingestion_started:
+            raise RuntimeError(
+                "Nothing to finish. Call start_ingestion first.")
+
+        logging.info("Committing replicated data to %s", self.target_path)
+
+        recordstamp_str = self.job_timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")
+        target_exists = os.path.exists(self.target_path)
+        # Full ingestion replaces the target file.
+        merge_with_target = target_exists and self.incremental_ingestion
+        id_field = _identifier(self.id_field_name)
+        select_fields_str = ", ".join(
+            _identifier(name) for name, _ in self.schema
+            if name.lower() not in ["isdeleted", "isarchived",
+                                    self.timestamp_field_name.lower()])
+        recordstamp_value = (f"TIMESTAMPTZ '{recordstamp_str}+00' "
+                             f"AS {_identifier(self.timestamp_field_name)}")
+
+        query = None
+        if not finish_empty_job and self._batch_count > 0:
+            staged = (f"read_parquet("
+                      f"{_literal(os.path.join(self.staging_path, '*.parquet'))})")
+            # Rows removed in SFDC
+            removed_conditions = []
+            if self.has_is_deleted:
+                removed_conditions.append("IsDeleted")
+            if self.has_is_archived:
+                removed_conditions.append("IsArchived")
+
+            query = f"SELECT {select_fields_str}, {recordstamp_value} FROM {staged}"
+            if removed_conditions:
+                query += " WHERE " + " AND ".join(
+                    f"NOT coalesce({c}, false)" for c in removed_conditions)
+            if merge_with_target:
+                # Rows that didn't come from SFDC in this replication
+                # stay as they are.
+                query = f"""
+                    SELECT T.* FROM read_parquet({_literal(self.target_path)}) AS T
+                    ANTI JOIN {staged} AS S ON T.{id_field} = S.{id_field}
+                    UNION ALL BY NAME
+                    {query}
+                """
+        elif not merge_with_target:
+            # Creating an empty target file,
+            # or emptying the existing one on full ingestion.
+            query = "SELECT " + ", ".join(
+                f"CAST(NULL AS {_DUCKDB_TYPES[bq_type]}) AS {_identifier(name)}"
+                for name, bq_type in self.schema
+                if name.lower() not in ["isdeleted", "isarchived",
+                                        self.timestamp_field_name.lower()])
+            query += f", {recordstamp_value} WHERE false"
+
+        if query:
+            new_target_path = f"{self.staging_path}.parquet"
+            self._connection.execute(
+                f"COPY ({query}) TO {_literal(new_target_path)} "
+                "(FORMAT PARQUET)")
+            os.replace(new_target_path, self.target_path)
+
+        logging.info("Deleting temporary resources: %s", self.staging_path)
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+
+        logging.info("Finished ingestion to %s", self.target_path)
+        self._ingestion_started = False
+
+    def _retrieve_last_job_timestamp(self):
+        """Retrieves maximum value of record timestamp field
+        from the target file.
+        """
+        if not os.path.exists(self.target_path):
+            logging.info(
+                "Target file '%s' does not exist. It will be created.",
+                self.target_path,
+            )
+            self.last_job_timestamp = None
+            return
+        last_update_timestamp = self._connection.execute(
+            f"SELECT MAX({_identifier(self.timestamp_field_name)})::TIMESTAMP "
+            f"FROM read_parquet({_literal(self.target_path)})").fetchone()[0]
+        self.last_job_timestamp = (
+            last_update_timestamp.replace(tzinfo=timezone.utc)
+            if last_update_timestamp else None)
@@ -0,0 +1,260 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Sampling profiler of replication threads.  """
+
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import typing
+
+STAGE_BIGQUERY = "bigquery"
+STAGE_LOCAL_SINK = "local sink"
+STAGE_SALESFORCE = "salesforce"
+STAGE_TEMP_FILE = "temp file"
+STAGE_GOVERNOR = "api governor"
+STAGE_PROCESSING = "processing"
+STAGE_OTHER = "other"
+
+# Stages in the order of precedence, with path fragments
+# of source files or names of functions that belong to them.
+# A stack belongs to the first stage that any of its frames matches,
+# so BigQuery calls going through requests are still BigQuery calls.
+_STAGE_RULES: typing.List[typing.Tuple[str, typing.List[str], typing.List[str]]] = [
+    (STAGE_BIGQUERY, [os.path.join("google", "cloud", "bigquery"),
+                      os.path.join("google", "api_core"),
+                      os.path.join("google", "resumable_media"),
+                      "bigquery_helper.py"], []),
+    (STAGE_LOCAL_SINK, ["local_sink.py", f"{os.sep}duckdb{os.sep}"], []),
+    (STAGE_SALESFORCE, [f"{os.sep}simple_salesforce{os.sep}",
+                        f"{os.sep}requests{os.sep}",
+                        f"{os.sep}urllib3{os.sep}",
+                        os.path.join("http", "client.py"),
+                        f"{os.sep}ssl.py", f"{os.sep}socket.py",
+                        f"{os.sep}gzip.py"],
+     # Waiting for Bulk API jobs and requesting result pages and blobs
+     # spend their time in salesforce_to_bigquery.py too.
+     ["_bulk_get_records", "_bulk_start_job", "_bulk_delete_job",
+      "_bulk_wait_for_job", "_bulk_job_completed", "_bulk_result_pages",
+      "_rest_get_records", "_request_page", "_request_blob"]),
+    (STAGE_TEMP_FILE, [f"{os.sep}tempfile.py"], []),
+    (STAGE_GOVERNOR, ["api_limit_governor.py"], []),
+    (STAGE_PROCESSING, ["salesforce_to_bigquery.py"], []),
+]
+
+
+class _StageStats:
+    """CPU and wait time of a thread stage."""
+
+    def __init__(self):
+        self.samples = 0
+        self.cpu_seconds = 0.0
+        self.wait_seconds = 0.0
+
+
+class SamplingProfiler:
+    """Samples stacks of all threads at a fixed interval.
+
+    Every sample is attributed to the thread name
+    (replication threads are named after SFDC objects)
+    and to a stage derived from the stack.
+    Time between samples is split into CPU and wait time
+    using per-thread CPU clocks where the platform provides them.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        """SamplingProfiler constructor.
+
+        Args:
+            interval (float, optional): Sampling interval in seconds.
+                Defaults to 0.01.
+        """
+        self.interval = interval
+        self._stacks: typing.Counter[str] = collections.Counter()
+        self._stats: typing.Dict[typing.Tuple[str, str], _StageStats] = (
+            collections.defaultdict(_StageStats))
+        self._hot_frames: typing.Counter[str] = collections.Counter()
+        self._cpu_times: typing.Dict[int, float] = {}
+        self._has_cpu_clocks = hasattr(time, "pthread_getcpuclockid")
+        self._stop_event = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._duration = 0.0
+
+    def start(self):
+        """Starts sampling in a background thread."""
+        self._stop_event.clear()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run,
+                                        name="profiler",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops sampling."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._duration = time.monotonic() - self._started_at
+
+    def _run(self):
+        last_sample = time.monotonic()
+        while not self._stop_event.wait(self.interval):
+            now = time.monotonic()
+            self._sample(now - last_sample)
+            last_sample = now
+
+    def _thread_cpu_time(self, thread: threading.Thread) -> typing.Optional[float]:
+        if not self._has_cpu_clocks:
+            return None
+        try:
+            return time.clock_gettime(
+                time.pthread_getcpuclockid(thread.ident))  # type: ignore
+        except (OSError, OverflowError, TypeError):
+            # Thread has finished.
+            return None
+
+    def _sample(self, elapsed: float):
+        frames = sys._current_frames()  # pylint:disable=protected-access
+        own_ident = threading.get_ident()
+        for thread in threading.enumerate():
+            if thread.ident == own_ident or thread.ident not in frames:
+                continue
+            stack = []
+            frame = frames[thread.ident]
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            stage = _classify(stack)
+            thread_name = thread.name.replace(";", ",")
+
+            cpu_time = self._thread_cpu_time(thread)
+            previous_cpu_time = self._cpu_times.get(thread.ident)  # type: ignore
+            if cpu_time is not None:
+                self._cpu_times[thread.ident] = cpu_time  # type: ignore
+            if cpu_time is not None and previous_cpu_time is not None:
+                cpu_seconds = min(max(cpu_time - previous_cpu_time, 0.0),
+                                  elapsed)
+            else:
+                cpu_seconds = 0.0
+
+            stats = self._stats[(thread_name, stage)]
+            stats.samples += 1
+            stats.cpu_seconds += cpu_seconds
+            stats.wait_seconds += elapsed - cpu_seconds
+
+            frame_names = [_frame_name(code) for code in stack]
+            self._stacks[";".join([thread_name, stage] + frame_names)] += 1
+            if frame_names:
+                self._hot_frames[f"{stage}: {frame_names[-1]}"] += 1
+
+    def write_reports(self,
+                      output_prefix: str,
+                      top_n: int = 20) -> typing.Tuple[str, str]:
+        """Writes collapsed stacks and the summary report.
+
+        Collapsed stacks file can be rendered with flamegraph.pl
+        or speedscope.
+
+        Args:
+            output_prefix (str): Path prefix of report files.
+            top_n (int, optional): Number of entries in the summary
+                top lists. Defaults to 20.
+
+        Returns:
+            typing.Tuple[str, str]: paths of collapsed stacks file
+                and summary file.
+        """
+        collapsed_path = f"{output_prefix}.collapsed"
+        summary_path = f"{output_prefix}.txt"
+        with open(collapsed_path, "w", encoding="utf-8") as file:
+            for stack, count in sorted(self._stacks.items()):
+                file.write(f"{stack} {count}\n")
+        with open(summary_path, "w", encoding="utf-8") as file:
+            file.write(self.format_summary(top_n))
+        logging.info("Profile is written to %s and %s.",
+                     collapsed_path, summary_path)
+        return collapsed_path, summary_path
+
+    def format_summary(self, top_n: int = 20) -> str:
+        """Formats top-N summary of CPU and wait time per stage.
+
+        Args:
+            top_n (int, optional): Number of entries in the top lists.
+                Defaults to 20.
+
+        Returns:
+            str: summary text.
+        """
+        lines = [f"Profiled {self._duration:.1f} seconds, "
+                 f"sampling every {self.interval * 1000:.0f} ms."]
+        if not self._has_cpu_clocks:
+            lines.append("Per-thread CPU clocks are not available, "
+                         "all time is reported as wait time.")
+
+        stage_totals: typing.Dict[str, _StageStats] = (
+            collections.defaultdict(_StageStats))
+        for (_, stage), stats in self._stats.items():
+            stage_totals[stage].samples += stats.samples
+            stage_totals[stage].cpu_seconds += stats.cpu_seconds
+            stage_totals[stage].wait_seconds += stats.wait_seconds
+
+        lines.append("")
+        lines.append("Stages:")
+        lines.append(f"{'Stage':<12}  {'CPU, s':>10}  {'Wait, s':>10}"
+                     f"  {'Samples':>8}")
+        for stage, stats in sorted(
+                stage_totals.items(),
+                key=lambda i: i[1].cpu_seconds + i[1].wait_seconds,
+                reverse=True):
+            lines.append(f"{stage:<12}  {stats.cpu_seconds:>10.2f}"
+                         f"  {stats.wait_seconds:>10.2f}"
+                         f"  {stats.samples:>8}")
+
+        lines.append("")
+        lines.append(f"Top {top_n} threads and stages:")
+        lines.append(f"{'CPU, s':>10}  {'Wait, s':>10}  Thread / stage")
+        for (thread_name, stage), stats in sorted(
+                self._stats.items(),
+                key=lambda i: i[1].cpu_seconds + i[1].wait_seconds,
+                reverse=True)[:top_n]:
+            lines.append(f"{stats.cpu_seconds:>10.2f}"
+                         f"  {stats.wait_seconds:>10.2f}"
+                         f"  {thread_name} / {stage}")
+
+        lines.append("")
+        lines.append(f"Top {top_n} hot frames:")
+        lines.append(f"{'Samples':>8}  Stage: frame")
+        for frame, count in self._hot_frames.most_common(top_n):
+            lines.append(f"{count:>8}  {frame}")
+        return "\n".join(lines) + "\n"
+
+
+def _frame_name(code: typing.Any) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}".replace(";", ",").replace(" ", "_")
+
+
+def _classify(stack: typing.List[typing.Any]) -> str:
+    """Derives replication stage from code objects of a stack."""
+    for stage, path_fragments, function_names in _STAGE_RULES:
+        for code in stack:
+            if (code.co_name in function_names or
+                    any(f in code.co_filename for f in path_fragments)):
+                return stage
+    return STAGE_OTHER
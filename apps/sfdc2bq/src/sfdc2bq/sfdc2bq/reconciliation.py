@@ -0,0 +1,121 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Reconciliation of replicated tables by CreatedDate month buckets.  """
+
+from datetime import datetime, timezone
+import typing
+
+# Records are bucketed by (year, month) of their creation date.
+# None is the bucket of records without a creation date.
+MonthBucket = typing.Optional[typing.Tuple[int, int]]
+
+# Range of creation dates [start, end).
+# (None, None) is the range of records without a creation date.
+CreatedRange = typing.Tuple[typing.Optional[datetime],
+                            typing.Optional[datetime]]
+
+
+class BucketSummary(typing.NamedTuple):
+    """Record count and the newest modification timestamp of a bucket."""
+    count: int
+    max_modstamp: typing.Optional[datetime]
+
+
+def find_drifted_buckets(
+    source: typing.Dict[MonthBucket, BucketSummary],
+    target: typing.Dict[MonthBucket, BucketSummary]
+) -> typing.List[MonthBucket]:
+    """Compares bucket summaries of SFDC object and its destination.
+
+    SOQL can't aggregate hashes, so the newest modification timestamp
+    stands in for a hash of bucket contents: a missed update
+    makes it differ, a missed insert or delete makes the count differ.
+
+    Args:
+        source (typing.Dict[MonthBucket, BucketSummary]): SFDC buckets.
+        target (typing.Dict[MonthBucket, BucketSummary]): destination
+            buckets.
+
+    Returns:
+        typing.List[MonthBucket]: buckets that differ, in order,
+            the bucket of records without a creation date first.
+    """
+    drifted = [
+        bucket for bucket in set(source) | set(target)
+        if source.get(bucket) != target.get(bucket)
+    ]
+    return sorted(drifted, key=lambda b: (b is not None, b))
+
+
+def merge_bucket_ranges(
+        buckets: typing.Iterable[MonthBucket]) -> typing.List[CreatedRange]:
+    """Converts month buckets to creation date ranges,
+    merging adjacent months.
+
+    Args:
+        buckets (typing.Iterable[MonthBucket]): buckets in order.
+
+    Returns:
+        typing.List[CreatedRange]: creation date ranges.
+    """
+    ranges: typing.List[CreatedRange] = []
+    for bucket in buckets:
+        if bucket is None:
+            ranges.append((None, None))
+            continue
+        year, month = bucket
+        start = datetime(year, month, 1, tzinfo=timezone.utc)
+        end = (datetime(year + 1, 1, 1, tzinfo=timezone.utc) if month == 12
+               else datetime(year, month + 1, 1, tzinfo=timezone.utc))
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def soql_range_condition(field_name: str,
+                         ranges: typing.Iterable[CreatedRange]) -> str:
+    """Makes SOQL condition selecting records in creation date ranges.
+
+    Args:
+        field_name (str): creation date field name.
+        ranges (typing.Iterable[CreatedRange]): creation date ranges.
+
+    Returns:
+        str: SOQL condition.
+    """
+    conditions = []
+    for start, end in ranges:
+        if start is None or end is None:
+            conditions.append(f"{field_name}=null")
+        else:
+            conditions.append(
+                f"({field_name}>={start.strftime('%Y-%m-%dT%H:%M:%SZ')} AND "
+                f"{field_name}<{end.strftime('%Y-%m-%dT%H:%M:%SZ')})")
+    return "(" + " OR ".join(conditions) + ")"
+
+
+def format_buckets(buckets: typing.Iterable[MonthBucket]) -> str:
+    """Formats buckets for logging, e.g. "2023-11, 2024-01".
+
+    Args:
+        buckets (typing.Iterable[MonthBucket]): buckets.
+
+    Returns:
+        str: comma-separated buckets.
+    """
+    return ", ".join("no date" if bucket is None
+                     else f"{bucket[0]:04d}-{bucket[1]:02d}"
+                     for bucket in buckets)
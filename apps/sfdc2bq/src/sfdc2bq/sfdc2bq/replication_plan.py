@@ -0,0 +1,205 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Replication planning (dry-run) structures and estimates.  """
+
+from datetime import datetime
+import math
+import typing
+
+# Estimated CSV width of a value for BigQuery types
+# that don't have a length in SFDC object description.
+_FIXED_TYPE_WIDTHS = {
+    "BOOL": 5,
+    "DATE": 10,
+    "TIME": 12,
+    "TIMESTAMP": 24,
+}
+# SFDC Id and reference values are 18 characters long.
+_ID_WIDTH = 18
+# Long text fields are rarely filled up to their limit,
+# so we cap their estimated width.
+_MAX_STRING_WIDTH = 255
+_DEFAULT_NUMBER_WIDTH = 18
+
+STRATEGY_NONE = "none"
+STRATEGY_REST = "REST query"
+STRATEGY_BULK = "Bulk API 2.0"
+
+TARGET_TABLE = "table"
+TARGET_CHANGE_LOG = "change log"
+TARGET_CDC = "CDC"
+TARGET_LOCAL = "local"
+
+
+class ReplicationPlan(typing.NamedTuple):
+    """Estimated replication plan of a single SFDC object."""
+    object_name: str
+    table_name: str
+    # One of TARGET_* values
+    target: str
+    # "full" or "incremental"
+    mode: str
+    last_job_timestamp: typing.Optional[datetime]
+    # Records in the whole object (deleted records excluded).
+    total_records: int
+    # Records to be extracted by this replication.
+    window_records: int
+    row_width_bytes: int
+    window_bytes: int
+    page_size: int
+    page_count: int
+    # Bulk API jobs per replication, one per column group.
+    column_group_count: int
+    strategy: str
+
+
+def estimate_row_width(sfdc_fields: typing.Iterable[typing.Dict[str, typing.Any]],
+                       sfdc_to_bq_field_map: typing.Dict[
+                           str, typing.Tuple[str, str]]) -> int:
+    """Estimates CSV row width of replicated fields in bytes.
+
+    Args:
+        sfdc_fields (typing.Iterable[typing.Dict[str, typing.Any]]):
+            "fields" of SFDC object description.
+        sfdc_to_bq_field_map (typing.Dict[str, typing.Tuple[str, str]]):
+            Salesforce-to-BigQuery field name mapping dictionary.
+
+    Returns:
+        int: estimated row width.
+    """
+    described = {f["name"]: f for f in sfdc_fields}
+    width = 0
+    for name, (_, bq_type) in sfdc_to_bq_field_map.items():
+        field = described.get(name, {})
+        sfdc_type = str(field.get("type", "")).lower()
+        if sfdc_type in ["id", "reference"] or name.endswith(".Type"):
+            value_width = _ID_WIDTH
+        elif bq_type == "STRING":
+            value_width = min(field.get("byteLength") or _MAX_STRING_WIDTH,
+                              _MAX_STRING_WIDTH)
+        elif bq_type == "FLOAT64":
+            # digits, decimal point and sign
+            value_width = (field.get("precision") or _DEFAULT_NUMBER_WIDTH) + 2
+        elif bq_type == "INT64":
+            value_width = (field.get("digits") or _DEFAULT_NUMBER_WIDTH) + 1
+        else:
+            value_width = _FIXED_TYPE_WIDTHS.get(bq_type, _DEFAULT_NUMBER_WIDTH)
+        # One more byte for the column delimiter or the line ending.
+        width += value_width + 1
+    return width
+
+
+def make_plan(object_name: str,
+              table_name: str,
+              target: str,
+              last_job_timestamp: typing.Optional[datetime],
+              total_records: int,
+              window_records: int,
+              row_width_bytes: int,
+              page_size: int,
+              rest_query_max_records: int,
+              column_group_count: int = 1,
+              has_base64_fields: bool = False,
+              fits_rest_query: bool = True) -> ReplicationPlan:
+    """Makes a replication plan out of record counts and row width.
+
+    Replication is planned as a REST query under the same conditions
+    it is performed with one: the replication is incremental,
+    the window is small enough, there are no base64 fields,
+    no column groups, and the query fits a REST API request.
+
+    Args:
+        object_name (str): SFDC object name.
+        table_name (str): target table name.
+        target (str): replication target, one of TARGET_* values.
+        last_job_timestamp (datetime, optional): last replication timestamp,
+            None for full replication.
+        total_records (int): number of records in the object.
+        window_records (int): number of records to replicate.
+        row_width_bytes (int): estimated row width.
+        page_size (int): number of records in one Bulk API result page.
+        rest_query_max_records (int): maximum number of records
+            that makes a REST query a better fit than a Bulk API job.
+        column_group_count (int, optional): number of column groups
+            extracted with separate Bulk API jobs. Defaults to 1.
+        has_base64_fields (bool, optional): whether base64 fields
+            are extracted with the records. Defaults to False.
+        fits_rest_query (bool, optional): whether the query fits
+            a REST API request. Defaults to True.
+
+    Returns:
+        ReplicationPlan: replication plan.
+    """
+    window_bytes = window_records * row_width_bytes
+    page_count = math.ceil(window_records / page_size)
+    if window_records == 0:
+        strategy = STRATEGY_NONE
+    elif (last_job_timestamp is not None and
+          window_records <= rest_query_max_records and
+          column_group_count == 1 and not has_base64_fields and
+          fits_rest_query):
+        strategy = STRATEGY_REST
+    else:
+        strategy = STRATEGY_BULK
+    return ReplicationPlan(
+        object_name=object_name,
+        table_name=table_name,
+        target=target,
+        mode="full" if last_job_timestamp is None else "incremental",
+        last_job_timestamp=last_job_timestamp,
+        total_records=total_records,
+        window_records=window_records,
+        row_width_bytes=row_width_bytes,
+        window_bytes=window_bytes,
+        page_size=page_size,
+        page_count=page_count,
+        column_group_count=column_group_count,
+        strategy=strategy)
+
+
+def _format_bytes(num_bytes: int) -> str:
+    value = float(num_bytes)
+    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+        if value < 1024 or unit == "TiB":
+            break
+        value /= 1024
+    return f"{value:.1f} {unit}"
+
+
+def format_plans(plans: typing.Iterable[ReplicationPlan]) -> str:
+    """Formats replication plans as a text table.
+
+    Args:
+        plans (typing.Iterable[ReplicationPlan]): plans to format.
+
+    Returns:
+        str: text table.
+    """
+    header = ("Object", "Target", "Mode", "Last replication", "Total rows",
+              "Rows", "Row width", "Bytes", "Page size", "Pages",
+              "Column groups", "Strategy")
+    rows = [header]
+    for plan in plans:
+        last_job = (plan.last_job_timestamp.strftime("%Y-%m-%d %H:%M:%S")
+                    if plan.last_job_timestamp else "-")
+        rows.append((plan.object_name, plan.target, plan.mode, last_job,
+                     str(plan.total_records), str(plan.window_records),
+                     str(plan.row_width_bytes),
+                     _format_bytes(plan.window_bytes), str(plan.page_size),
+                     str(plan.page_count), str(plan.column_group_count),
+                     plan.strategy))
+    widths = [max(len(r[i]) for r in rows) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(v.ljust(widths[i]) for i, v in enumerate(r)).rstrip()
+        for r in rows)
@@ -0,0 +1,270 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Destination (sink) interface of SFDC replication.  """
+
+from datetime import datetime, timedelta
+import typing
+
+from .job_costs import JobCostLedger
+from .reconciliation import BucketSummary, CreatedRange, MonthBucket
+
+
+class StagedModstamps(typing.NamedTuple):
+    """Modification timestamps of staged rows."""
+    min_modstamp: datetime
+    max_modstamp: datetime
+    avg_modstamp: datetime
+    # Rows modified before the last replication timestamp,
+    # which the incremental query overlap window caught again.
+    overlap_rows: int
+
+
+class ReplicationSink:
+    """Destination of SFDC object replication.
+
+    A sink receives CSV pages of SFDC query results
+    between start_ingestion and finish_ingestion calls,
+    and keeps the last replication timestamp (watermark)
+    that incremental replications start from.
+    """
+
+    def __init__(self,
+                 target_table_name: str,
+                 job_timestamp: datetime,
+                 job_costs: typing.Optional[JobCostLedger] = None):
+        """ReplicationSink constructor.
+
+        Args:
+            target_table_name (str): Target Table name.
+            job_timestamp (datetime): Current job start time.
+            job_costs (JobCostLedger, optional): Ledger of the sink's
+                BigQuery jobs, for sinks that issue them.
+                Defaults to a new ledger.
+        """
+        self.target_table_name = target_table_name
+        self.job_timestamp = job_timestamp
+        self.last_job_timestamp: typing.Optional[datetime] = None
+        self.job_costs = job_costs if job_costs is not None else JobCostLedger()
+
+    full_ingestion = property(lambda self: self.last_job_timestamp is None)
+    """ Performing full ingestion """
+
+    incremental_ingestion = property(lambda self: not self.full_ingestion)
+    """ Performing incremental ingestion """
+
+    supports_column_groups = False
+    """ Whether column groups can be extracted separately
+        and joined with column_group_sink and join_column_groups """
+
+    supports_reconciliation = False
+    """ Whether the sink implements bucket_summary
+        and replace_created_ranges """
+
+    supports_column_backfill = False
+    """ Whether the sink implements new_target_fields,
+        backfill_sink and backfill_columns """
+
+    def start_ingestion(self, bq_fields: typing.List[typing.Tuple[str, str]]):
+        """Initializes ingestion.
+
+        Args:
+            bq_fields (typing.List[typing.Tuple[str, str]]): Table schema
+                as a list of tuples (Field Name, BigQuery Type)
+        """
+        raise NotImplementedError()
+
+    def load_batch_csv(self,
+                       csv_batch_file: str,
+                       batch_number: typing.Optional[int] = None) -> int:
+        """Loads CSV file into the sink's staging area.
+
+        Args:
+            csv_batch_file (str): CSV file path.
+            batch_number (int, optional): 1-based number of the result batch
+                in the SFDC job. Loading the same batch again
+                must not duplicate its rows. Defaults to None.
+
+        Returns:
+            int: Number of inserted rows.
+        """
+        raise NotImplementedError()
+
+    def loaded_batch_rows(self, batch_number: int) -> typing.Optional[int]:
+        """Checks if a result batch of a resumed job was loaded before.
+        Sinks that don't support resuming always return None.
+
+        Args:
+            batch_number (int): 1-based number of the result batch
+                in the SFDC job.
+
+        Returns:
+            typing.Optional[int]: Number of rows loaded from the batch,
+                or None if the batch needs to be loaded.
+        """
+        return None
+
+    def finish_ingestion(self, finish_empty_job: bool):
+        """Merges staged data into the target and cleans up.
+
+        Args:
+            finish_empty_job (bool): True if no rows were ingested.
+        """
+        raise NotImplementedError()
+
+    def column_group_sink(self, group_index: int) -> "ReplicationSink":
+        """Makes a staging sink of a column group of this ingestion.
+        Only sinks with supports_column_groups implement it.
+
+        Args:
+            group_index (int): 0-based column group index.
+
+        Returns:
+            ReplicationSink: column group sink.
+        """
+        raise NotImplementedError()
+
+    def join_column_groups(self,
+                           group_sinks: typing.List["ReplicationSink"],
+                           join_field_names: typing.List[str]) -> int:
+        """Joins staged column groups into this sink's staging area.
+        Only sinks with supports_column_groups implement it.
+
+        Args:
+            group_sinks (typing.List[ReplicationSink]): column group sinks
+                made with column_group_sink.
+            join_field_names (typing.List[str]): fields to join groups on.
+
+        Returns:
+            int: Number of joined rows.
+        """
+        raise NotImplementedError()
+
+    def new_target_fields(self,
+                          field_names: typing.List[str]) -> typing.List[str]:
+        """Finds fields missing in the target.
+        Only sinks with supports_column_backfill implement it.
+
+        Args:
+            field_names (typing.List[str]): replicated field names.
+
+        Returns:
+            typing.List[str]: fields missing in the target,
+                none if the target doesn't exist.
+        """
+        raise NotImplementedError()
+
+    def backfill_sink(self) -> "ReplicationSink":
+        """Makes a staging sink of a column backfill.
+        Only sinks with supports_column_backfill implement it.
+
+        Returns:
+            ReplicationSink: column backfill sink.
+        """
+        raise NotImplementedError()
+
+    def backfill_columns(self, backfill_sink: "ReplicationSink") -> int:
+        """Updates columns of existing target rows
+        with values staged by a column backfill sink.
+        Only sinks with supports_column_backfill implement it.
+
+        Args:
+            backfill_sink (ReplicationSink): column backfill sink
+                made with backfill_sink.
+
+        Returns:
+            int: Number of updated rows.
+        """
+        raise NotImplementedError()
+
+    def bucket_summary(
+        self, created_field_name: str, mod_stamp_field_name: str
+    ) -> typing.Dict[MonthBucket, BucketSummary]:
+        """Counts destination rows by creation date month,
+        along with their newest modification timestamp.
+        Only sinks with supports_reconciliation implement it.
+
+        Args:
+            created_field_name (str): Creation date field name.
+            mod_stamp_field_name (str): Modification timestamp field name.
+
+        Returns:
+            typing.Dict[MonthBucket, BucketSummary]: bucket summaries.
+        """
+        raise NotImplementedError()
+
+    def replace_created_ranges(self,
+                               created_field_name: str,
+                               ranges: typing.List[CreatedRange]):
+        """Makes finish_ingestion replace destination rows
+        created within ranges with staged rows.
+        Only sinks with supports_reconciliation implement it.
+
+        Args:
+            created_field_name (str): Creation date field name.
+            ranges (typing.List[CreatedRange]): creation date ranges.
+        """
+        raise NotImplementedError()
+
+    def staged_modstamps(
+            self,
+            mod_stamp_field_name: str) -> typing.Optional[StagedModstamps]:
+        """Summarizes modification timestamps of staged rows.
+        Must be called before finish_ingestion.
+        Sinks that can't query staged rows return None.
+
+        Args:
+            mod_stamp_field_name (str): Name of the modification
+                timestamp field in the sink.
+
+        Returns:
+            typing.Optional[StagedModstamps]: modification timestamps,
+                or None if nothing was staged.
+        """
+        return None
+
+    def resume_job_timestamp(self, job_timestamp: datetime):
+        """Switches ingestion to the timestamp of a previous job
+        which results are being reused.
+
+        Args:
+            job_timestamp (datetime): Previous job start time.
+        """
+        self.job_timestamp = job_timestamp
+
+    def store_bulk_job(self, job_id: str, query: str):
+        """Persists SFDC Bulk API job id and query
+        along with the current job timestamp.
+        Sinks that don't support job reuse ignore it.
+
+        Args:
+            job_id (str): SFDC Bulk API job id.
+            query (str): SFDC job query.
+        """
+
+    def retrieve_bulk_jobs(
+        self, max_age: timedelta
+    ) -> typing.List[typing.Tuple[str, str, datetime]]:
+        """Retrieves SFDC Bulk API jobs persisted with store_bulk_job.
+
+        Args:
+            max_age (timedelta): maximum age of jobs to retrieve.
+
+        Returns:
+            typing.List[typing.Tuple[str, str, datetime]]: list of tuples
+                (job id, query, job timestamp).
+        """
+        return []
+
+    def clear_bulk_jobs(self):
+        """Removes SFDC Bulk API jobs persisted with store_bulk_job."""
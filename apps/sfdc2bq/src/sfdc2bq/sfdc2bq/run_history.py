@@ -0,0 +1,666 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Replication run history and regression detection.  """
+
+import collections
+import contextlib
+from datetime import datetime, timezone
+import logging
+import sqlite3
+import statistics
+import threading
+import time
+import typing
+
+from .job_costs import JobCost, JobCostLedger
+from .replication_plan import _format_bytes
+from .replication_sink import StagedModstamps
+
+# BigQuery client library is imported by BigQueryRunHistoryStore.
+if typing.TYPE_CHECKING:
+    from google.cloud import bigquery
+
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+# Starting SFDC Bulk API job and waiting for its results.
+STAGE_EXTRACT = "extract"
+# Downloading result pages.
+STAGE_DOWNLOAD = "download"
+# Loading pages to the sink's staging area.
+STAGE_LOAD = "load"
+# Merging staged rows into the destination.
+STAGE_MERGE = "merge"
+STAGES = [STAGE_EXTRACT, STAGE_DOWNLOAD, STAGE_LOAD, STAGE_MERGE]
+
+RUN_HISTORY_TABLE = "_sfdc_replication_runs"
+COST_TABLE = "_sfdc_replication_costs"
+
+# Run history columns with BigQuery types.
+_COLUMNS: typing.List[typing.Tuple[str, str]] = [
+    ("object_name", "STRING"),
+    ("table_name", "STRING"),
+    ("mode", "STRING"),
+    ("status", "STRING"),
+    ("started_at", "TIMESTAMP"),
+    ("duration_seconds", "FLOAT64"),
+    ("rows", "INT64"),
+    ("result_bytes", "INT64"),
+    ("pages", "INT64"),
+] + [(f"{stage}_seconds", "FLOAT64") for stage in STAGES] + [
+    ("bq_bytes_processed", "INT64"),
+    ("bq_slot_millis", "INT64"),
+    # Newest SFDC modification timestamp of replicated records.
+    ("max_modstamp", "TIMESTAMP"),
+    # Recordstamp minus max_modstamp.
+    ("freshness_lag_seconds", "FLOAT64"),
+    # Time between modification in SFDC and commit to the destination.
+    ("avg_arrival_lag_seconds", "FLOAT64"),
+    ("max_arrival_lag_seconds", "FLOAT64"),
+    # Records caught again by the incremental query overlap window.
+    ("overlap_rows", "INT64"),
+]
+# BigQuery job cost columns with BigQuery types,
+# one row per run, job stage and merge strategy.
+_COST_COLUMNS: typing.List[typing.Tuple[str, str]] = [
+    ("object_name", "STRING"),
+    ("table_name", "STRING"),
+    ("mode", "STRING"),
+    ("started_at", "TIMESTAMP"),
+    ("stage", "STRING"),
+    ("strategy", "STRING"),
+    ("jobs", "INT64"),
+    ("bytes_billed", "INT64"),
+    ("bytes_processed", "INT64"),
+    ("slot_millis", "INT64"),
+]
+_SQLITE_TYPES = {
+    "STRING": "TEXT",
+    "TIMESTAMP": "TEXT",
+    "FLOAT64": "REAL",
+    "INT64": "INTEGER",
+}
+
+# Number of previous runs that make the baseline of the latest run.
+_BASELINE_RUNS = 10
+# Minimum number of previous runs to detect regressions.
+_MIN_BASELINE_RUNS = 3
+# Throughput of runs with fewer rows is dominated by fixed costs.
+_MIN_THROUGHPUT_ROWS = 10000
+
+
+class ReplicationRunStats:
+    """Statistics of a single SFDC object replication.
+
+    Replication fills it in as it goes,
+    so failed replications are recorded too.
+    """
+
+    def __init__(self, object_name: str):
+        """ReplicationRunStats constructor.
+
+        Args:
+            object_name (str): SFDC object name.
+        """
+        self.object_name = object_name
+        self.table_name = ""
+        self.mode = ""
+        self.status = STATUS_RUNNING
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_seconds = 0.0
+        self.rows = 0
+        self.result_bytes = 0
+        self.pages = 0
+        self.stage_seconds: typing.Dict[str, float] = (
+            collections.defaultdict(float))
+        # Costs of BigQuery jobs issued by the replication.
+        self.job_costs = JobCostLedger()
+        self.max_modstamp: typing.Optional[datetime] = None
+        self.freshness_lag_seconds: typing.Optional[float] = None
+        self.avg_arrival_lag_seconds: typing.Optional[float] = None
+        self.max_arrival_lag_seconds: typing.Optional[float] = None
+        self.overlap_rows: typing.Optional[int] = None
+        self._started_monotonic = time.monotonic()
+        # Column groups of an object are extracted concurrently.
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, stage: str):
+        """Context manager that adds its execution time to a stage.
+
+        Args:
+            stage (str): Stage name.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_stage_seconds(stage, time.monotonic() - start)
+
+    def add_stage_seconds(self, stage: str, seconds: float):
+        """Adds time spent outside of stage() to a stage.
+
+        Args:
+            stage (str): Stage name.
+            seconds (float): Time in seconds.
+        """
+        with self._lock:
+            self.stage_seconds[stage] += seconds
+
+    def add_page(self, result_bytes: int):
+        """Accounts for a downloaded result page.
+
+        Args:
+            result_bytes (int): Size of the page.
+        """
+        with self._lock:
+            self.pages += 1
+            self.result_bytes += result_bytes
+
+    def time_iteration(self,
+                       items: typing.Iterable[typing.Any],
+                       stage: str) -> typing.Iterator[typing.Any]:
+        """Iterates over items adding time spent
+        on retrieving every item to a stage.
+
+        Args:
+            items (typing.Iterable[typing.Any]): Items to iterate over.
+            stage (str): Stage name.
+
+        Yields:
+            Iterator[typing.Any]: items.
+        """
+        iterator = iter(items)
+        while True:
+            with self.stage(stage):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def set_freshness(self,
+                      modstamps: StagedModstamps,
+                      recordstamp: datetime,
+                      committed_at: datetime):
+        """Sets freshness lags of replicated records.
+
+        Args:
+            modstamps (StagedModstamps): modification timestamps
+                of replicated records.
+            recordstamp (datetime): replication job timestamp.
+            committed_at (datetime): time when records were committed
+                to the destination.
+        """
+        self.max_modstamp = modstamps.max_modstamp
+        self.freshness_lag_seconds = (
+            recordstamp - modstamps.max_modstamp).total_seconds()
+        self.avg_arrival_lag_seconds = (
+            committed_at - modstamps.avg_modstamp).total_seconds()
+        self.max_arrival_lag_seconds = (
+            committed_at - modstamps.min_modstamp).total_seconds()
+        self.overlap_rows = modstamps.overlap_rows
+
+    def finish(self, status: str):
+        """Sets the final status and the run duration.
+
+        Args:
+            status (str): STATUS_SUCCEEDED or STATUS_FAILED.
+        """
+        self.status = status
+        self.duration_seconds = time.monotonic() - self._started_monotonic
+
+    def as_row(self) -> typing.Dict[str, typing.Any]:
+        """Makes a run history row.
+
+        Returns:
+            typing.Dict[str, typing.Any]: row with run history columns.
+        """
+        bq_total = self.job_costs.total()
+        row = {
+            "object_name": self.object_name,
+            "table_name": self.table_name,
+            "mode": self.mode,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": self.duration_seconds,
+            "rows": self.rows,
+            "result_bytes": self.result_bytes,
+            "pages": self.pages,
+            "bq_bytes_processed": bq_total.bytes_processed,
+            "bq_slot_millis": bq_total.slot_millis,
+            "max_modstamp": (self.max_modstamp.isoformat()
+                             if self.max_modstamp else None),
+            "freshness_lag_seconds": self.freshness_lag_seconds,
+            "avg_arrival_lag_seconds": self.avg_arrival_lag_seconds,
+            "max_arrival_lag_seconds": self.max_arrival_lag_seconds,
+            "overlap_rows": self.overlap_rows,
+        }
+        for stage in STAGES:
+            row[f"{stage}_seconds"] = self.stage_seconds.get(stage, 0.0)
+        return row
+
+    def cost_rows(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Makes BigQuery job cost rows.
+
+        Returns:
+            typing.List[typing.Dict[str, typing.Any]]: rows with
+                job cost columns, one per job stage and merge strategy.
+        """
+        return [{
+            "object_name": self.object_name,
+            "table_name": self.table_name,
+            "mode": self.mode,
+            "started_at": self.started_at.isoformat(),
+            "stage": stage,
+            "strategy": strategy,
+            **cost._asdict(),
+        } for (stage, strategy), cost in sorted(
+            self.job_costs.costs().items())]
+
+
+class RunHistoryStore:
+    """Storage of replication run history."""
+
+    def record(self, stats: ReplicationRunStats):
+        """Appends a run to the history.
+
+        Args:
+            stats (ReplicationRunStats): run statistics.
+        """
+        raise NotImplementedError()
+
+    def fetch_runs(
+        self,
+        since: datetime,
+        object_names: typing.Optional[typing.Iterable[str]] = None
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Retrieves runs ordered by start time.
+
+        Args:
+            since (datetime): Earliest run start time.
+            object_names (typing.Iterable[str], optional): SFDC objects
+                to retrieve runs of. All objects if None.
+
+        Returns:
+            typing.List[typing.Dict[str, typing.Any]]: run history rows.
+        """
+        raise NotImplementedError()
+
+
+class SqliteRunHistoryStore(RunHistoryStore):
+    """Run history in a local SQLite file."""
+
+    def __init__(self, path: str):
+        """SqliteRunHistoryStore constructor.
+
+        Args:
+            path (str): SQLite database file path.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        columns = ", ".join(f"{name} {_SQLITE_TYPES[bq_type]}"
+                            for name, bq_type in _COLUMNS)
+        cost_columns = ", ".join(f"{name} {_SQLITE_TYPES[bq_type]}"
+                                 for name, bq_type in _COST_COLUMNS)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {RUN_HISTORY_TABLE} ({columns})")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {COST_TABLE} ({cost_columns})")
+            # Adding columns missing in histories of earlier versions.
+            existing = {row["name"] for row in self._connection.execute(
+                f"PRAGMA table_info({RUN_HISTORY_TABLE})")}
+            for name, bq_type in _COLUMNS:
+                if name not in existing:
+                    self._connection.execute(
+                        f"ALTER TABLE {RUN_HISTORY_TABLE} "
+                        f"ADD COLUMN {name} {_SQLITE_TYPES[bq_type]}")
+
+    def record(self, stats: ReplicationRunStats):
+        row = stats.as_row()
+        names = [name for name, _ in _COLUMNS]
+        cost_names = [name for name, _ in _COST_COLUMNS]
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT INTO {RUN_HISTORY_TABLE} ({', '.join(names)}) "
+                f"VALUES ({', '.join('?' * len(names))})",
+                [row[name] for name in names])
+            self._connection.executemany(
+                f"INSERT INTO {COST_TABLE} ({', '.join(cost_names)}) "
+                f"VALUES ({', '.join('?' * len(cost_names))})",
+                [[cost_row[name] for name in cost_names]
+                 for cost_row in stats.cost_rows()])
+
+    def fetch_runs(
+        self,
+        since: datetime,
+        object_names: typing.Optional[typing.Iterable[str]] = None
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        query = f"SELECT * FROM {RUN_HISTORY_TABLE} WHERE started_at >= ?"
+        params: typing.List[typing.Any] = [since.isoformat()]
+        if object_names is not None:
+            object_names = [n.lower() for n in object_names]
+            query += (" AND lower(object_name) IN "
+                      f"({', '.join('?' * len(object_names))})")
+            params.extend(object_names)
+        query += " ORDER BY started_at"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        runs = []
+        for row in rows:
+            run = dict(row)
+            run["started_at"] = datetime.fromisoformat(run["started_at"])
+            if run["max_modstamp"]:
+                run["max_modstamp"] = datetime.fromisoformat(
+                    run["max_modstamp"])
+            runs.append(run)
+        return runs
+
+
+class BigQueryRunHistoryStore(RunHistoryStore):
+    """Run history in a BigQuery table partitioned by run start time."""
+
+    def __init__(self,
+                 bq_client: "bigquery.Client",
+                 project_id: str,
+                 dataset_name: str,
+                 table_name: str = RUN_HISTORY_TABLE,
+                 cost_table_name: str = COST_TABLE):
+        """BigQueryRunHistoryStore constructor.
+
+        Args:
+            bq_client (bigquery.Client): BigQuery client.
+            project_id (str): GCP project id.
+            dataset_name (str): Dataset name.
+            table_name (str, optional): Run history table name.
+                Defaults to RUN_HISTORY_TABLE.
+            cost_table_name (str, optional): BigQuery job cost table name.
+                Defaults to COST_TABLE.
+        """
+        self.client = bq_client
+        self.table_id = f"{project_id}.{dataset_name}.{table_name}"
+        self.cost_table_id = f"{project_id}.{dataset_name}.{cost_table_name}"
+        self._tables_created = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _schema(
+        columns: typing.List[typing.Tuple[str, str]]
+    ) -> typing.List["bigquery.SchemaField"]:
+        from google.cloud import bigquery  # pylint:disable=import-outside-toplevel
+        return [bigquery.SchemaField(name, bq_type)
+                for name, bq_type in columns]
+
+    def record(self, stats: ReplicationRunStats):
+        from google.cloud import bigquery  # pylint:disable=import-outside-toplevel
+
+        tables = [(self.table_id, _COLUMNS, [stats.as_row()]),
+                  (self.cost_table_id, _COST_COLUMNS, stats.cost_rows())]
+        with self._lock:
+            if not self._tables_created:
+                for table_id, columns, _ in tables:
+                    table = bigquery.Table(table_id,
+                                           schema=self._schema(columns))
+                    table.time_partitioning = bigquery.TimePartitioning(
+                        type_=bigquery.TimePartitioningType.DAY,
+                        field="started_at")
+                    table.clustering_fields = ["object_name"]
+                    self.client.create_table(table, exists_ok=True)
+                self._tables_created = True
+        for table_id, columns, rows in tables:
+            if not rows:
+                continue
+            # Load job instead of streaming inserts,
+            # so the history can be modified right away.
+            # Histories of earlier versions get new columns.
+            job_config = bigquery.LoadJobConfig(
+                schema=self._schema(columns),
+                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+                schema_update_options=[
+                    bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION])
+            self.client.load_table_from_json(rows,
+                                             table_id,
+                                             job_config=job_config).result()
+
+    def fetch_runs(
+        self,
+        since: datetime,
+        object_names: typing.Optional[typing.Iterable[str]] = None
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        from google.cloud import bigquery  # pylint:disable=import-outside-toplevel
+        from google.cloud.exceptions import NotFound  # pylint:disable=import-outside-toplevel
+
+        query = f"SELECT * FROM `{self.table_id}` WHERE started_at >= @since"
+        params = [bigquery.ScalarQueryParameter("since", "TIMESTAMP", since)]
+        if object_names is not None:
+            query += " AND LOWER(object_name) IN UNNEST(@object_names)"
+            params.append(bigquery.ArrayQueryParameter(
+                "object_names", "STRING", [n.lower() for n in object_names]))
+        query += " ORDER BY started_at"
+        try:
+            rows = self.client.query(
+                query,
+                job_config=bigquery.QueryJobConfig(
+                    query_parameters=params)).result()
+        except NotFound:
+            return []
+        return [dict(row.items()) for row in rows]
+
+
+class Regression(typing.NamedTuple):
+    """Regression of the latest run of an object compared to its baseline."""
+    object_name: str
+    mode: str
+    # "duration" or "throughput"
+    metric: str
+    baseline: float
+    latest: float
+
+
+def find_regressions(runs: typing.Iterable[typing.Dict[str, typing.Any]],
+                     threshold: float) -> typing.List[Regression]:
+    """Compares the latest successful run of every object and mode
+    with the median of previous successful runs.
+
+    Args:
+        runs (typing.Iterable[typing.Dict[str, typing.Any]]): run history
+            rows ordered by start time.
+        threshold (float): relative change that counts as a regression,
+            e.g. 0.5 flags runs 50% slower than the baseline.
+
+    Returns:
+        typing.List[Regression]: regressions.
+    """
+    regressions = []
+    for (object_name, mode), object_runs in _group_runs(runs).items():
+        succeeded = [r for r in object_runs
+                     if r["status"] == STATUS_SUCCEEDED]
+        if len(succeeded) < _MIN_BASELINE_RUNS + 1:
+            continue
+        latest = succeeded[-1]
+        previous = succeeded[-_BASELINE_RUNS - 1:-1]
+
+        baseline_duration = statistics.median(
+            r["duration_seconds"] for r in previous)
+        if latest["duration_seconds"] > baseline_duration * (1 + threshold):
+            regressions.append(Regression(object_name, mode, "duration",
+                                          baseline_duration,
+                                          latest["duration_seconds"]))
+
+        throughputs = [_throughput(r) for r in previous
+                       if r["rows"] >= _MIN_THROUGHPUT_ROWS]
+        if (latest["rows"] >= _MIN_THROUGHPUT_ROWS and
+                len(throughputs) >= _MIN_BASELINE_RUNS):
+            baseline_throughput = statistics.median(throughputs)
+            latest_throughput = _throughput(latest)
+            if latest_throughput < baseline_throughput / (1 + threshold):
+                regressions.append(Regression(object_name, mode, "throughput",
+                                              baseline_throughput,
+                                              latest_throughput))
+    return regressions
+
+
+def format_report(runs: typing.Iterable[typing.Dict[str, typing.Any]],
+                  regressions: typing.Iterable[Regression]) -> str:
+    """Formats run history trends and regressions as text.
+
+    Args:
+        runs (typing.Iterable[typing.Dict[str, typing.Any]]): run history
+            rows ordered by start time.
+        regressions (typing.Iterable[Regression]): regressions
+            returned by find_regressions.
+
+    Returns:
+        str: report text.
+    """
+    header = ("Object", "Mode", "Runs", "Failed", "Last run", "Duration",
+              "Median", "Rows", "Rows/s", "Median rows/s", "Result bytes",
+              "BQ bytes", "BQ slot-s", "Freshness lag", "Arrival lag",
+              "Overlap rows", "Slowest stage")
+    rows = [header]
+    for (object_name, mode), object_runs in _group_runs(runs).items():
+        succeeded = [r for r in object_runs
+                     if r["status"] == STATUS_SUCCEEDED]
+        failed = len(object_runs) - len(succeeded)
+        if not succeeded:
+            rows.append((object_name, mode, str(len(object_runs)),
+                         str(failed)) + ("-",) * (len(header) - 4))
+            continue
+        latest = succeeded[-1]
+        stage_times = {stage: latest.get(f"{stage}_seconds") or 0.0
+                       for stage in STAGES}
+        slowest_stage = max(stage_times, key=stage_times.get)  # type: ignore
+        rows.append((
+            object_name, mode, str(len(object_runs)), str(failed),
+            latest["started_at"].strftime("%Y-%m-%d %H:%M:%S"),
+            f"{latest['duration_seconds']:.1f}s",
+            f"{statistics.median(r['duration_seconds'] for r in succeeded):.1f}s",
+            str(latest["rows"]),
+            f"{_throughput(latest):.0f}",
+            f"{statistics.median(_throughput(r) for r in succeeded):.0f}",
+            _format_bytes(latest["result_bytes"] or 0),
+            _format_bytes(latest["bq_bytes_processed"] or 0),
+            f"{(latest['bq_slot_millis'] or 0) / 1000:.1f}",
+            _format_seconds(latest.get("freshness_lag_seconds")),
+            _format_seconds(latest.get("avg_arrival_lag_seconds")),
+            (str(latest["overlap_rows"])
+             if latest.get("overlap_rows") is not None else "-"),
+            f"{slowest_stage} ({stage_times[slowest_stage]:.1f}s)"))
+    widths = [max(len(r[i]) for r in rows) for i in range(len(header))]
+    lines = ["  ".join(v.ljust(widths[i]) for i, v in enumerate(r)).rstrip()
+             for r in rows]
+
+    regressions = list(regressions)
+    if regressions:
+        lines.append("")
+        lines.append("Regressions:")
+        for regression in regressions:
+            if regression.metric == "duration":
+                lines.append(
+                    f"⚠️ {regression.object_name} ({regression.mode}): "
+                    f"duration {regression.latest:.1f}s vs "
+                    f"{regression.baseline:.1f}s median.")
+            else:
+                lines.append(
+                    f"⚠️ {regression.object_name} ({regression.mode}): "
+                    f"throughput {regression.latest:.0f} rows/s vs "
+                    f"{regression.baseline:.0f} rows/s median.")
+    return "\n".join(lines)
+
+
+def format_cost_summary(
+        runs: typing.Iterable[ReplicationRunStats]) -> str:
+    """Formats costs of BigQuery jobs issued by replication runs
+    by object, job stage and merge strategy,
+    followed by totals by merge strategy.
+
+    Args:
+        runs (typing.Iterable[ReplicationRunStats]): runs.
+
+    Returns:
+        str: cost summary, empty if no BigQuery jobs were issued.
+    """
+    header = ("Object", "Stage", "Strategy", "Jobs", "Billed",
+              "Processed", "Slot s")
+    rows = [header]
+    strategy_totals: typing.Dict[str, JobCost] = collections.defaultdict(
+        JobCost)
+    total = JobCost()
+    for run in sorted(runs, key=lambda r: r.object_name):
+        for (stage, strategy), cost in sorted(run.job_costs.costs().items()):
+            rows.append((run.object_name, stage, strategy or "-",
+                         str(cost.jobs), _format_bytes(cost.bytes_billed),
+                         _format_bytes(cost.bytes_processed),
+                         f"{cost.slot_millis / 1000:.1f}"))
+            if strategy:
+                strategy_totals[strategy] += cost
+            total += cost
+    if len(rows) == 1:
+        return ""
+    widths = [max(len(r[i]) for r in rows) for i in range(len(header))]
+    lines = ["  ".join(v.ljust(widths[i]) for i, v in enumerate(r)).rstrip()
+             for r in rows]
+    for strategy, cost in sorted(strategy_totals.items()):
+        lines.append(f"Merge strategy {strategy}: {cost.jobs} job(s), "
+                     f"{_format_bytes(cost.bytes_billed)} billed, "
+                     f"{cost.slot_millis / 1000:.1f} slot seconds.")
+    lines.append(f"Total: {total.jobs} BigQuery job(s), "
+                 f"{_format_bytes(total.bytes_billed)} billed, "
+                 f"{total.slot_millis / 1000:.1f} slot seconds.")
+    return "\n".join(lines)
+
+
+def record_run(store: typing.Optional[RunHistoryStore],
+               stats: ReplicationRunStats):
+    """Records a run if there is a store.
+    Failing to record a run doesn't fail the replication.
+
+    Args:
+        store (RunHistoryStore, optional): run history store.
+        stats (ReplicationRunStats): run statistics.
+    """
+    if not store:
+        return
+    try:
+        store.record(stats)
+    except Exception:  # pylint:disable=broad-except
+        logging.warning("⚠️ Failed to record replication run of %s.",
+                        stats.object_name, exc_info=True)
+
+
+def _group_runs(
+    runs: typing.Iterable[typing.Dict[str, typing.Any]]
+) -> typing.Dict[typing.Tuple[str, str], typing.List[typing.Dict[str, typing.Any]]]:
+    groups: typing.Dict[typing.Tuple[str, str],
+                        typing.List[typing.Dict[str, typing.Any]]] = (
+        collections.defaultdict(list))
+    for run in runs:
+        groups[(run["object_name"], run["mode"])].append(run)
+    return dict(sorted(groups.items()))
+
+
+def _throughput(run: typing.Dict[str, typing.Any]) -> float:
+    """Rows per second of a run."""
+    return run["rows"] / max(run["duration_seconds"], 0.001)
+
+
+def _format_seconds(seconds: typing.Optional[float]) -> str:
+    """Formats a duration in seconds, "-" if it is unknown."""
+    if seconds is None:
+        return "-"
+    return f"{seconds:.0f}s"
@@ -13,20 +13,430 @@
 # limitations under the License.
 """ This module provides SFDC -> BigQuery extraction code / logic """
 
+from concurrent import futures
+import contextlib
+import csv
 from datetime import datetime, timezone, timedelta
 import json
 import logging
+import io
+import itertools
+import os
+import re
 import tempfile
+import threading
 import time
 import typing
+from urllib.parse import urlencode
 
 from google.cloud import bigquery
 from google.cloud.exceptions import BadRequest
 
+import requests
 from simple_salesforce import Salesforce  # type: ignore
+from simple_salesforce.exceptions import SalesforceError
 from simple_salesforce.util import exception_handler
 
+from .api_limit_governor import ApiLimitGovernor, ReplicationDeferredError
+from .blob_store import BlobStore
 from .bigquery_helper import BigQueryHelper  # pylint:disable=wrong-import-position
+from .job_costs import JOB_STAGE_METADATA, JobCostLedger
+from .cdc_sink import CdcSink
+from .local_sink import LocalParquetSink
+from .reconciliation import (BucketSummary, CreatedRange, MonthBucket,
+                             find_drifted_buckets, format_buckets,
+                             merge_bucket_ranges, soql_range_condition)
+from .replication_plan import (TARGET_CDC, TARGET_CHANGE_LOG, TARGET_LOCAL,
+                               TARGET_TABLE, ReplicationPlan,
+                               estimate_row_width, make_plan)
+from .replication_sink import ReplicationSink
+from .run_history import (STAGE_DOWNLOAD, STAGE_EXTRACT, STAGE_LOAD,
+                          STAGE_MERGE, ReplicationRunStats)
+
+
+class _SfdcObjectFields(typing.NamedTuple):
+    """Replicated fields and properties of an SFDC object."""
+    # Original SFDC field name -> (BigQuery field name, BigQuery type)
+    sfdc_to_bq_field_map: typing.Dict[str, typing.Tuple[str, str]]
+    # Field list for SELECT query
+    source_fields: typing.List[str]
+    mod_stamp_name: str
+    has_is_deleted: bool
+    has_is_archived: bool
+    has_created_date: bool
+    # base64 fields among source fields
+    blob_fields: typing.List[str]
+
+
+def _is_transient_error(ex: Exception) -> bool:
+    """Checks if a Salesforce request failed with an error
+    that may not happen again."""
+    if isinstance(ex, (requests.exceptions.ConnectionError,
+                       requests.exceptions.Timeout,
+                       requests.exceptions.ChunkedEncodingError)):
+        return True
+    return isinstance(ex, SalesforceError) and ex.status >= 500
+
+
+class _ResultPage:
+    """One page (locator) of Salesforce Bulk API 2.0 query results.
+
+    Iterating over a page requests its content and yields CSV chunks.
+    A page can be iterated again to retry retrieving it.
+    """
+
+    def __init__(self,
+                 sfdc_connection: Salesforce,
+                 job_id: str,
+                 locator: typing.Optional[str],
+                 text_encoding: str):
+        self.sfdc_connection = sfdc_connection
+        self.job_id = job_id
+        self.locator = locator
+        self.text_encoding = text_encoding
+        # Locator of the next page, known after the page is requested.
+        self.next_locator: typing.Optional[str] = None
+
+    def __iter__(self) -> typing.Iterator[str]:
+        yield from self._request_page(read_content=True)
+
+    def skip(self):
+        """Requests the page to get the next locator
+        without retrieving the content."""
+        for _ in self._request_page(read_content=False):
+            pass
+
+    def _request_page(self, read_content: bool) -> typing.Iterator[str]:
+        job_status_path = f"jobs/query/{self.job_id}"
+        while True:
+            headers = self.sfdc_connection.headers.copy()
+            headers["Accept"] = "text/csv"
+            headers["Accept-Encoding"] = "gzip"
+            result_path = (
+                f"jobs/query/{self.job_id}/results?maxRecords="
+                f"{SalesforceToBigquery._MAX_RECORDS_PER_BULK_BATCH_}")
+            if self.locator:
+                result_path += f"&locator={self.locator}"
+            with self.sfdc_connection.session.request(
+                    "GET",
+                    f"{self.sfdc_connection.base_url}{result_path}",
+                    headers=headers,
+                    stream=True,
+            ) as result_response:
+                if result_response.status_code == 401:
+                    # Auth token might have expired,
+                    # Let simple-salesforce renew it
+                    # by performing a restful call on the job status
+                    self.sfdc_connection.restful(path=job_status_path,
+                                                 method="GET")
+                    continue
+                elif result_response.status_code >= 300:
+                    # Error codes >= 300 mean an error,
+                    # except when it's 404 and the locator is not None.
+                    # It such cases, job has been deleted,
+                    # and there is nothing more to get.
+                    if (result_response.status_code == 404 and
+                            self.locator is not None):
+                        logging.warning(
+                            "⚠️ SFDC Bulk API 2.0 job %s was deleted.",
+                            self.job_id)
+                        self.next_locator = "null"
+                        return
+                    else:
+                        # Let simple-salesforce handle it.
+                        exception_handler(result_response, name=result_path)
+                else:
+                    if "Sforce-Locator" in result_response.headers:
+                        self.next_locator = result_response.headers[
+                            "Sforce-Locator"]
+                    else:
+                        # No locator means there is only one set of results,
+                        # but we explicitly assign if to a special "null" value
+                        # because this is what's returned when the last set
+                        # was retrieved in the multiple-batch situation.
+                        self.next_locator = "null"
+                    if read_content:
+                        result_response.encoding = self.text_encoding
+                        yield from result_response.iter_content(
+                            chunk_size=(
+                                SalesforceToBigquery._CSV_STREAM_CHUNK_SIZE_),
+                            decode_unicode=True)
+                    return
+
+
+class _RestResultPage:
+    """One page of Salesforce REST API query results as CSV content
+    in the format of Bulk API 2.0 results.
+
+    Iterating over a page requests its records and yields CSV chunks.
+    A page can be iterated again to retry retrieving it.
+    """
+
+    # REST API datetime values end with +0000, Bulk API ones with Z.
+    _DATETIME_OFFSET_RE_ = re.compile(
+        r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?)\+0000$")
+
+    def __init__(self,
+                 sfdc_connection: Salesforce,
+                 query: str,
+                 records_url: typing.Optional[str],
+                 include_deleted: bool,
+                 field_names: typing.List[str],
+                 csv_delimiter: str,
+                 api_governor: typing.Optional[ApiLimitGovernor] = None,
+                 timestamp_fields: typing.Optional[
+                     typing.Iterable[str]] = None):
+        self.sfdc_connection = sfdc_connection
+        self.query = query
+        # URL of the page's records, None for the first page.
+        self.records_url = records_url
+        self.include_deleted = include_deleted
+        self.field_names = field_names
+        self.csv_delimiter = csv_delimiter
+        self.api_governor = api_governor
+        # Only values of fields replicated as TIMESTAMP are datetimes.
+        self.timestamp_fields = set(timestamp_fields or [])
+        # URL of the next page, known after the page is requested.
+        self.next_records_url: typing.Optional[str] = None
+
+    def __iter__(self) -> typing.Iterator[str]:
+        records = self._request_page()
+        content = io.StringIO()
+        writer = csv.writer(content,
+                            delimiter=self.csv_delimiter,
+                            lineterminator="\n")
+        writer.writerow(self.field_names)
+        for record in records:
+            writer.writerow([
+                self._csv_value(self._field_value(record, name),
+                                name in self.timestamp_fields)
+                for name in self.field_names
+            ])
+        yield content.getvalue()
+
+    def skip(self):
+        """Requests the page to get the next page URL."""
+        self._request_page()
+
+    def _request_page(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        # simple-salesforce renews expired auth tokens.
+        if self.records_url is None:
+            result = self.sfdc_connection.query(
+                self.query, include_deleted=self.include_deleted)
+        else:
+            result = self.sfdc_connection.query_more(
+                self.records_url,
+                identifier_is_url=True,
+                include_deleted=self.include_deleted)
+        if self.api_governor:
+            self.api_governor.update_from_connection(self.sfdc_connection)
+        self.next_records_url = (None if result["done"]
+                                 else result["nextRecordsUrl"])
+        return result["records"]
+
+    @staticmethod
+    def _field_value(record: typing.Dict[str, typing.Any],
+                     field_name: str) -> typing.Any:
+        """Gets value of a field, such as Owner.Type, from a JSON record."""
+        value: typing.Any = record
+        for name in field_name.split("."):
+            if not value:
+                return None
+            if name not in value:
+                # Field names are case-insensitive.
+                name = next((k for k in value if k.lower() == name.lower()),
+                            name)
+            value = value.get(name)
+        return value
+
+    @staticmethod
+    def _csv_value(value: typing.Any, timestamp: bool = False) -> str:
+        """Formats a JSON value as a Bulk API CSV value."""
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, str) and timestamp:
+            return _RestResultPage._DATETIME_OFFSET_RE_.sub(r"\1Z", value)
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return str(value)
+
+
+class _ChunkStream(io.RawIOBase):
+    """Readable binary stream over an iterator of byte chunks."""
+
+    def __init__(self, chunks: typing.Iterator[bytes]):
+        self._chunks = chunks
+        self._chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: typing.Any) -> int:
+        while not self._chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+
+class _BlobLane:
+    """Retrieves base64 fields of records in result pages
+    with concurrent REST API requests and puts them to a blob store.
+
+    Bulk API results don't include base64 fields,
+    so every page gets columns with URIs of its records' blobs.
+    """
+
+    def __init__(self,
+                 sfdc_connection: Salesforce,
+                 api_name: str,
+                 blob_fields: typing.List[str],
+                 blob_store: BlobStore,
+                 csv_delimiter: str,
+                 text_encoding: str):
+        self.sfdc_connection = sfdc_connection
+        self.api_name = api_name
+        self.blob_fields = blob_fields
+        self.blob_store = blob_store
+        self.csv_delimiter = csv_delimiter
+        self.text_encoding = text_encoding
+
+    @staticmethod
+    def uri_field_name(field_name: str) -> str:
+        """Name of the column with URIs of a base64 field blobs."""
+        return f"{field_name}{SalesforceToBigquery._BLOB_URI_SUFFIX_}"
+
+    def offload(self, file: typing.TextIO) -> int:
+        """Retrieves blobs of records in a CSV page
+        and appends columns with their URIs to the page.
+
+        Args:
+            file (typing.TextIO): CSV page file written
+                with _write_batch_to_file.
+
+        Returns:
+            int: Number of stored blobs.
+        """
+        file.flush()
+        # Records are kept as they are, so their values
+        # are loaded exactly as if they were not rewritten.
+        records = []
+        with open(file.name, encoding=self.text_encoding, newline="") as page:
+            record = ""
+            quotes = 0
+            for line in page:
+                record += line
+                quotes += line.count('"')
+                # Line breaks in quoted values don't end a record.
+                if quotes % 2 == 0:
+                    records.append(record.rstrip("\r\n"))
+                    record = ""
+                    quotes = 0
+            if record:
+                records.append(record.rstrip("\r\n"))
+        if not records:
+            return 0
+
+        header = next(csv.reader([records[0]], delimiter=self.csv_delimiter))
+        id_index = header.index("Id")
+        record_ids = [
+            next(csv.reader([r], delimiter=self.csv_delimiter))[id_index]
+            for r in records[1:]
+        ]
+        with futures.ThreadPoolExecutor(
+                max_workers=SalesforceToBigquery._MAX_CONCURRENT_BLOB_REQUESTS_,
+                thread_name_prefix=threading.current_thread().name) as pool:
+            uris = {
+                field: list(pool.map(self._offload_blob, record_ids,
+                                     [field] * len(record_ids)))
+                for field in self.blob_fields
+            }
+
+        file.seek(0)
+        file.truncate()
+        file.write(records[0])
+        for field in self.blob_fields:
+            file.write(f"{self.csv_delimiter}{self.uri_field_name(field)}")
+        file.write("\n")
+        for index, record in enumerate(records[1:]):
+            file.write(record)
+            for field in self.blob_fields:
+                uri = uris[field][index]
+                file.write(self.csv_delimiter + (f'"{uri}"' if uri else ""))
+            file.write("\n")
+        file.flush()
+        return sum(1 for field_uris in uris.values()
+                   for uri in field_uris if uri)
+
+    def _offload_blob(self,
+                      record_id: str,
+                      field_name: str) -> typing.Optional[str]:
+        """Puts field content of a record to the blob store.
+
+        Returns:
+            typing.Optional[str]: blob URI, None if the field is empty.
+        """
+        blob_path = f"sobjects/{self.api_name}/{record_id}/{field_name}"
+        attempt = 1
+        while True:
+            try:
+                return self._request_blob(blob_path, record_id, field_name)
+            except Exception as ex:  # pylint:disable=broad-except
+                if (attempt >= SalesforceToBigquery._MAX_BATCH_ATTEMPTS_
+                        or not _is_transient_error(ex)):
+                    raise
+                time.sleep(SalesforceToBigquery._BATCH_RETRY_DELAY_ *
+                           2**(attempt - 1))
+                attempt += 1
+
+    def _request_blob(self,
+                      blob_path: str,
+                      record_id: str,
+                      field_name: str) -> typing.Optional[str]:
+        """Streams field content of a record to the blob store
+        without holding it in memory.
+
+        Returns:
+            typing.Optional[str]: blob URI, None if the field is empty.
+        """
+        while True:
+            with self.sfdc_connection.session.request(
+                    "GET",
+                    f"{self.sfdc_connection.base_url}{blob_path}",
+                    headers=self.sfdc_connection.headers,
+                    stream=True,
+            ) as response:
+                if response.status_code == 401:
+                    # Let simple-salesforce renew the auth token.
+                    self.sfdc_connection.restful(
+                        path=f"sobjects/{self.api_name}/{record_id}",
+                        params={"fields": "Id"})
+                    continue
+                if response.status_code == 404:
+                    # Empty field.
+                    return None
+                if response.status_code >= 300:
+                    exception_handler(response, name=blob_path)
+                # Decoded content arrives in chunks
+                # and is written to the store as it arrives.
+                chunks = response.iter_content(
+                    chunk_size=SalesforceToBigquery._BLOB_STREAM_CHUNK_SIZE_)
+                first_chunk = next(chunks, b"")
+                if not first_chunk:
+                    return None
+                content = io.BufferedReader(
+                    _ChunkStream(itertools.chain([first_chunk], chunks)),
+                    SalesforceToBigquery._BLOB_STREAM_CHUNK_SIZE_)
+                return self.blob_store.put(self.api_name, field_name,
+                                           record_id, content)
 
 
 class SalesforceToBigquery:
@@ -35,7 +445,33 @@ class SalesforceToBigquery:
     _MAX_RECORDS_PER_BULK_BATCH_ = 100000
     _CSV_STREAM_CHUNK_SIZE_ = 1024*1024
     _RECORD_STAMP_NAME_ = "Recordstamp"
+    _ROW_HASH_NAME_ = "RowHash"
+    # Offloaded base64 fields are replaced with "{field}_BlobUri" columns.
+    _BLOB_URI_SUFFIX_ = "_BlobUri"
+    _MAX_CONCURRENT_BLOB_REQUESTS_ = 8
+    _BLOB_STREAM_CHUNK_SIZE_ = 1024 * 1024
+    # Reconciliation buckets records by month of this field.
+    _CREATED_DATE_NAME_ = "CreatedDate"
+    # SFDC updates SystemModstamp without changing any replicated field,
+    # so it doesn't participate in the row hash.
+    _ROW_HASH_EXCLUDED_FIELDS_ = ["SystemModstamp"]
     _SFDC_METADATA_TABLE = "_sfdc_metadata"
+    # Maximum number of records returned by one REST query call.
+    # Incremental deltas of up to this size are extracted
+    # with REST queries instead of a Bulk API job.
+    _REST_QUERY_MAX_RECORDS_ = 2000
+    # REST queries are sent as GET query strings,
+    # and SFDC rejects longer URIs.
+    _MAX_REST_URI_LENGTH_ = 16384
+    # Completed Bulk API 2.0 query jobs are kept by SFDC for 7 days.
+    _BULK_JOB_RETENTION_ = timedelta(days=7)
+    # Retrieving a batch of Bulk API results is retried
+    # with exponential backoff starting from _BATCH_RETRY_DELAY_ seconds.
+    _MAX_BATCH_ATTEMPTS_ = 5
+    _BATCH_RETRY_DELAY_ = 5.0
+    # Maximum length of SOQL query.
+    _MAX_SOQL_LENGTH_ = 100000
+    _MAX_CONCURRENT_COLUMN_GROUPS_ = 4
 
     @staticmethod
     def replicate(simple_sf_connection: Salesforce,
@@ -49,7 +485,21 @@ class SalesforceToBigquery:
                       bool, typing.Iterable[str]] = False,
                   exclude_standard_fields: typing.Optional[typing.Iterable[str]] = None,
                   store_metadata: bool = False,
-                  csv_delimiter: str = "COMMA") -> None:
+                  csv_delimiter: str = "COMMA",
+                  row_hash: bool = False,
+                  reuse_bulk_jobs: bool = False,
+                  api_governor: typing.Optional[ApiLimitGovernor] = None,
+                  low_priority: bool = False,
+                  local_sink_path: typing.Optional[str] = None,
+                  change_log: bool = False,
+                  force_full_reload: bool = False,
+                  run_stats: typing.Optional[ReplicationRunStats] = None,
+                  column_group_size: typing.Optional[int] = None,
+                  reconcile: bool = False,
+                  backfill_new_fields: bool = False,
+                  blob_store: typing.Optional[BlobStore] = None,
+                  cdc: bool = False
+                  ) -> None:
         """Method to extract data from Salesforce to BigQuery
 
         Args:
@@ -69,6 +519,156 @@ class SalesforceToBigquery:
             csv_delimiter (str, optional): The column delimiter used for CSV when
                                            exporting from Salesforce and loading
                                            to BigQuery. Defaults to "COMMA".
+            row_hash (bool, optional): Whether to keep a hash of replicated
+                                       fields in the destination table,
+                                       and skip rows with unchanged content
+                                       when merging. Defaults to False.
+            reuse_bulk_jobs (bool, optional): Whether to persist SFDC Bulk API
+                                              jobs and reuse their results
+                                              if the previous replication
+                                              with an identical query failed.
+                                              Defaults to False.
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor
+                                                       shared by concurrent
+                                                       replications.
+                                                       Defaults to None.
+            low_priority (bool, optional): Whether the object may be deferred
+                                           when SFDC API budget is low.
+                                           Defaults to False.
+            local_sink_path (str, optional): Directory to replicate to
+                                             as local Parquet files
+                                             instead of BigQuery.
+                                             Files are placed in
+                                             `dataset_name` subdirectory.
+                                             Defaults to None.
+            change_log (bool, optional): Whether to append replicated rows,
+                                         including deleted ones, to
+                                         `{output_table_name}_changelog`
+                                         table and expose the current state
+                                         as `{output_table_name}` view
+                                         instead of merging. Defaults to False.
+            force_full_reload (bool, optional): Whether to replicate all
+                                                records replacing the existing
+                                                destination.
+                                                Defaults to False.
+            run_stats (ReplicationRunStats, optional): Run statistics
+                                                       to fill in.
+                                                       Defaults to None.
+            column_group_size (int, optional): Maximum number of fields
+                                               extracted by one SFDC Bulk API
+                                               job. Objects with more fields
+                                               are split into column groups
+                                               extracted concurrently
+                                               and joined on Id.
+                                               Objects which query exceeds
+                                               SOQL length limit are always
+                                               split. Defaults to None.
+            reconcile (bool, optional): Whether to compare record counts
+                                        and newest modification timestamps
+                                        by CreatedDate month between SFDC
+                                        and the destination table,
+                                        and replace only months that differ
+                                        with their SFDC state as of
+                                        the last replication, instead of
+                                        replicating changed records.
+                                        Defaults to False.
+            backfill_new_fields (bool, optional): Whether to backfill
+                                                  fields missing in
+                                                  the existing destination
+                                                  table for all records
+                                                  with a separate SFDC
+                                                  Bulk API job extracting
+                                                  only Id and these fields.
+                                                  Defaults to False.
+            blob_store (BlobStore, optional): Store to put contents
+                                              of base64 fields to.
+                                              These fields are retrieved
+                                              separately from other fields,
+                                              and the destination table
+                                              gets `{field}_BlobUri`
+                                              columns instead of them.
+                                              Defaults to None.
+            cdc (bool, optional): Whether to write replicated rows
+                                  directly to the destination table
+                                  with Id primary key as BigQuery CDC
+                                  upserts and deletes, without
+                                  a temporary table and a merge.
+                                  Defaults to False.
+
+        Raises:
+            ReplicationDeferredError: replication was deferred
+                because of low SFDC API budget.
+        """
+        replication = SalesforceToBigquery.submit(
+            simple_sf_connection=simple_sf_connection,
+            api_name=api_name,
+            bq_client=bq_client,
+            project_id=project_id,
+            dataset_name=dataset_name,
+            output_table_name=output_table_name,
+            text_encoding=text_encoding,
+            include_non_standard_fields=include_non_standard_fields,
+            exclude_standard_fields=exclude_standard_fields,
+            store_metadata=store_metadata,
+            csv_delimiter=csv_delimiter,
+            row_hash=row_hash,
+            reuse_bulk_jobs=reuse_bulk_jobs,
+            api_governor=api_governor,
+            low_priority=low_priority,
+            local_sink_path=local_sink_path,
+            change_log=change_log,
+            force_full_reload=force_full_reload,
+            run_stats=run_stats,
+            column_group_size=column_group_size,
+            reconcile=reconcile,
+            backfill_new_fields=backfill_new_fields,
+            blob_store=blob_store,
+            cdc=cdc)
+        if replication:
+            replication.wait()
+            replication.complete()
+
+    @staticmethod
+    def submit(simple_sf_connection: Salesforce,
+               api_name: str,
+               bq_client: bigquery.Client,
+               project_id: str,
+               dataset_name: str,
+               output_table_name: typing.Optional[str] = None,
+               text_encoding: str = "utf-8",
+               include_non_standard_fields: typing.Union[
+                   bool, typing.Iterable[str]] = False,
+               exclude_standard_fields: typing.Optional[typing.Iterable[str]] = None,
+               store_metadata: bool = False,
+               csv_delimiter: str = "COMMA",
+               row_hash: bool = False,
+               reuse_bulk_jobs: bool = False,
+               api_governor: typing.Optional[ApiLimitGovernor] = None,
+               low_priority: bool = False,
+               local_sink_path: typing.Optional[str] = None,
+               change_log: bool = False,
+               force_full_reload: bool = False,
+               run_stats: typing.Optional[ReplicationRunStats] = None,
+               column_group_size: typing.Optional[int] = None,
+               reconcile: bool = False,
+               backfill_new_fields: bool = False,
+               blob_store: typing.Optional[BlobStore] = None,
+               cdc: bool = False
+               ) -> typing.Optional["SubmittedReplication"]:
+        """Prepares replication of a Salesforce object to BigQuery
+        and submits its SFDC Bulk API 2.0 jobs without waiting
+        for them to complete.
+
+        Args:
+            See replicate.
+
+        Returns:
+            SubmittedReplication: replication to complete once its jobs
+                complete, or None if the destination is in sync with SFDC.
+
+        Raises:
+            ReplicationDeferredError: replication was deferred
+                because of low SFDC API budget.
         """
 
         logging.info(
@@ -82,6 +682,15 @@ class SalesforceToBigquery:
         # implications of SFDC timestamp resolution of 1 second.
         recordstamp = datetime.now(timezone.utc) - timedelta(seconds=1)
 
+        if api_governor:
+            api_governor.refresh_limits(simple_sf_connection)
+            if api_governor.should_defer(low_priority):
+                logging.warning(
+                    "⚠️ Deferring replication of low-priority object %s "
+                    "because of low SFDC API budget.", api_name)
+                raise ReplicationDeferredError(
+                    f"Replication of {api_name} was deferred.")
+
         logging.info("Retrieving and parsing source object description")
         desc = simple_sf_connection.restful(f"sobjects/{api_name}/describe/")
         if not output_table_name:
@@ -89,6 +698,528 @@ class SalesforceToBigquery:
 
         logging.info("Target table: `%s.%s.%s`", project_id,
                      dataset_name, output_table_name)
+        if run_stats:
+            run_stats.table_name = output_table_name  # type: ignore
+        object_fields = SalesforceToBigquery._parse_object_description(
+            api_name, desc,  # type: ignore
+            include_non_standard_fields, exclude_standard_fields)
+        sfdc_to_bq_field_map = object_fields.sfdc_to_bq_field_map
+        source_fields = object_fields.source_fields
+        mod_stamp_name = object_fields.mod_stamp_name
+        has_is_deleted = object_fields.has_is_deleted
+        has_is_archived = object_fields.has_is_archived
+
+        # Base64 fields are retrieved separately by _BlobLane.
+        blob_fields = object_fields.blob_fields if blob_store else []
+        if blob_fields:
+            logging.info("Offloading base64 fields to the blob store: %s",
+                         ", ".join(blob_fields))
+            source_fields = [f for f in source_fields if f not in blob_fields]
+            sfdc_to_bq_field_map = {f: sfdc_to_bq_field_map[f]
+                                    for f in source_fields}
+            for f in blob_fields:
+                uri_field = _BlobLane.uri_field_name(f)
+                sfdc_to_bq_field_map[uri_field] = (uri_field, "STRING")
+
+        target_id_field = "Id"  # Id field name in the destination BQ table
+
+        # sfdc_to_bq_field_map and source_fields are initialized at this point
+
+        if store_metadata and local_sink_path:
+            logging.warning(
+                "⚠️ SFDC object metadata is not stored by the local sink.")
+        elif store_metadata:
+            SalesforceToBigquery._store_metadata(
+                bq_client=bq_client,
+                project_id=project_id,
+                dataset_id=dataset_name,
+                object_name=desc["name"],  # type: ignore
+                output_table_name=output_table_name,  # type: ignore
+                metadata=desc,  # type: ignore
+                job_costs=run_stats.job_costs if run_stats else None)
+
+        if csv_delimiter == "COMMA":
+            csv_delimiter_bq = ","
+        elif csv_delimiter == "TAB":
+            csv_delimiter_bq = "\t"
+        elif csv_delimiter == "PIPE":
+            csv_delimiter_bq = "|"
+        elif csv_delimiter == "SEMICOLON":
+            csv_delimiter_bq = ";"
+        elif csv_delimiter == "BACKQUOTE":
+            csv_delimiter_bq = "`"
+        elif csv_delimiter == "CARET":
+            csv_delimiter_bq = "^"
+        else:
+            csv_delimiter_bq = ","
+
+        blob_lane = (_BlobLane(simple_sf_connection, api_name, blob_fields,
+                               blob_store, csv_delimiter_bq,  # type: ignore
+                               text_encoding)
+                     if blob_fields else None)
+
+        try:
+            sink = SalesforceToBigquery._create_sink(
+                bq_client=bq_client,
+                project_id=project_id,
+                dataset_name=dataset_name,
+                output_table_name=output_table_name,  # type: ignore
+                recordstamp=recordstamp,
+                has_is_deleted=has_is_deleted,
+                has_is_archived=has_is_archived,
+                csv_delimiter=csv_delimiter_bq,
+                text_encoding=text_encoding,
+                row_hash=row_hash,
+                local_sink_path=local_sink_path,
+                change_log=change_log,
+                force_full_reload=force_full_reload,
+                cdc=cdc,
+                job_costs=run_stats.job_costs if run_stats else None)
+
+            include_deleted = sink.incremental_ingestion
+            if run_stats:
+                run_stats.mode = ("incremental" if sink.incremental_ingestion
+                                  else "full")
+            column_list = ",".join(source_fields)
+
+            last_record_stamp = sink.last_job_timestamp
+            query_filter = None
+            if reconcile:
+                reconcile_ranges = SalesforceToBigquery._reconcile_ranges(
+                    simple_sf_connection, sink, api_name, source_fields,
+                    sfdc_to_bq_field_map, mod_stamp_name, change_log)
+                if reconcile_ranges is not None and not reconcile_ranges:
+                    logging.info("✅ %s is in sync with SFDC.",
+                                 output_table_name)
+                    if run_stats:
+                        run_stats.mode = "reconcile"
+                    return None
+                if reconcile_ranges:
+                    # Drifted ranges are extracted entirely,
+                    # as of the last replication.
+                    query_filter = soql_range_condition(
+                        SalesforceToBigquery._CREATED_DATE_NAME_,
+                        reconcile_ranges)
+                    recordstamp = sink.last_job_timestamp  # type: ignore
+                    last_record_stamp = None
+                    include_deleted = False
+                    if reuse_bulk_jobs:
+                        logging.warning(
+                            "⚠️ SFDC Bulk API jobs are not reused "
+                            "by reconciliation.")
+                        reuse_bulk_jobs = False
+                    sink.replace_created_ranges(
+                        sfdc_to_bq_field_map[
+                            SalesforceToBigquery._CREATED_DATE_NAME_][0],
+                        reconcile_ranges)
+                    if run_stats:
+                        run_stats.mode = "reconcile"
+
+            # Fields added to the object since the destination
+            # table was created are NULL in existing rows.
+            backfill_fields: typing.List[str] = []
+            if backfill_new_fields:
+                if not sink.supports_column_backfill or change_log:
+                    logging.warning(
+                        "⚠️ Column backfill is not supported by the sink.")
+                elif sink.incremental_ingestion:
+                    new_bq_fields = sink.new_target_fields(
+                        [sfdc_to_bq_field_map[f][0] for f in source_fields])
+                    backfill_fields = [
+                        f for f in source_fields
+                        if sfdc_to_bq_field_map[f][0] in new_bq_fields]
+                    if backfill_fields:
+                        logging.info("New fields will be backfilled: %s",
+                                     ", ".join(backfill_fields))
+
+            # Very wide objects are extracted as column groups.
+            query_length = len(SalesforceToBigquery._create_sfdc_query(
+                api_name, "", recordstamp, mod_stamp_name,
+                last_record_stamp, query_filter))
+            column_groups = SalesforceToBigquery._split_column_groups(
+                source_fields, [target_id_field, mod_stamp_name],
+                column_group_size,
+                SalesforceToBigquery._MAX_SOQL_LENGTH_ - query_length)
+            if len(column_groups) > 1 and not sink.supports_column_groups:
+                logging.warning(
+                    "⚠️ Column groups are not supported by the sink. "
+                    "Extracting %i fields with a single job.",
+                    len(source_fields))
+                column_groups = [source_fields]
+            if len(column_groups) > 1 and reuse_bulk_jobs:
+                logging.warning(
+                    "⚠️ SFDC Bulk API jobs of column groups are not reused.")
+
+            if query_filter:
+                logging.info("This is a reconciliation job.")
+            elif sink.full_ingestion:
+                logging.info("This is a full replication job.")
+            else:
+                logging.info("This is an incremental replication job.")
+
+            # Jobs are submitted right away and run in SFDC while
+            # other replications download and load results.
+            extract_job_ids: typing.List[str] = []
+            batches: typing.Optional[typing.Iterable[typing.Any]] = None
+            if len(column_groups) > 1:
+                extract_job_ids = (
+                    SalesforceToBigquery._start_column_group_jobs(
+                        simple_sf_connection, api_name, column_groups,
+                        recordstamp, mod_stamp_name, last_record_stamp,
+                        include_deleted, csv_delimiter, run_stats=run_stats,
+                        query_filter=query_filter))
+            else:
+                job_id = None
+                if reuse_bulk_jobs:
+                    reusable_job = (
+                        SalesforceToBigquery._find_reusable_bulk_job(
+                            simple_sf_connection, sink, api_name,
+                            column_list, mod_stamp_name, csv_delimiter))
+                    if reusable_job:
+                        job_id, recordstamp = reusable_job
+                        sink.resume_job_timestamp(recordstamp)
+
+                query = SalesforceToBigquery._create_sfdc_query(
+                    api_name, column_list,
+                    recordstamp, mod_stamp_name,
+                    last_record_stamp, query_filter)
+
+                # Small deltas are not worth the Bulk API job cycle.
+                # REST API returns URLs instead of base64 field values.
+                delta_records = None
+                if (not job_id and sink.incremental_ingestion and
+                        not set(source_fields).intersection(
+                            object_fields.blob_fields) and
+                        SalesforceToBigquery._fits_rest_query(
+                            simple_sf_connection, query, include_deleted)):
+                    with (run_stats.stage(STAGE_EXTRACT) if run_stats
+                          else contextlib.nullcontext()):
+                        delta_records = simple_sf_connection.query(
+                            SalesforceToBigquery._create_sfdc_query(
+                                api_name, "COUNT()", recordstamp,
+                                mod_stamp_name, last_record_stamp,
+                                query_filter),
+                            include_deleted=include_deleted)["totalSize"]
+
+                if (delta_records is not None and delta_records <=
+                        SalesforceToBigquery._REST_QUERY_MAX_RECORDS_):
+                    logging.info(
+                        "Querying %i record(s) of %s with SFDC REST API"
+                        " query: %s.",
+                        delta_records,
+                        api_name,
+                        query,
+                    )
+                    batches = SalesforceToBigquery._rest_get_records(
+                        simple_sf_connection, query, include_deleted,
+                        source_fields, csv_delimiter_bq,
+                        api_governor=api_governor,
+                        timestamp_fields=[
+                            f for f in source_fields
+                            if sfdc_to_bq_field_map[f][1] == "TIMESTAMP"
+                        ])
+                else:
+                    if job_id:
+                        logging.info(
+                            "Reusing SFDC Bulk API 2.0 job %s for %s with"
+                            " query: %s.",
+                            job_id,
+                            api_name,
+                            query,
+                        )
+                    else:
+                        logging.info(
+                            "Initializing SFDC Bulk API 2.0 job for %s"
+                            " with query: %s.",
+                            api_name,
+                            query,
+                        )
+                        with (run_stats.stage(STAGE_EXTRACT) if run_stats
+                              else contextlib.nullcontext()):
+                            job_id = SalesforceToBigquery._bulk_start_job(
+                                simple_sf_connection, query,
+                                include_deleted, csv_delimiter)
+                        if reuse_bulk_jobs:
+                            sink.store_bulk_job(job_id, query)
+                    extract_job_ids = [job_id]  # type: ignore
+
+            backfill_job_id = None
+            if backfill_fields:
+                backfill_job_id = SalesforceToBigquery._start_backfill_job(
+                    simple_sf_connection, api_name,
+                    [target_id_field] + backfill_fields, recordstamp,
+                    mod_stamp_name, csv_delimiter, run_stats=run_stats)
+
+        except Exception:
+            logging.error(
+                "⛔️ Failed to run Salesforce to BigQuery Replication.\n",
+                exc_info=True,
+            )
+            raise
+
+        return SubmittedReplication(
+            sfdc_connection=simple_sf_connection,
+            api_name=api_name,
+            sink=sink,
+            sfdc_to_bq_field_map=sfdc_to_bq_field_map,
+            key_fields=[target_id_field, mod_stamp_name],
+            column_groups=column_groups,
+            extract_job_ids=extract_job_ids,
+            batches=batches,
+            backfill_fields=[target_id_field] + backfill_fields,
+            backfill_job_id=backfill_job_id,
+            recordstamp=recordstamp,
+            mod_stamp_name=mod_stamp_name,
+            track_freshness=not query_filter,
+            reuse_bulk_jobs=reuse_bulk_jobs,
+            text_encoding=text_encoding,
+            api_governor=api_governor,
+            run_stats=run_stats,
+            blob_lane=blob_lane,
+            start_time=start_time)
+
+    @staticmethod
+    def plan(simple_sf_connection: Salesforce,
+             api_name: str,
+             bq_client: bigquery.Client,
+             project_id: str,
+             dataset_name: str,
+             output_table_name: typing.Optional[str] = None,
+             include_non_standard_fields: typing.Union[
+                 bool, typing.Iterable[str]] = False,
+             exclude_standard_fields: typing.Optional[
+                 typing.Iterable[str]] = None,
+             row_hash: bool = False,
+             local_sink_path: typing.Optional[str] = None,
+             change_log: bool = False,
+             force_full_reload: bool = False,
+             column_group_size: typing.Optional[int] = None,
+             blob_store: typing.Optional[BlobStore] = None,
+             cdc: bool = False) -> ReplicationPlan:
+        """Estimates replication volume of an SFDC object
+        without extracting any data.
+
+        Uses SOQL COUNT() queries over the replication window
+        and the whole object, row width estimate based on the object
+        description, and the last replication timestamp
+        of the same sink replicate would use.
+
+        Args:
+            See replicate.
+
+        Returns:
+            ReplicationPlan: replication plan.
+        """
+        recordstamp = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+        desc = simple_sf_connection.restful(f"sobjects/{api_name}/describe/")
+        if not output_table_name:
+            output_table_name = desc["name"]  # type: ignore
+        object_fields = SalesforceToBigquery._parse_object_description(
+            api_name, desc,  # type: ignore
+            include_non_standard_fields, exclude_standard_fields)
+        sfdc_to_bq_field_map = object_fields.sfdc_to_bq_field_map
+        source_fields = object_fields.source_fields
+        mod_stamp_name = object_fields.mod_stamp_name
+        blob_fields = object_fields.blob_fields if blob_store else []
+        if blob_fields:
+            source_fields = [f for f in source_fields if f not in blob_fields]
+            sfdc_to_bq_field_map = {f: sfdc_to_bq_field_map[f]
+                                    for f in source_fields}
+            for f in blob_fields:
+                uri_field = _BlobLane.uri_field_name(f)
+                sfdc_to_bq_field_map[uri_field] = (uri_field, "STRING")
+
+        sink = SalesforceToBigquery._create_sink(
+            bq_client=bq_client,
+            project_id=project_id,
+            dataset_name=dataset_name,
+            output_table_name=output_table_name,  # type: ignore
+            recordstamp=recordstamp,
+            has_is_deleted=object_fields.has_is_deleted,
+            has_is_archived=object_fields.has_is_archived,
+            row_hash=row_hash,
+            local_sink_path=local_sink_path,
+            change_log=change_log,
+            force_full_reload=force_full_reload,
+            cdc=cdc)
+        if isinstance(sink, LocalParquetSink):
+            target = TARGET_LOCAL
+        elif isinstance(sink, CdcSink):
+            target = TARGET_CDC
+        elif change_log:
+            target = TARGET_CHANGE_LOG
+        else:
+            target = TARGET_TABLE
+
+        total_records = simple_sf_connection.query(
+            f"SELECT COUNT() FROM {api_name}")["totalSize"]
+        if sink.full_ingestion:
+            window_records = total_records
+        else:
+            count_query = SalesforceToBigquery._create_sfdc_query(
+                api_name, "COUNT()", recordstamp,
+                mod_stamp_name, sink.last_job_timestamp)
+            window_records = simple_sf_connection.query(
+                count_query,
+                include_deleted=sink.incremental_ingestion)["totalSize"]
+
+        query_length = len(SalesforceToBigquery._create_sfdc_query(
+            api_name, "", recordstamp, mod_stamp_name,
+            sink.last_job_timestamp))
+        column_groups = SalesforceToBigquery._split_column_groups(
+            source_fields, ["Id", mod_stamp_name], column_group_size,
+            SalesforceToBigquery._MAX_SOQL_LENGTH_ - query_length)
+        if len(column_groups) > 1 and not sink.supports_column_groups:
+            column_groups = [source_fields]
+        query = SalesforceToBigquery._create_sfdc_query(
+            api_name, ",".join(source_fields), recordstamp,
+            mod_stamp_name, sink.last_job_timestamp)
+
+        row_width = estimate_row_width(
+            desc["fields"],  # type: ignore
+            sfdc_to_bq_field_map)
+
+        return make_plan(
+            object_name=desc["name"],  # type: ignore
+            table_name=output_table_name,  # type: ignore
+            target=target,
+            last_job_timestamp=sink.last_job_timestamp,
+            total_records=total_records,
+            window_records=window_records,
+            row_width_bytes=row_width,
+            page_size=SalesforceToBigquery._MAX_RECORDS_PER_BULK_BATCH_,
+            rest_query_max_records=(
+                SalesforceToBigquery._REST_QUERY_MAX_RECORDS_),
+            column_group_count=len(column_groups),
+            has_base64_fields=bool(set(source_fields).intersection(
+                object_fields.blob_fields)),
+            fits_rest_query=SalesforceToBigquery._fits_rest_query(
+                simple_sf_connection, query, sink.incremental_ingestion))
+
+    @staticmethod
+    def _create_sink(bq_client: bigquery.Client,
+                     project_id: str,
+                     dataset_name: str,
+                     output_table_name: str,
+                     recordstamp: datetime,
+                     has_is_deleted: bool,
+                     has_is_archived: bool,
+                     csv_delimiter: str = ",",
+                     text_encoding: str = "utf-8",
+                     row_hash: bool = False,
+                     local_sink_path: typing.Optional[str] = None,
+                     change_log: bool = False,
+                     force_full_reload: bool = False,
+                     cdc: bool = False,
+                     job_costs: typing.Optional[JobCostLedger] = None
+                     ) -> ReplicationSink:
+        """Creates the replication sink of the destination table.
+
+        Sinks don't create any destination resources
+        until start_ingestion is called.
+
+        Args:
+            See replicate. csv_delimiter is the delimiter character.
+
+        Returns:
+            ReplicationSink: replication sink.
+        """
+        sink: ReplicationSink
+        if local_sink_path:
+            if row_hash:
+                logging.warning(
+                    "⚠️ Row hash is not supported by the local sink.")
+            if change_log:
+                logging.warning(
+                    "⚠️ Change log is not supported by the local sink.")
+            if cdc:
+                logging.warning(
+                    "⚠️ CDC mode is not supported by the local sink.")
+            sink = LocalParquetSink(
+                base_path=os.path.join(local_sink_path, dataset_name),
+                target_table_name=output_table_name,
+                job_timestamp=recordstamp,
+                id_field_name="Id",
+                timestamp_field_name=SalesforceToBigquery._RECORD_STAMP_NAME_,
+                has_is_deleted=has_is_deleted,
+                has_is_archived=has_is_archived,
+                csv_delimiter=csv_delimiter,
+                text_encoding=text_encoding,
+                force_full_reload=force_full_reload)
+        elif cdc and not change_log:
+            if row_hash:
+                logging.warning(
+                    "⚠️ Row hash is not used in CDC mode.")
+            sink = CdcSink(
+                project_id=project_id,
+                dataset_name=dataset_name,
+                target_table_name=output_table_name,
+                job_timestamp=recordstamp,
+                id_field_name="Id",
+                timestamp_field_name=SalesforceToBigquery._RECORD_STAMP_NAME_,
+                has_is_deleted=has_is_deleted,
+                has_is_archived=has_is_archived,
+                bigquery_client=bq_client,
+                csv_delimiter=csv_delimiter,
+                text_encoding=text_encoding,
+                force_full_reload=force_full_reload,
+                job_costs=job_costs)
+        else:
+            if cdc:
+                logging.warning(
+                    "⚠️ CDC mode is not used with change log.")
+            if row_hash and change_log:
+                logging.warning(
+                    "⚠️ Row hash is not used in change log mode.")
+            sink = BigQueryHelper(
+                project_id=project_id,
+                dataset_name=dataset_name,
+                target_table_name=output_table_name,
+                job_timestamp=recordstamp,
+                id_field_name="Id",
+                timestamp_field_name=SalesforceToBigquery._RECORD_STAMP_NAME_,
+                has_is_deleted=has_is_deleted,
+                has_is_archived=has_is_archived,
+                bigquery_client=bq_client,
+                csv_delimiter=csv_delimiter,
+                text_encoding=text_encoding,
+                row_hash_field_name=(SalesforceToBigquery._ROW_HASH_NAME_
+                                     if row_hash and not change_log
+                                     else None),
+                row_hash_exclude_fields=(
+                    SalesforceToBigquery._ROW_HASH_EXCLUDED_FIELDS_),
+                change_log=change_log,
+                force_full_reload=force_full_reload,
+                job_costs=job_costs)
+        return sink
+
+    @staticmethod
+    def _parse_object_description(
+        api_name: str,
+        desc: typing.Dict[str, typing.Any],
+        include_non_standard_fields: typing.Union[
+            bool, typing.Iterable[str]] = False,
+        exclude_standard_fields: typing.Optional[typing.Iterable[str]] = None
+    ) -> "_SfdcObjectFields":
+        """Parses SFDC object description into the replicated field list
+        and SFDC-to-BigQuery schema mapping.
+
+        Args:
+            api_name (str): Salesforce object name
+            desc (typing.Dict[str, typing.Any]): object description
+                as returned by sobjects/{api_name}/describe/
+            include_non_standard_fields (bool, Iterable[str]|): whether to
+                replicate non-standard fields, True/False or a list of names
+            exclude_standard_fields (Iterable[str]): list of standard fields
+                to exclude from replication
+
+        Raises:
+            RuntimeError: object has no timestamp field to replicate by.
+
+        Returns:
+            _SfdcObjectFields: replicated fields and object properties.
+        """
         sfdc_fields = [(f["name"], f["type"].lower(), f["relationshipName"],
                         f["referenceTo"])
                        for f in desc["fields"]]  # type: ignore
@@ -123,8 +1254,7 @@ class SalesforceToBigquery:
         sfdc_to_bq_field_map = {}
         # Field list for SELECT query
         source_fields = []
-
-        target_id_field = "Id"  # Id field name in the destination BQ table
+        blob_fields = []
 
         # Replicate:
         # primitive field types,
@@ -193,104 +1323,17 @@ class SalesforceToBigquery:
             # types.
             sfdc_to_bq_field_map[f[0]] = (f[0].replace(".", "_"), target_type)
             source_fields.append(f[0])
-
-        # sfdc_to_bq_field_map and source_fields are initialized at this point
-
-        if store_metadata:
-            SalesforceToBigquery._store_metadata(
-                bq_client=bq_client,
-                project_id=project_id,
-                dataset_id=dataset_name,
-                object_name=desc["name"],  # type: ignore
-                output_table_name=output_table_name,  # type: ignore
-                metadata=desc)  # type: ignore
-
-        if csv_delimiter == "COMMA":
-            csv_delimiter_bq = ","
-        elif csv_delimiter == "TAB":
-            csv_delimiter_bq = "\t"
-        elif csv_delimiter == "PIPE":
-            csv_delimiter_bq = "|"
-        elif csv_delimiter == "SEMICOLON":
-            csv_delimiter_bq = ";"
-        elif csv_delimiter == "BACKQUOTE":
-            csv_delimiter_bq = "`"
-        elif csv_delimiter == "CARET":
-            csv_delimiter_bq = "^"
-        else:
-            csv_delimiter_bq = ","
-
-        try:
-            bq = BigQueryHelper(
-                project_id=project_id,
-                dataset_name=dataset_name,
-                target_table_name=output_table_name,  # type: ignore
-                job_timestamp=recordstamp,
-                id_field_name=target_id_field,
-                timestamp_field_name=SalesforceToBigquery._RECORD_STAMP_NAME_,
-                has_is_deleted=has_is_deleted,
-                has_is_archived=has_is_archived,
-                bigquery_client=bq_client,
-                csv_delimiter=csv_delimiter_bq,
-                text_encoding=text_encoding)
-
-            include_deleted = bq.incremental_ingestion
-
-            query = SalesforceToBigquery._create_sfdc_query(
-                api_name, ",".join(source_fields),
-                recordstamp, mod_stamp_name,
-                bq.last_job_timestamp)
-
-            logging.info(
-                "Initializing SFDC Bulk API 2.0 job for %s with"
-                " query: %s.",
-                api_name,
-                query,
-            )
-
-            if bq.full_ingestion:
-                logging.info("This is a full replication job.")
-            else:
-                logging.info("This is an incremental replication job.")
-
-            job_id = SalesforceToBigquery._bulk_start_job(
-                simple_sf_connection, query, include_deleted, csv_delimiter)
-
-            logging.info("Running SFDC job %s and loading results to BigQuery.",
-                         job_id)
-
-            # Starting a Bulk API 2.0 job.
-            batches = SalesforceToBigquery._bulk_get_records(
-                simple_sf_connection, job_id, text_encoding)
-
-            added_records = SalesforceToBigquery._upload_batches_to_bq(
-                bq, batches, sfdc_to_bq_field_map, text_encoding)
-
-            logging.info("Finalizing BigQuery resources.")
-            bq.finish_ingestion(added_records == 0)
-
-            logging.info("Total records processed: %i", added_records)
-
-            # Deleting SFDC job.
-            # We can only do it now because
-            # _upload_batches_to_bq dynamically retrieves results
-            # from the generator returned by _bulk_get_records
-            logging.info("Deleting SFDC Bulk API 2.0 job %s", job_id)
-            SalesforceToBigquery._bulk_delete_job(simple_sf_connection, job_id)
-
-        except Exception:
-            logging.error(
-                "⛔️ Failed to run Salesforce to BigQuery Replication.\n",
-                exc_info=True,
-            )
-            raise
-
-        end_time = time.time()
-        logging.info(
-            "Salesforce to BigQuery Replication has been completed in"
-            " %f seconds.",
-            end_time - start_time,
-        )
+            if f_type == "base64":
+                blob_fields.append(f[0])
+
+        return _SfdcObjectFields(
+            sfdc_to_bq_field_map=sfdc_to_bq_field_map,
+            source_fields=source_fields,
+            mod_stamp_name=mod_stamp_name,
+            has_is_deleted=has_is_deleted,
+            has_is_archived=has_is_archived,
+            has_created_date=has_created_date,
+            blob_fields=blob_fields)
 
     @staticmethod
     def _store_metadata(bq_client: bigquery.Client,
@@ -298,7 +1341,8 @@ class SalesforceToBigquery:
                         dataset_id: str,
                         object_name: str,
                         output_table_name: str,
-                        metadata: typing.Dict[typing.Any, typing.Any]):
+                        metadata: typing.Dict[typing.Any, typing.Any],
+                        job_costs: typing.Optional[JobCostLedger] = None):
         metadata_table_name = (f"{project_id}.{dataset_id}."
                                f"{SalesforceToBigquery._SFDC_METADATA_TABLE}")
         table = bigquery.Table(metadata_table_name,
@@ -333,12 +1377,17 @@ class SalesforceToBigquery:
             bigquery.ScalarQueryParameter(
                 "metadata_string", "STRING", json.dumps(metadata))
         ]
-        job_config.priority = bigquery.QueryPriority.BATCH
+        # A single-row upsert, so it is not worth queueing as a batch job.
+        job_config.priority = bigquery.QueryPriority.INTERACTIVE
 
         # Workaround for concurrent updates error.
         while True:
             try:
-                bq_client.query(upsert_query, job_config=job_config).result()
+                query_job = bq_client.query(upsert_query,
+                                            job_config=job_config)
+                query_job.result()
+                if job_costs:
+                    job_costs.record(JOB_STAGE_METADATA, query_job)
                 break
             except BadRequest as ex:
                 if "Could not serialize access to table" not in ex.message:
@@ -376,13 +1425,399 @@ class SalesforceToBigquery:
                                       data=json.dumps(request_body))
         return job["id"]  # type: ignore
 
+    @staticmethod
+    def _split_column_groups(
+        source_fields: typing.List[str],
+        key_fields: typing.List[str],
+        max_group_size: typing.Optional[int],
+        max_column_list_length: int
+    ) -> typing.List[typing.List[str]]:
+        """Splits fields to query into column groups.
+        Every group includes key fields.
+
+        Args:
+            source_fields (typing.List[str]): fields to query.
+            key_fields (typing.List[str]): fields to include in every group
+                (Id and modification timestamp).
+            max_group_size (int, optional): maximum number of fields
+                in a group. Only the query length is limited if None.
+            max_column_list_length (int): maximum length
+                of a group's comma-separated field list.
+
+        Returns:
+            typing.List[typing.List[str]]: column groups,
+                a single group if fields don't need splitting.
+        """
+        if (len(",".join(source_fields)) <= max_column_list_length and
+                (not max_group_size or len(source_fields) <= max_group_size)):
+            return [source_fields]
+
+        key_fields_lower = [f.lower() for f in key_fields]
+        keys = [f for f in source_fields if f.lower() in key_fields_lower]
+        groups = []
+        group = list(keys)
+        for field in source_fields:
+            if field.lower() in key_fields_lower:
+                continue
+            if len(group) > len(keys) and (
+                    (max_group_size and len(group) >= max_group_size) or
+                    len(",".join(group + [field])) > max_column_list_length):
+                groups.append(group)
+                group = list(keys)
+            group.append(field)
+        groups.append(group)
+        return groups
+
+    @staticmethod
+    def _start_column_group_jobs(
+        sfdc_connection: Salesforce,
+        api_name: str,
+        column_groups: typing.List[typing.List[str]],
+        recordstamp: datetime,
+        mod_stamp_name: str,
+        last_record_stamp: typing.Optional[datetime],
+        include_deleted: bool,
+        csv_delimiter: str,
+        run_stats: typing.Optional[ReplicationRunStats] = None,
+        query_filter: typing.Optional[str] = None
+    ) -> typing.List[str]:
+        """Starts SFDC Bulk API 2.0 jobs of column groups.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            api_name (str): Salesforce object name
+            column_groups (typing.List[typing.List[str]]): column groups
+                returned by _split_column_groups.
+            recordstamp (datetime): replication job timestamp.
+            mod_stamp_name (str): name of the modification timestamp field
+            last_record_stamp (datetime, optional): start of the
+                incremental replication window, None for full replication.
+            include_deleted (bool): whether to query deleted records.
+            csv_delimiter (str): CSV column delimiter of the jobs
+            run_stats (ReplicationRunStats, optional): Run statistics
+                to fill in. Defaults to None.
+            query_filter (str, optional): additional SOQL condition.
+                Defaults to None.
+
+        Returns:
+            typing.List[str]: job ids in the order of column groups.
+        """
+        logging.info("Extracting %s as %i column groups.",
+                     api_name, len(column_groups))
+        job_ids = []
+        for group_index, fields in enumerate(column_groups):
+            query = SalesforceToBigquery._create_sfdc_query(
+                api_name, ",".join(fields), recordstamp, mod_stamp_name,
+                last_record_stamp, query_filter)
+            logging.info(
+                "Initializing SFDC Bulk API 2.0 job for column group %i"
+                " of %s with query: %s.", group_index, api_name, query)
+            with (run_stats.stage(STAGE_EXTRACT) if run_stats
+                  else contextlib.nullcontext()):
+                job_ids.append(SalesforceToBigquery._bulk_start_job(
+                    sfdc_connection, query, include_deleted, csv_delimiter))
+        return job_ids
+
+    @staticmethod
+    def _extract_column_groups(
+        sfdc_connection: Salesforce,
+        sink: ReplicationSink,
+        column_groups: typing.List[typing.List[str]],
+        job_ids: typing.List[str],
+        sfdc_to_bq_field_map: typing.Dict[str, typing.Tuple[str, str]],
+        key_fields: typing.List[str],
+        text_encoding: str,
+        api_governor: typing.Optional[ApiLimitGovernor] = None,
+        run_stats: typing.Optional[ReplicationRunStats] = None,
+        blob_lane: typing.Optional[_BlobLane] = None
+    ) -> int:
+        """Loads results of completed SFDC Bulk API 2.0 jobs
+        of column groups to column group staging of the sink,
+        and joins them on key fields.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            sink (ReplicationSink): replication sink
+                that supports column groups.
+            column_groups (typing.List[typing.List[str]]): column groups
+                returned by _split_column_groups.
+            job_ids (typing.List[str]): completed jobs of column groups
+                started by _start_column_group_jobs.
+            sfdc_to_bq_field_map (typing.Dict[str, typing.Tuple[str, str]]):
+                Salesforce-to-BigQuery field name mapping dictionary.
+            key_fields (typing.List[str]): fields every group includes.
+            text_encoding (str): Text encoding to use
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor.
+                Defaults to None.
+            run_stats (ReplicationRunStats, optional): Run statistics
+                to fill in. Defaults to None.
+            blob_lane (_BlobLane, optional): Lane of base64 fields.
+                The first column group gets their URI columns.
+                Defaults to None.
+
+        Returns:
+            int: Number of added records.
+        """
+        sink.start_ingestion(list(sfdc_to_bq_field_map.values()))
+        group_sinks = [sink.column_group_sink(i)
+                       for i in range(len(column_groups))]
+
+        def _load_group(group_index: int):
+            job_id = job_ids[group_index]
+            batches = SalesforceToBigquery._bulk_result_pages(
+                sfdc_connection, job_id, text_encoding)
+            group_map = {f: sfdc_to_bq_field_map[f]
+                         for f in column_groups[group_index]}
+            group_blob_lane = blob_lane if group_index == 0 else None
+            if group_blob_lane:
+                for f in group_blob_lane.blob_fields:
+                    uri_field = _BlobLane.uri_field_name(f)
+                    group_map[uri_field] = sfdc_to_bq_field_map[uri_field]
+            SalesforceToBigquery._upload_batches_to_bq(
+                group_sinks[group_index], batches, group_map,
+                text_encoding, api_governor=api_governor,
+                run_stats=run_stats, blob_lane=group_blob_lane)
+            logging.info("Deleting SFDC Bulk API 2.0 job %s", job_id)
+            SalesforceToBigquery._bulk_delete_job(sfdc_connection, job_id)
+
+        logging.info("Loading %i fields as %i column groups.",
+                     len(sfdc_to_bq_field_map), len(column_groups))
+        with futures.ThreadPoolExecutor(
+                max_workers=min(
+                    len(column_groups),
+                    SalesforceToBigquery._MAX_CONCURRENT_COLUMN_GROUPS_),
+                thread_name_prefix=threading.current_thread().name
+        ) as pool:
+            group_futures = [pool.submit(_load_group, i)
+                             for i in range(len(column_groups))]
+            for group_future in group_futures:
+                group_future.result()
+
+        with (run_stats.stage(STAGE_LOAD) if run_stats
+              else contextlib.nullcontext()):
+            return sink.join_column_groups(
+                group_sinks,
+                [sfdc_to_bq_field_map[f][0] for f in column_groups[0]
+                 if f.lower() in [k.lower() for k in key_fields]])
+
+    @staticmethod
+    def _start_backfill_job(
+        sfdc_connection: Salesforce,
+        api_name: str,
+        fields: typing.List[str],
+        recordstamp: datetime,
+        mod_stamp_name: str,
+        csv_delimiter: str,
+        run_stats: typing.Optional[ReplicationRunStats] = None
+    ) -> str:
+        """Starts an SFDC Bulk API 2.0 job extracting Id and new fields
+        of all records for _backfill_columns.
+
+        Records modified after recordstamp are skipped,
+        the next incremental replication picks them up.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            api_name (str): Salesforce object name
+            fields (typing.List[str]): Id and fields to backfill.
+            recordstamp (datetime): replication job timestamp.
+            mod_stamp_name (str): name of the modification timestamp field
+            csv_delimiter (str): CSV column delimiter of the job
+            run_stats (ReplicationRunStats, optional): Run statistics
+                to fill in. Defaults to None.
+
+        Returns:
+            str: Job Id
+        """
+        query = SalesforceToBigquery._create_sfdc_query(
+            api_name, ",".join(fields), recordstamp, mod_stamp_name, None)
+        logging.info(
+            "Initializing SFDC Bulk API 2.0 job for backfill"
+            " of %s with query: %s.", api_name, query)
+        with (run_stats.stage(STAGE_EXTRACT) if run_stats
+              else contextlib.nullcontext()):
+            return SalesforceToBigquery._bulk_start_job(
+                sfdc_connection, query, False, csv_delimiter)
+
+    @staticmethod
+    def _backfill_columns(
+        sfdc_connection: Salesforce,
+        sink: ReplicationSink,
+        job_id: str,
+        fields: typing.List[str],
+        sfdc_to_bq_field_map: typing.Dict[str, typing.Tuple[str, str]],
+        text_encoding: str,
+        api_governor: typing.Optional[ApiLimitGovernor] = None,
+        run_stats: typing.Optional[ReplicationRunStats] = None
+    ) -> int:
+        """Loads results of a completed backfill job started by
+        _start_backfill_job, and updates new fields
+        in the destination table.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            sink (ReplicationSink): replication sink
+                that supports column backfill.
+            job_id (str): completed backfill job.
+            fields (typing.List[str]): Id and fields to backfill.
+            sfdc_to_bq_field_map (typing.Dict[str, typing.Tuple[str, str]]):
+                Salesforce-to-BigQuery field name mapping dictionary.
+            text_encoding (str): Text encoding to use
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor.
+                Defaults to None.
+            run_stats (ReplicationRunStats, optional): Run statistics
+                to fill in. Defaults to None.
+
+        Returns:
+            int: Number of backfilled records.
+        """
+        backfill_map = {f: sfdc_to_bq_field_map[f] for f in fields}
+        backfill_sink = sink.backfill_sink()
+
+        batches = SalesforceToBigquery._bulk_result_pages(
+            sfdc_connection, job_id, text_encoding)
+        SalesforceToBigquery._upload_batches_to_bq(
+            backfill_sink, batches, backfill_map, text_encoding,
+            api_governor=api_governor, run_stats=run_stats)
+        logging.info("Deleting SFDC Bulk API 2.0 job %s", job_id)
+        SalesforceToBigquery._bulk_delete_job(sfdc_connection, job_id)
+
+        with (run_stats.stage(STAGE_MERGE) if run_stats
+              else contextlib.nullcontext()):
+            return sink.backfill_columns(backfill_sink)
+
+    @staticmethod
+    def _reconcile_ranges(
+        sfdc_connection: Salesforce,
+        sink: ReplicationSink,
+        api_name: str,
+        source_fields: typing.List[str],
+        sfdc_to_bq_field_map: typing.Dict[str, typing.Tuple[str, str]],
+        mod_stamp_name: str,
+        change_log: bool
+    ) -> typing.Optional[typing.List[CreatedRange]]:
+        """Finds CreatedDate ranges where the destination table
+        differs from SFDC as of the last replication.
+
+        Records modified in SFDC after the last replication
+        make their months differ, so reconciliation is most precise
+        right after a regular replication.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            sink (ReplicationSink): replication sink
+            api_name (str): Salesforce object name
+            source_fields (typing.List[str]): replicated SFDC fields
+            sfdc_to_bq_field_map (typing.Dict[str, typing.Tuple[str, str]]):
+                Salesforce-to-BigQuery field name mapping dictionary.
+            mod_stamp_name (str): name of the modification timestamp field
+            change_log (bool): whether the sink is in change log mode
+
+        Returns:
+            typing.Optional[typing.List[CreatedRange]]: ranges to replace,
+                or None if the object can't be reconciled
+                and has to be replicated as usual.
+        """
+        created_name = SalesforceToBigquery._CREATED_DATE_NAME_
+        if not sink.supports_reconciliation or change_log:
+            logging.warning(
+                "⚠️ Reconciliation is not supported by the sink. "
+                "Performing regular replication.")
+            return None
+        if sink.full_ingestion:
+            logging.info("Nothing to reconcile. "
+                         "Performing full replication.")
+            return None
+        if created_name not in source_fields:
+            logging.warning(
+                "⚠️ %s has no %s field. Performing regular replication.",
+                api_name, created_name)
+            return None
+
+        recordstamp_str = sink.last_job_timestamp.strftime(  # type: ignore
+            "%Y-%m-%dT%H:%M:%S.000Z")
+        bucket_query = (
+            f"SELECT CALENDAR_YEAR({created_name}) y, "
+            f"CALENDAR_MONTH({created_name}) m, "
+            f"COUNT(Id) c, MAX({mod_stamp_name}) ms FROM {api_name} "
+            f"WHERE {mod_stamp_name}<={recordstamp_str} "
+            f"GROUP BY CALENDAR_YEAR({created_name}), "
+            f"CALENDAR_MONTH({created_name})")
+        logging.info("Counting %s records by month: %s",
+                     api_name, bucket_query)
+        source: typing.Dict[MonthBucket, BucketSummary] = {}
+        for record in sfdc_connection.query(bucket_query)["records"]:
+            bucket = ((record["y"], record["m"]) if record["y"] is not None
+                      else None)
+            max_modstamp = (datetime.strptime(record["ms"],
+                                              "%Y-%m-%dT%H:%M:%S.%f%z")
+                            if record["ms"] else None)
+            source[bucket] = BucketSummary(record["c"], max_modstamp)
+
+        target = sink.bucket_summary(
+            sfdc_to_bq_field_map[created_name][0],
+            sfdc_to_bq_field_map[mod_stamp_name][0])
+        drifted = find_drifted_buckets(source, target)
+        logging.info("%i of %i month(s) of %s differ from SFDC: %s",
+                     len(drifted), len(set(source) | set(target)), api_name,
+                     format_buckets(drifted) or "none")
+        return merge_bucket_ranges(drifted)
+
+    @staticmethod
+    def _find_reusable_bulk_job(
+        sfdc_connection: Salesforce,
+        sink: ReplicationSink,
+        api_name: str,
+        column_list: str,
+        mod_stamp_name: str,
+        columnDelimiter: str
+    ) -> typing.Optional[typing.Tuple[str, datetime]]:
+        """Looks for a persisted SFDC Bulk API 2.0 job of a failed replication
+        which query is identical to the one this replication would run
+        with the job's recordstamp.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            sink (ReplicationSink): replication sink to use.
+            api_name (str): Salesforce object name
+            column_list (str): comma-separated list of fields to query
+            mod_stamp_name (str): name of the modification timestamp field
+            columnDelimiter (str): CSV column delimiter of the job
+
+        Returns:
+            typing.Optional[typing.Tuple[str, datetime]]: tuple of
+                job id and its recordstamp, or None if no job can be reused.
+        """
+        operation = "queryAll" if sink.incremental_ingestion else "query"
+        jobs = sink.retrieve_bulk_jobs(
+            SalesforceToBigquery._BULK_JOB_RETENTION_)
+        for job_id, job_query, job_recordstamp in jobs:
+            query = SalesforceToBigquery._create_sfdc_query(
+                api_name, column_list, job_recordstamp, mod_stamp_name,
+                sink.last_job_timestamp)
+            if query != job_query:
+                continue
+            try:
+                status = sfdc_connection.restful(
+                    path=f"jobs/query/{job_id}", method="GET")
+            except SalesforceError:
+                # Job doesn't exist anymore.
+                continue
+            if (status["state"] in ["Failed", "Aborted"]  # type: ignore
+                    or status["operation"] != operation  # type: ignore
+                    or status["columnDelimiter"] != columnDelimiter):  # type: ignore
+                continue
+            return (job_id, job_recordstamp)
+        return None
+
     @staticmethod
     def _bulk_get_records(
         sfdc_connection: Salesforce,
         job_id: str,
         text_encoding: str,
         job_status_interval: float = 10.0,
-    ) -> typing.Iterable[typing.Iterable[str]]:
+        api_governor: typing.Optional[ApiLimitGovernor] = None,
+    ) -> typing.Iterable["_ResultPage"]:
         """Retrieves CSV content of Salesforce Build API 2.0 query results
             as batches of CSV lines.
 
@@ -392,82 +1827,172 @@ class SalesforceToBigquery:
             text_encoding (str): Text encoding to use
             job_status_interval (float, optional): Job status polling interval
                 in seconds. Defaults to 10.0.
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor
+                that controls job status polling interval. Defaults to None.
 
         Raises:
             RuntimeError: Job failed.
 
         Yields:
-            Iterator[typing.Iterable[typing.Iterable[str]]]:
-                iterable of the result CSV files content
-                as iterables of content chunks.
+            Iterator[_ResultPage]: result pages. Every page is
+                an iterable of CSV content chunks that can be iterated again
+                to retry retrieving the page.
+        """
+        SalesforceToBigquery._bulk_wait_for_job(
+            sfdc_connection, job_id, job_status_interval, api_governor)
+        yield from SalesforceToBigquery._bulk_result_pages(
+            sfdc_connection, job_id, text_encoding)
+
+    @staticmethod
+    def _bulk_wait_for_job(
+        sfdc_connection: Salesforce,
+        job_id: str,
+        job_status_interval: float = 10.0,
+        api_governor: typing.Optional[ApiLimitGovernor] = None,
+    ):
+        """Waits for Salesforce Bulk API 2.0 query job to complete.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            job_id (str): Salesforce Bulk API 2.0 job
+            job_status_interval (float, optional): Job status polling interval
+                in seconds. Defaults to 10.0.
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor
+                that controls job status polling interval. Defaults to None.
+
+        Raises:
+            RuntimeError: Job failed.
         """
 
         # Checking for job status every job_status_interval seconds.
-        job_status_path = f"jobs/query/{job_id}"
-        job_running = True
-        while job_running:
-            time.sleep(job_status_interval)
-            status = sfdc_connection.restful(
-                path=job_status_path, method="GET")
-            state = status["state"]  # type: ignore
-            if state in ["Failed", "Aborted"]:
-                logging.fatal("⛔️ Operation %s %s: %s", job_id, state,
-                              status["errorMessage"])  # type: ignore
-                raise RuntimeError(
-                    f"Operation {job_id} {state}: {status['errorMessage']}")  # type: ignore
-            elif state == "JobComplete":
+        while True:
+            if api_governor:
+                time.sleep(api_governor.job_status_interval())
+            else:
+                time.sleep(job_status_interval)
+            if SalesforceToBigquery._bulk_job_completed(
+                    sfdc_connection, job_id, api_governor):
                 break
 
+    @staticmethod
+    def _bulk_job_completed(
+        sfdc_connection: Salesforce,
+        job_id: str,
+        api_governor: typing.Optional[ApiLimitGovernor] = None,
+    ) -> bool:
+        """Checks whether Salesforce Bulk API 2.0 query job completed.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            job_id (str): Salesforce Bulk API 2.0 job
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor
+                to update with API usage. Defaults to None.
+
+        Raises:
+            RuntimeError: Job failed.
+
+        Returns:
+            bool: True if the job completed.
+        """
+        status = sfdc_connection.restful(
+            path=f"jobs/query/{job_id}", method="GET")
+        if api_governor:
+            api_governor.update_from_connection(sfdc_connection)
+        state = status["state"]  # type: ignore
+        if state in ["Failed", "Aborted"]:
+            logging.fatal("⛔️ Operation %s %s: %s", job_id, state,
+                          status["errorMessage"])  # type: ignore
+            raise RuntimeError(
+                f"Operation {job_id} {state}: {status['errorMessage']}")  # type: ignore
+        return state == "JobComplete"
+
+    @staticmethod
+    def _bulk_result_pages(
+        sfdc_connection: Salesforce,
+        job_id: str,
+        text_encoding: str,
+    ) -> typing.Iterable["_ResultPage"]:
+        """Retrieves result pages of a completed
+            Salesforce Bulk API 2.0 query job.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            job_id (str): Completed Salesforce Bulk API 2.0 job
+            text_encoding (str): Text encoding to use
+
+        Yields:
+            Iterator[_ResultPage]: result pages (see _bulk_get_records).
+        """
         locator = None
 
         # Retrieve job results.
         while locator != "null":
-            headers = sfdc_connection.headers.copy()
-            headers["Accept"] = "text/csv"
-            headers["Accept-Encoding"] = "gzip"
-            result_path = (
-                f"jobs/query/{job_id}/results?maxRecords="
-                f"{SalesforceToBigquery._MAX_RECORDS_PER_BULK_BATCH_}")
-            if locator:
-                result_path += f"&locator={locator}"
-            with sfdc_connection.session.request(
-                    "GET",
-                    f"{sfdc_connection.base_url}{result_path}",
-                    headers=headers,
-                    stream=True,
-            ) as result_response:
-                if result_response.status_code == 401:
-                    # Auth token might have expired,
-                    # Let simple-salesforce renew it
-                    # by performing a restful call on the job status
-                    sfdc_connection.restful(path=job_status_path, method="GET")
-                    continue
-                elif result_response.status_code >= 300:
-                    # Error codes >= 300 mean an error,
-                    # except when it's 404 and the locator is not None.
-                    # It such cases, job has been deleted,
-                    # and there is nothing more to get.
-                    if (result_response.status_code == 404 and
-                            locator is not None):
-                        logging.warning(
-                            "⚠️ SFDC Bulk API 2.0 job %s was deleted.", job_id)
-                        locator = "null"
-                    else:
-                        # Let simple-salesforce handle it.
-                        exception_handler(result_response, name=result_path)
-                else:
-                    if "Sforce-Locator" in result_response.headers:
-                        locator = result_response.headers["Sforce-Locator"]
-                    else:
-                        # No locator means there is only one set of results,
-                        # but we explicitly assign if to a special "null" value
-                        # because this is what's returned when the last set
-                        # was retrieved in the multiple-batch situation.
-                        locator = "null"
-                    result_response.encoding = text_encoding
-                    yield result_response.iter_content(
-                        chunk_size=SalesforceToBigquery._CSV_STREAM_CHUNK_SIZE_,
-                        decode_unicode=True)
+            page = _ResultPage(sfdc_connection, job_id, locator, text_encoding)
+            yield page
+            # A page is consumed before the next one is requested,
+            # so its next locator is known at this point.
+            locator = page.next_locator or "null"
+
+    @staticmethod
+    def _fits_rest_query(sfdc_connection: Salesforce,
+                         query: str,
+                         include_deleted: bool) -> bool:
+        """Checks whether SOQL query can be sent as a REST API
+        query string without exceeding SFDC URI length limit.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            query (str): SOQL query
+            include_deleted (bool): Whether to include deleted records.
+
+        Returns:
+            bool: True if the query fits.
+        """
+        url = (f"{sfdc_connection.base_url}"
+               f"{'queryAll' if include_deleted else 'query'}/?"
+               f"{urlencode({'q': query})}")
+        return len(url) <= SalesforceToBigquery._MAX_REST_URI_LENGTH_
+
+    @staticmethod
+    def _rest_get_records(
+        sfdc_connection: Salesforce,
+        query: str,
+        include_deleted: bool,
+        field_names: typing.List[str],
+        csv_delimiter: str,
+        api_governor: typing.Optional[ApiLimitGovernor] = None,
+        timestamp_fields: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.Iterable["_RestResultPage"]:
+        """Retrieves Salesforce REST API query results
+            as pages of CSV content, following nextRecordsUrl.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            query (str): SOQL query
+            include_deleted (bool): Whether to include deleted records.
+            field_names (typing.List[str]): Queried fields in order.
+            csv_delimiter (str): CSV column delimiter.
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor
+                to update with API usage. Defaults to None.
+            timestamp_fields (typing.Iterable[str], optional): Queried fields
+                replicated as TIMESTAMP. Defaults to None.
+
+        Yields:
+            Iterator[_RestResultPage]: result pages in the format
+                of _bulk_get_records pages.
+        """
+        records_url = None
+        while True:
+            page = _RestResultPage(sfdc_connection, query, records_url,
+                                   include_deleted, field_names,
+                                   csv_delimiter, api_governor,
+                                   timestamp_fields)
+            yield page
+            # A page is consumed before the next one is requested,
+            # so its next URL is known at this point.
+            if not page.next_records_url:
+                break
+            records_url = page.next_records_url
 
     @staticmethod
     def _bulk_delete_job(sfdc_connection: Salesforce, job_id):
@@ -485,7 +2010,8 @@ class SalesforceToBigquery:
             column_list: str,
             job_recordstamp: datetime,
             mod_stamp_name: str,
-            last_record_stamp: typing.Union[datetime, None]) -> str:
+            last_record_stamp: typing.Union[datetime, None],
+            query_filter: typing.Optional[str] = None) -> str:
         """Building SFDC query depending on the incremental logic."""
 
         recordstamp_str = job_recordstamp.strftime("%Y-%m-%dT%H:%M:%S.000Z")
@@ -502,15 +2028,59 @@ class SalesforceToBigquery:
             last_record_stamp_str = last_record_stamp_minus_ten.strftime(
                 "%Y-%m-%dT%H:%M:%S.000Z")
             query += f" AND {mod_stamp_name}>={last_record_stamp_str}"
+        if query_filter:
+            query += f" AND {query_filter}"
 
         return query
 
     @staticmethod
-    def _upload_batches_to_bq(bq: BigQueryHelper,
-                              batches: typing.Iterable[typing.Iterable[str]],
+    def _write_batch_to_file(batch: typing.Iterable[str],
+                             file: typing.TextIO) -> bool:
+        """Writes CSV content of a batch to a file
+        replacing the file's previous content.
+
+        Args:
+            batch (typing.Iterable[str]): CSV content chunks.
+            file (typing.TextIO): file to write to.
+
+        Returns:
+            bool: True if the batch has any lines after the header.
+        """
+        file.seek(0)
+        file.truncate()
+        first_line = True
+        has_valid_lines = False
+
+        # Processing lines from the returned CSV.
+        # We need to rename fields in the header (first line).
+
+        for chunk in batch:
+            if first_line:
+                index = chunk.find("\n")
+                if index != -1:
+                    first_line = False
+                    if index < len(chunk) - 1:
+                        has_valid_lines = True
+            else:
+                has_valid_lines = True
+
+            file.write(chunk)
+
+        file.flush()
+        return has_valid_lines
+
+    @staticmethod
+    def _upload_batches_to_bq(sink: ReplicationSink,
+                              batches: typing.Iterable["_ResultPage"],
                               sfdc_to_bq_field_map: typing.Dict[
                                   str, typing.Tuple[str, str]],
-                              text_encoding: str) -> int:
+                              text_encoding: str,
+                              api_governor: typing.Optional[
+                                  ApiLimitGovernor] = None,
+                              run_stats: typing.Optional[
+                                  ReplicationRunStats] = None,
+                              blob_lane: typing.Optional[_BlobLane] = None
+                              ) -> int:
         """Processes batches of Salesforce Bulk API 2.0 query.
         It retrieves CSV lines from the Bulk API batches,
         renames the header with the target names,
@@ -518,14 +2088,25 @@ class SalesforceToBigquery:
         saves every batch to a CSV file,
         and calls _run_bq_load_job to load the CSV to BigQuery.
 
+        Retrieving a batch is retried with exponential backoff
+        on transient errors. Batches that the sink has already loaded
+        in a previous run of the same job are skipped.
+
         Args:
-            bq (BigQueryHelper): BigQueryHelper object to use.
-            batches (typing.Iterable[typing.Iterable[str]]):
-                generator returned by _bulk_get_records call.
+            sink (ReplicationSink): replication sink to use.
+            batches (typing.Iterable[_ResultPage]):
+                generator returned by _bulk_get_records
+                or _rest_get_records call.
             sfdc_to_bq_field_map (typing.Dict[str, typing.Tuple[str, str]]):
                 Salesforce-to-BigQuery field name mapping dictionary.
             text_encoding: Text encoding to use.
             csv_delimiter: CSV delimiter to use.
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor
+                to account downloaded results with. Defaults to None.
+            run_stats (ReplicationRunStats, optional): Run statistics
+                to add pages, bytes and stage timings to. Defaults to None.
+            blob_lane (_BlobLane, optional): Lane that adds URI columns
+                of base64 fields to every batch. Defaults to None.
 
         Returns:
             int: Number of added records.
@@ -537,40 +2118,295 @@ class SalesforceToBigquery:
 
         for batch in batches:
             batch_count += 1
-            first_line = True
+
+            if not started_bq_ingestion:
+                sink.start_ingestion(
+                    list(sfdc_to_bq_field_map.values()))
+                started_bq_ingestion = True
+
+            loaded_rows = sink.loaded_batch_rows(batch_count)
+            if loaded_rows is not None:
+                logging.info("Batch %i was loaded before. Skipping it.",
+                             batch_count)
+                batch.skip()
+                record_count += loaded_rows
+                continue
 
             logging.info("Working on batch %i", batch_count)
             with tempfile.NamedTemporaryFile(
                     "w",
                     encoding=text_encoding,
-                    prefix=f"{bq.target_table_name}_",
+                    prefix=f"{sink.target_table_name}_",
                     suffix=".csv",
             ) as file:
-                has_valid_lines = False
-
-                # Processing lines from the returned CSV.
-                # We need to rename fields in the header (first line).
-
-                for chunk in batch:
-                    if first_line:
-                        index = chunk.find("\n")
-                        if index != -1:
-                            first_line = False
-                            if index < len(chunk) - 1:
-                                has_valid_lines = True
-                    else:
-                        has_valid_lines = True
-
-                    file.write(chunk)
-
-                file.flush()
-
-                if not started_bq_ingestion:
-                    bq.start_ingestion(list(sfdc_to_bq_field_map.values()))
-                    started_bq_ingestion = True
+                attempt = 1
+                while True:
+                    try:
+                        with (run_stats.stage(STAGE_DOWNLOAD) if run_stats
+                              else contextlib.nullcontext()):
+                            has_valid_lines = (
+                                SalesforceToBigquery._write_batch_to_file(
+                                    batch, file))
+                        break
+                    except Exception as ex:  # pylint:disable=broad-except
+                        if (attempt >= SalesforceToBigquery._MAX_BATCH_ATTEMPTS_
+                                or not _is_transient_error(ex)):
+                            raise
+                        delay = (SalesforceToBigquery._BATCH_RETRY_DELAY_ *
+                                 2**(attempt - 1))
+                        logging.warning(
+                            "⚠️ Failed to retrieve batch %i (attempt %i): %s."
+                            " Retrying in %.0f seconds.",
+                            batch_count, attempt, ex, delay)
+                        time.sleep(delay)
+                        attempt += 1
+
+                batch_bytes = os.path.getsize(file.name)
+                if api_governor:
+                    api_governor.record_result_bytes(batch_bytes)
+                if run_stats:
+                    run_stats.add_page(batch_bytes)
+
+                if has_valid_lines and blob_lane:
+                    with (run_stats.stage(STAGE_DOWNLOAD) if run_stats
+                          else contextlib.nullcontext()):
+                        blob_count = blob_lane.offload(file)
+                    logging.info("%i blobs of batch %i were stored.",
+                                 blob_count, batch_count)
 
                 if has_valid_lines:
-                    record_count += bq.load_batch_csv(file.name)
+                    with (run_stats.stage(STAGE_LOAD) if run_stats
+                          else contextlib.nullcontext()):
+                        record_count += sink.load_batch_csv(
+                            file.name, batch_number=batch_count)
                 else:
                     logging.info("No BigQuery records in this batch.")
         return record_count
+
+
+class SubmittedReplication:
+    """Replication of a Salesforce object which SFDC Bulk API 2.0 jobs
+    were submitted by SalesforceToBigquery.submit.
+
+    Jobs of many replications run in SFDC concurrently
+    while they are polled with poll(). Once all jobs of a replication
+    completed, complete() downloads and loads their results.
+    """
+
+    def __init__(self,
+                 sfdc_connection: Salesforce,
+                 api_name: str,
+                 sink: ReplicationSink,
+                 sfdc_to_bq_field_map: typing.Dict[str, typing.Tuple[str, str]],
+                 key_fields: typing.List[str],
+                 column_groups: typing.List[typing.List[str]],
+                 extract_job_ids: typing.List[str],
+                 batches: typing.Optional[typing.Iterable[typing.Any]],
+                 backfill_fields: typing.List[str],
+                 backfill_job_id: typing.Optional[str],
+                 recordstamp: datetime,
+                 mod_stamp_name: str,
+                 track_freshness: bool,
+                 reuse_bulk_jobs: bool,
+                 text_encoding: str,
+                 api_governor: typing.Optional[ApiLimitGovernor],
+                 run_stats: typing.Optional[ReplicationRunStats],
+                 blob_lane: typing.Optional[_BlobLane],
+                 start_time: float):
+        """SubmittedReplication constructor.
+
+        Args:
+            sfdc_connection (Salesforce): Salesforce connection
+            api_name (str): Salesforce object name
+            sink (ReplicationSink): replication sink
+            sfdc_to_bq_field_map (typing.Dict[str, typing.Tuple[str, str]]):
+                Salesforce-to-BigQuery field name mapping dictionary.
+            key_fields (typing.List[str]): Id and modification
+                timestamp fields.
+            column_groups (typing.List[typing.List[str]]): column groups
+                returned by _split_column_groups.
+            extract_job_ids (typing.List[str]): Bulk API jobs
+                extracting the object, one per column group.
+                Empty if records are queried with REST API.
+            batches (typing.Iterable, optional): REST API result pages
+                if records are queried with REST API.
+            backfill_fields (typing.List[str]): Id and fields to backfill.
+            backfill_job_id (str, optional): Bulk API job
+                extracting backfill_fields.
+            recordstamp (datetime): replication job timestamp.
+            mod_stamp_name (str): name of the modification timestamp field
+            track_freshness (bool): whether to fill in freshness
+                of replicated records in run_stats.
+            reuse_bulk_jobs (bool): whether the extract job
+                is persisted for reuse.
+            text_encoding (str): Text encoding to use
+            api_governor (ApiLimitGovernor, optional): SFDC API limits governor.
+            run_stats (ReplicationRunStats, optional): Run statistics
+                to fill in.
+            blob_lane (_BlobLane, optional): Lane of base64 fields.
+            start_time (float): time.time() when the replication started.
+        """
+        self.sfdc_connection = sfdc_connection
+        self.api_name = api_name
+        self.sink = sink
+        self.sfdc_to_bq_field_map = sfdc_to_bq_field_map
+        self.key_fields = key_fields
+        self.column_groups = column_groups
+        self.extract_job_ids = extract_job_ids
+        self.batches = batches
+        self.backfill_fields = backfill_fields
+        self.backfill_job_id = backfill_job_id
+        self.recordstamp = recordstamp
+        self.mod_stamp_name = mod_stamp_name
+        self.track_freshness = track_freshness
+        self.reuse_bulk_jobs = reuse_bulk_jobs
+        self.text_encoding = text_encoding
+        self.api_governor = api_governor
+        self.run_stats = run_stats
+        self.blob_lane = blob_lane
+        self.start_time = start_time
+
+        self._running_job_ids = list(self.job_ids)
+        self._submitted_at: typing.Optional[float] = time.monotonic()
+
+    @property
+    def job_ids(self) -> typing.List[str]:
+        """All Bulk API jobs of the replication."""
+        return self.extract_job_ids + ([self.backfill_job_id]
+                                       if self.backfill_job_id else [])
+
+    def poll(self) -> bool:
+        """Checks status of jobs that haven't completed yet.
+
+        Raises:
+            RuntimeError: A job failed.
+
+        Returns:
+            bool: True if all jobs completed.
+        """
+        self._running_job_ids = [
+            job_id for job_id in self._running_job_ids
+            if not SalesforceToBigquery._bulk_job_completed(  # pylint:disable=protected-access
+                self.sfdc_connection, job_id, self.api_governor)]
+        if self._running_job_ids:
+            return False
+        if self.run_stats and self._submitted_at is not None:
+            self.run_stats.add_stage_seconds(
+                STAGE_EXTRACT, time.monotonic() - self._submitted_at)
+            self._submitted_at = None
+        return True
+
+    def wait(self, job_status_interval: float = 10.0):
+        """Waits for all jobs to complete.
+
+        Args:
+            job_status_interval (float, optional): Job status polling interval
+                in seconds if there is no API limits governor.
+                Defaults to 10.0.
+
+        Raises:
+            RuntimeError: A job failed.
+        """
+        while self._running_job_ids:
+            logging.info("Waiting for SFDC job(s) %s.",
+                         ", ".join(self._running_job_ids))
+            if self.api_governor:
+                time.sleep(self.api_governor.job_status_interval())
+            else:
+                time.sleep(job_status_interval)
+            self.poll()
+
+    def complete(self):
+        """Downloads and loads results of completed jobs
+        within the concurrency limit set by the API limit governor,
+        and finalizes the destination."""
+        # pylint:disable=protected-access
+        run_stats = self.run_stats
+        try:
+            with (self.api_governor.slot() if self.api_governor
+                  else contextlib.nullcontext()):
+                if len(self.column_groups) > 1:
+                    added_records = (
+                        SalesforceToBigquery._extract_column_groups(
+                            self.sfdc_connection, self.sink,
+                            self.column_groups, self.extract_job_ids,
+                            self.sfdc_to_bq_field_map, self.key_fields,
+                            self.text_encoding,
+                            api_governor=self.api_governor,
+                            run_stats=run_stats, blob_lane=self.blob_lane))
+                else:
+                    batches = self.batches
+                    if self.extract_job_ids:
+                        logging.info(
+                            "Loading results of SFDC job %s to BigQuery.",
+                            self.extract_job_ids[0])
+                        batches = SalesforceToBigquery._bulk_result_pages(
+                            self.sfdc_connection, self.extract_job_ids[0],
+                            self.text_encoding)
+                    added_records = SalesforceToBigquery._upload_batches_to_bq(
+                        self.sink, batches, self.sfdc_to_bq_field_map,  # type: ignore
+                        self.text_encoding, api_governor=self.api_governor,
+                        run_stats=run_stats, blob_lane=self.blob_lane)
+
+            staged_modstamps = None
+            if run_stats and added_records and self.track_freshness:
+                # Run history tracks how stale replicated records are.
+                staged_modstamps = self.sink.staged_modstamps(
+                    self.sfdc_to_bq_field_map[self.mod_stamp_name][0])
+
+            logging.info("Finalizing BigQuery resources.")
+            with (run_stats.stage(STAGE_MERGE) if run_stats
+                  else contextlib.nullcontext()):
+                self.sink.finish_ingestion(added_records == 0)
+            if run_stats:
+                run_stats.rows = added_records
+                if staged_modstamps:
+                    run_stats.set_freshness(staged_modstamps,
+                                            self.recordstamp,
+                                            datetime.now(timezone.utc))
+                    logging.info(
+                        "Freshness lag %.0f seconds, arrival lag %.0f seconds"
+                        " on average and %.0f seconds at most, %i records"
+                        " in the overlap window.",
+                        run_stats.freshness_lag_seconds,
+                        run_stats.avg_arrival_lag_seconds,
+                        run_stats.max_arrival_lag_seconds,
+                        run_stats.overlap_rows)
+
+            logging.info("Total records processed: %i", added_records)
+
+            # Deleting SFDC job.
+            # We can only do it now because
+            # _upload_batches_to_bq dynamically retrieves results
+            # from the generator returned by _bulk_result_pages.
+            # Column group jobs are deleted when their results are loaded.
+            if len(self.column_groups) == 1 and self.extract_job_ids:
+                job_id = self.extract_job_ids[0]
+                logging.info("Deleting SFDC Bulk API 2.0 job %s", job_id)
+                SalesforceToBigquery._bulk_delete_job(self.sfdc_connection,
+                                                      job_id)
+                if self.reuse_bulk_jobs:
+                    self.sink.clear_bulk_jobs()
+
+            if self.backfill_job_id:
+                with (self.api_governor.slot() if self.api_governor
+                      else contextlib.nullcontext()):
+                    SalesforceToBigquery._backfill_columns(
+                        self.sfdc_connection, self.sink, self.backfill_job_id,
+                        self.backfill_fields, self.sfdc_to_bq_field_map,
+                        self.text_encoding, api_governor=self.api_governor,
+                        run_stats=run_stats)
+
+        except Exception:
+            logging.error(
+                "⛔️ Failed to run Salesforce to BigQuery Replication.\n",
+                exc_info=True,
+            )
+            raise
+
+        end_time = time.time()
+        logging.info(
+            "Salesforce to BigQuery Replication has been completed in"
+            " %f seconds.",
+            end_time - self.start_time,
+        )
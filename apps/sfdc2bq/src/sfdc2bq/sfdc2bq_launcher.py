@@ -13,19 +13,25 @@
 # limitations under the License.
 """ This module provides SFDC -> BigQuery extraction bootstrapper  """
 
+import functools
 import json
 import typing
 from urllib.parse import unquote, urlparse, parse_qs
 
-from google.api_core.client_info import ClientInfo
-from google.cloud import bigquery
-from google.cloud.exceptions import NotFound
-from google.cloud import secretmanager
-
-from simple_salesforce import Salesforce  # type: ignore
-
 # pylint:disable=wrong-import-position
-from sfdc2bq import sfdc2bq_replicate  # type: ignore
+from sfdc2bq import (ApiLimitGovernor, ReplicationPlan,  # type: ignore
+                     ReplicationRunStats, RunHistoryStore,
+                     sfdc2bq_plan, sfdc2bq_replicate, sfdc2bq_submit)
+from sfdc2bq.blob_store import open_blob_store  # type: ignore
+from sfdc2bq.run_history import (BigQueryRunHistoryStore,  # type: ignore
+                                 SqliteRunHistoryStore)
+
+# Client libraries are imported when they are first needed,
+# so the process gets to the first SFDC request faster.
+if typing.TYPE_CHECKING:
+    from google.cloud import bigquery
+    from simple_salesforce import Salesforce  # type: ignore
+    from sfdc2bq import SubmittedReplication  # type: ignore
 
 SFDC2BQ_USER_AGENT = f"sfdc2bq/1.0 (GPN:SFDC2BQ;)"
 
@@ -38,7 +44,20 @@ def replicate_sfdc_object_to_bq(
     bq_output_table_name: typing.Optional[str] = None,
     bq_location: str = "US",
     store_metadata: bool = False,
-    csv_delimiter: str = "COMMA"
+    csv_delimiter: str = "COMMA",
+    row_hash: bool = False,
+    reuse_bulk_jobs: bool = False,
+    api_governor: typing.Optional[ApiLimitGovernor] = None,
+    low_priority: bool = False,
+    local_sink_path: typing.Optional[str] = None,
+    change_log: bool = False,
+    force_full_reload: bool = False,
+    run_stats: typing.Optional[ReplicationRunStats] = None,
+    column_group_size: typing.Optional[int] = None,
+    reconcile: bool = False,
+    backfill_new_fields: bool = False,
+    blob_location: typing.Optional[str] = None,
+    cdc: bool = False
 ) -> None:
     """Replicates a single SFDC object to BigQuery
 
@@ -95,24 +114,281 @@ def replicate_sfdc_object_to_bq(
                                         Defaults to False.
         csv_delimiter (str, optional): The column delimiter used for CSV when
                                        exporting from Salesforce. Defaults to "COMMA".
+        row_hash (bool, optional): Whether to skip rows with unchanged
+                                   content when merging. Defaults to False.
+        reuse_bulk_jobs (bool, optional): Whether to reuse results of SFDC
+                                          Bulk API jobs of failed replications
+                                          with identical queries. Defaults to False.
+        api_governor (ApiLimitGovernor, optional): SFDC API limits governor
+                                                   shared by concurrent
+                                                   replications. Defaults to None.
+        low_priority (bool, optional): Whether the replication may be deferred
+                                       when SFDC API budget is low.
+                                       Defaults to False.
+        local_sink_path (str, optional): Directory to replicate to as local
+                                         Parquet files instead of BigQuery.
+                                         Defaults to None.
+        change_log (bool, optional): Whether to append replicated rows to
+                                     a change log table and expose the current
+                                     state as a view. Defaults to False.
+        force_full_reload (bool, optional): Whether to replicate all records
+                                            replacing the existing table.
+                                            Defaults to False.
+        run_stats (ReplicationRunStats, optional): Run statistics to fill in
+                                                    for the run history.
+                                                    Defaults to None.
+        column_group_size (int, optional): Maximum number of fields
+            extracted by one SFDC Bulk API job. Objects with more fields
+            are split into column groups extracted concurrently.
+            Defaults to None.
+        reconcile (bool, optional): Whether to replace only CreatedDate
+            months of the destination table that differ from SFDC
+            instead of replicating changed records. Defaults to False.
+        backfill_new_fields (bool, optional): Whether to backfill fields
+            missing in the existing destination table for all records
+            with a Bulk API job extracting only Id and these fields.
+            Defaults to False.
+        blob_location (str, optional): Cloud Storage location
+            (gs://bucket/prefix) or local directory to offload contents
+            of base64 fields to. Defaults to None.
+        cdc (bool, optional): Whether to write replicated rows directly
+            to the destination table with Id primary key
+            as BigQuery CDC upserts and deletes
+            instead of merging a temporary table.
+            Requires google-cloud-bigquery-storage package.
+            Defaults to False.
+    """
+
+    # SFDC connection goes first, so SFDC login doesn't wait
+    # for BigQuery client library to be imported.
+    sfdc_connection = _get_sfdc_connection(sfdc_auth_parameters)
+    # Local sink doesn't need BigQuery.
+    bq_client = (None if local_sink_path else
+                 _get_bigquery_client(bq_project_id, bq_location,
+                                      bq_dataset_name))
+
+    sfdc2bq_replicate(simple_sf_connection=sfdc_connection,
+                      api_name=api_name,
+                      bq_client=bq_client,
+                      project_id=bq_project_id,
+                      dataset_name=bq_dataset_name,
+                      output_table_name=bq_output_table_name,
+                      text_encoding="utf-8",
+                      include_non_standard_fields=True,
+                      store_metadata=store_metadata,
+                      csv_delimiter=csv_delimiter,
+                      row_hash=row_hash,
+                      reuse_bulk_jobs=reuse_bulk_jobs,
+                      api_governor=api_governor,
+                      low_priority=low_priority,
+                      local_sink_path=local_sink_path,
+                      change_log=change_log,
+                      force_full_reload=force_full_reload,
+                      run_stats=run_stats,
+                      column_group_size=column_group_size,
+                      reconcile=reconcile,
+                      backfill_new_fields=backfill_new_fields,
+                      blob_store=(open_blob_store(blob_location)
+                                  if blob_location else None),
+                      cdc=cdc)
+
+
+def submit_sfdc_object_replication(
+    sfdc_auth_parameters: typing.Union[str, typing.Dict[str, str]],
+    api_name: str,
+    bq_project_id: str,
+    bq_dataset_name: str,
+    bq_output_table_name: typing.Optional[str] = None,
+    bq_location: str = "US",
+    store_metadata: bool = False,
+    csv_delimiter: str = "COMMA",
+    row_hash: bool = False,
+    reuse_bulk_jobs: bool = False,
+    api_governor: typing.Optional[ApiLimitGovernor] = None,
+    low_priority: bool = False,
+    local_sink_path: typing.Optional[str] = None,
+    change_log: bool = False,
+    force_full_reload: bool = False,
+    run_stats: typing.Optional[ReplicationRunStats] = None,
+    column_group_size: typing.Optional[int] = None,
+    reconcile: bool = False,
+    backfill_new_fields: bool = False,
+    blob_location: typing.Optional[str] = None,
+    cdc: bool = False
+) -> typing.Optional["SubmittedReplication"]:
+    """Prepares replication of a single SFDC object to BigQuery
+    and submits its SFDC Bulk API jobs without waiting for them.
+
+    Args:
+        See replicate_sfdc_object_to_bq.
+
+    Returns:
+        SubmittedReplication: replication to poll and complete,
+            or None if the destination is in sync with SFDC.
+    """
+
+    sfdc_connection = _get_sfdc_connection(sfdc_auth_parameters)
+    bq_client = (None if local_sink_path else
+                 _get_bigquery_client(bq_project_id, bq_location,
+                                      bq_dataset_name))
+
+    return sfdc2bq_submit(simple_sf_connection=sfdc_connection,
+                          api_name=api_name,
+                          bq_client=bq_client,
+                          project_id=bq_project_id,
+                          dataset_name=bq_dataset_name,
+                          output_table_name=bq_output_table_name,
+                          text_encoding="utf-8",
+                          include_non_standard_fields=True,
+                          store_metadata=store_metadata,
+                          csv_delimiter=csv_delimiter,
+                          row_hash=row_hash,
+                          reuse_bulk_jobs=reuse_bulk_jobs,
+                          api_governor=api_governor,
+                          low_priority=low_priority,
+                          local_sink_path=local_sink_path,
+                          change_log=change_log,
+                          force_full_reload=force_full_reload,
+                          run_stats=run_stats,
+                          column_group_size=column_group_size,
+                          reconcile=reconcile,
+                          backfill_new_fields=backfill_new_fields,
+                          cdc=cdc,
+                          blob_store=(open_blob_store(blob_location)
+                                      if blob_location else None))
+
+
+def plan_sfdc_object_replication(
+    sfdc_auth_parameters: typing.Union[str, typing.Dict[str, str]],
+    api_name: str,
+    bq_project_id: str,
+    bq_dataset_name: str,
+    bq_output_table_name: typing.Optional[str] = None,
+    bq_location: str = "US",
+    row_hash: bool = False,
+    local_sink_path: typing.Optional[str] = None,
+    change_log: bool = False,
+    force_full_reload: bool = False,
+    column_group_size: typing.Optional[int] = None,
+    blob_location: typing.Optional[str] = None,
+    cdc: bool = False
+) -> ReplicationPlan:
+    """Estimates replication of a single SFDC object to BigQuery
+    without extracting data or creating BigQuery resources.
+
+    Args:
+        sfdc_auth_parameters (typing.Union[str, typing.Dict[str, str]]):
+            Secret Manager secret version name or a string dictionary
+            (see replicate_sfdc_object_to_bq).
+        api_name (str): API/Object name (account, opportunity, user, etc.)
+        bq_project_id (str): Target GCP project name.
+        bq_dataset_name (str): Target BigQuery dataset name.
+        bq_output_table_name (str, optional): Target BigQuery table name.
+        bq_location (str, optional): BigQuery location. Defaults to "US".
+        row_hash, local_sink_path, change_log, force_full_reload,
+        column_group_size, blob_location, cdc: replication options
+            to plan for, see replicate_sfdc_object_to_bq.
+
+    Returns:
+        ReplicationPlan: replication plan.
+    """
+
+    sfdc_connection = _get_sfdc_connection(sfdc_auth_parameters)
+    bq_client = (None if local_sink_path else
+                 _get_bigquery_client(bq_project_id, bq_location))
+
+    return sfdc2bq_plan(simple_sf_connection=sfdc_connection,
+                        api_name=api_name,
+                        bq_client=bq_client,
+                        project_id=bq_project_id,
+                        dataset_name=bq_dataset_name,
+                        output_table_name=bq_output_table_name,
+                        include_non_standard_fields=True,
+                        row_hash=row_hash,
+                        local_sink_path=local_sink_path,
+                        change_log=change_log,
+                        force_full_reload=force_full_reload,
+                        column_group_size=column_group_size,
+                        blob_store=(open_blob_store(blob_location)
+                                    if blob_location else None),
+                        cdc=cdc)
+
+
+def open_run_history(run_history: str,
+                     bq_project_id: str,
+                     bq_dataset_name: str,
+                     bq_location: str = "US") -> RunHistoryStore:
+    """Opens replication run history store.
+
+    Args:
+        run_history (str): "bigquery" for the run history table
+            in the target dataset, or a path to a local SQLite file.
+        bq_project_id (str): Target GCP project name.
+        bq_dataset_name (str): Target BigQuery dataset name.
+        bq_location (str, optional): BigQuery location. Defaults to "US".
+
+    Returns:
+        RunHistoryStore: run history store.
     """
+    if run_history.lower() == "bigquery":
+        bq_client = _get_bigquery_client(bq_project_id, bq_location,
+                                         bq_dataset_name)
+        return BigQueryRunHistoryStore(bq_client, bq_project_id,
+                                       bq_dataset_name)
+    return SqliteRunHistoryStore(run_history)
+
+
+def _get_bigquery_client(bq_project_id: str,
+                         bq_location: str,
+                         bq_dataset_name: typing.Optional[str] = None
+                         ) -> "bigquery.Client":
+    """Creates BigQuery client.
+
+    Args:
+        bq_project_id (str): GCP project name.
+        bq_location (str): BigQuery location.
+        bq_dataset_name (str, optional): BigQuery dataset name to create
+            if it doesn't exist. Defaults to None.
+
+    Returns:
+        bigquery.Client: BigQuery client.
+    """
+    # pylint:disable=import-outside-toplevel
+    from google.api_core.client_info import ClientInfo
+    from google.cloud import bigquery
+    from google.cloud.exceptions import NotFound
 
     client_info = ClientInfo(user_agent=SFDC2BQ_USER_AGENT)
     bq_client = bigquery.Client(project=bq_project_id,
                                 location=bq_location,
                                 client_info=client_info)
-    try:
-        _ = bq_client.get_dataset(bq_dataset_name)
-    except NotFound:
-        bq_client.create_dataset(bq_dataset_name, exists_ok=True)
+    if bq_dataset_name:
+        try:
+            _ = bq_client.get_dataset(bq_dataset_name)
+        except NotFound:
+            bq_client.create_dataset(bq_dataset_name, exists_ok=True)
+    return bq_client
+
+
+def _get_sfdc_connection(
+    sfdc_auth_parameters: typing.Union[str, typing.Dict[str, str]]
+) -> "Salesforce":
+    """Creates Simple Salesforce connection.
+
+    Args:
+        sfdc_auth_parameters (typing.Union[str, typing.Dict[str, str]]):
+            Secret Manager secret version name or a string dictionary
+            (see replicate_sfdc_object_to_bq).
+
+    Returns:
+        Salesforce: Simple Salesforce connection.
+    """
+    from simple_salesforce import Salesforce  # type: ignore # pylint:disable=import-outside-toplevel
 
     if isinstance(sfdc_auth_parameters, str):
         # sfdc_auth_parameters is a path to a Secret Manager secret
         # "projects/PROJECT_NUMBER/secrets/SECRET_NAME/versions/latest"
-        sm_client = secretmanager.SecretManagerServiceClient()
-        secret_response = sm_client.access_secret_version(
-            name=sfdc_auth_parameters)
-        secret_payload = secret_response.payload.data.decode("utf-8")
+        secret_payload = _access_secret(sfdc_auth_parameters)
         if secret_payload.startswith("salesforce://"):
             # Airflow connections string
             secret_payload = unquote(
@@ -155,15 +431,25 @@ def replicate_sfdc_object_to_bq(
             auth_dict["domain"] = auth_dict["domain"].replace(
                 ".salesforce.com", "")
 
-    sfdc_connection = Salesforce(**auth_dict)  # type: ignore
+    return Salesforce(**auth_dict)  # type: ignore
 
-    sfdc2bq_replicate(simple_sf_connection=sfdc_connection,
-                      api_name=api_name,
-                      bq_client=bq_client,
-                      project_id=bq_project_id,
-                      dataset_name=bq_dataset_name,
-                      output_table_name=bq_output_table_name,
-                      text_encoding="utf-8",
-                      include_non_standard_fields=True,
-                      store_metadata=store_metadata,
-                      csv_delimiter=csv_delimiter)
+
+@functools.lru_cache(maxsize=None)
+def _access_secret(secret_version_name: str) -> str:
+    """Retrieves Secret Manager secret value.
+    The value is retrieved once per process
+    and shared by all replication threads.
+
+    Args:
+        secret_version_name (str): Secret version name as
+            projects/PROJECT_NUMBER/secrets/SECRET_NAME/versions/latest
+
+    Returns:
+        str: Secret value.
+    """
+    from google.cloud import secretmanager  # pylint:disable=import-outside-toplevel
+
+    sm_client = secretmanager.SecretManagerServiceClient()
+    secret_response = sm_client.access_secret_version(
+        name=secret_version_name)
+    return secret_response.payload.data.decode("utf-8")
@@ -0,0 +1,125 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of the SFDC API limits governor.  """
+
+import threading
+import typing
+import unittest
+from unittest import mock
+
+from sfdc2bq.api_limit_governor import ApiLimitGovernor
+
+
+def _governor(api_remaining: typing.Optional[int] = None,
+              bulk_remaining_mb: typing.Optional[int] = None,
+              reserve_ratio: float = 0.25) -> ApiLimitGovernor:
+    """Makes a governor with 8 slots, 10 seconds polling interval
+    and limits of 1000 API calls and 1000 MB of Bulk API results."""
+    governor = ApiLimitGovernor(max_concurrency=8,
+                                reserve_ratio=reserve_ratio,
+                                job_status_interval=10.0)
+    limits = {}
+    if api_remaining is not None:
+        limits["DailyApiRequests"] = {"Max": 1000,
+                                      "Remaining": api_remaining}
+    if bulk_remaining_mb is not None:
+        limits["DailyBulkV2QueryFileStorageMB"] = {
+            "Max": 1000, "Remaining": bulk_remaining_mb}
+    sfdc_connection = mock.MagicMock()
+    sfdc_connection.limits.return_value = limits
+    governor.refresh_limits(sfdc_connection, force=True)
+    return governor
+
+
+class BudgetTest(unittest.TestCase):
+    """Concurrency, polling and deferral follow the budget ratio."""
+
+    def test_unknown_limits(self):
+        governor = _governor()
+        self.assertEqual(governor.budget_ratio(), 1.0)
+        self.assertEqual(governor.concurrency(), 8)
+        self.assertEqual(governor.job_status_interval(), 10.0)
+        self.assertFalse(governor.should_defer(low_priority=True))
+
+    def test_budget_at_twice_the_reserve_is_not_low(self):
+        governor = _governor(api_remaining=500)
+        self.assertEqual(governor.concurrency(), 8)
+        self.assertEqual(governor.job_status_interval(), 10.0)
+        self.assertFalse(governor.should_defer(low_priority=True))
+
+    def test_low_budget(self):
+        governor = _governor(api_remaining=375)
+        self.assertEqual(governor.concurrency(), 4)
+        self.assertEqual(governor.job_status_interval(), 20.0)
+        self.assertTrue(governor.should_defer(low_priority=True))
+        self.assertFalse(governor.should_defer(low_priority=False))
+
+    def test_budget_below_the_reserve(self):
+        governor = _governor(api_remaining=100)
+        self.assertEqual(governor.concurrency(), 1)
+        self.assertEqual(governor.job_status_interval(), 60.0)
+        self.assertTrue(governor.should_defer(low_priority=True))
+
+    def test_lowest_limit_is_the_budget(self):
+        governor = _governor(api_remaining=1000, bulk_remaining_mb=375)
+        self.assertEqual(governor.budget_ratio(), 0.375)
+        self.assertEqual(governor.concurrency(), 4)
+
+    def test_downloaded_results_reduce_the_budget(self):
+        governor = _governor(bulk_remaining_mb=500)
+        governor.record_result_bytes(125 * 1024 * 1024)
+        self.assertEqual(governor.concurrency(), 4)
+
+    def test_zero_reserve(self):
+        governor = _governor(api_remaining=10, reserve_ratio=0.0)
+        self.assertEqual(governor.concurrency(), 8)
+        self.assertEqual(governor.job_status_interval(), 10.0)
+        self.assertFalse(governor.should_defer(low_priority=True))
+
+
+class SlotTest(unittest.TestCase):
+    """Replications wait for a slot."""
+
+    def test_slot_waits_for_release(self):
+        governor = _governor(api_remaining=100)
+        entered = threading.Event()
+
+        def replicate():
+            with governor.slot():
+                entered.set()
+
+        with governor.slot():
+            thread = threading.Thread(target=replicate)
+            thread.start()
+            self.assertFalse(entered.wait(0.2))
+        self.assertTrue(entered.wait(5))
+        thread.join()
+
+    def test_slots_up_to_concurrency(self):
+        governor = _governor()
+        entered = threading.Event()
+
+        def replicate():
+            with governor.slot():
+                entered.set()
+
+        with governor.slot():
+            thread = threading.Thread(target=replicate)
+            thread.start()
+            self.assertTrue(entered.wait(5))
+        thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
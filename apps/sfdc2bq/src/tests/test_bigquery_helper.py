@@ -0,0 +1,472 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of BigQueryHelper.  """
+
+from datetime import datetime, timezone
+import os
+import tempfile
+import typing
+import unittest
+from unittest import mock
+
+from google.api_core.exceptions import ServiceUnavailable
+from google.cloud import bigquery
+from google.cloud.exceptions import NotFound
+
+from sfdc2bq.bigquery_helper import BigQueryHelper
+from sfdc2bq.job_costs import (JOB_STAGE_MERGE, STRATEGY_MERGE,
+                               STRATEGY_TRANSACTION)
+
+
+_LAST_JOB_TIMESTAMP = datetime(2023, 12, 31, tzinfo=timezone.utc)
+_FIELDS = [("Id", "STRING"), ("Name", "STRING"), ("IsDeleted", "BOOL"),
+           ("SystemModstamp", "TIMESTAMP")]
+
+
+def _make_helper(client: mock.MagicMock, **kwargs) -> BigQueryHelper:
+    client.default_query_job_config = None
+    return BigQueryHelper(project_id="p",
+                          dataset_name="d",
+                          target_table_name="Account",
+                          job_timestamp=datetime(2024, 1, 1,
+                                                 tzinfo=timezone.utc),
+                          id_field_name="Id",
+                          timestamp_field_name="Recordstamp",
+                          has_is_deleted=True,
+                          has_is_archived=False,
+                          bigquery_client=client,
+                          **kwargs)
+
+
+class LoadCsvRetryTest(unittest.TestCase):
+    """Retrying transient errors of batch loads."""
+
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.client.get_table.side_effect = NotFound("missing")
+        self.helper = _make_helper(self.client)
+        sleep_patch = mock.patch("sfdc2bq.bigquery_helper.time.sleep")
+        self.sleep = sleep_patch.start()
+        self.addCleanup(sleep_patch.stop)
+
+    def _load(self, csv_path: str) -> int:
+        return self.helper._load_csv(  # pylint:disable=protected-access
+            csv_path, self.helper.temp_table_ref, bigquery.LoadJobConfig(),
+            batch_number=1)
+
+    def _csv_file(self) -> str:
+        with tempfile.NamedTemporaryFile("w", suffix=".csv",
+                                         delete=False) as file:
+            file.write("Id\n001\n")
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_submit_errors_are_bounded(self):
+        self.client.load_table_from_file.side_effect = ServiceUnavailable(
+            "unavailable")
+        with self.assertRaises(ServiceUnavailable):
+            self._load(self._csv_file())
+        self.assertEqual(self.client.load_table_from_file.call_count,
+                         BigQueryHelper._MAX_LOAD_ATTEMPTS_)
+        # Submitting failed, so every attempt reused the same job id.
+        job_ids = {c.kwargs["job_id"]
+                   for c in self.client.load_table_from_file.call_args_list}
+        self.assertEqual(len(job_ids), 1)
+
+    def test_running_job_errors_are_bounded(self):
+        job = mock.MagicMock()
+        job.error_result = None
+        job.result.side_effect = ServiceUnavailable("unavailable")
+        self.client.load_table_from_file.return_value = job
+        with self.assertRaises(ServiceUnavailable):
+            self._load(self._csv_file())
+        self.assertEqual(job.result.call_count,
+                         BigQueryHelper._MAX_LOAD_ATTEMPTS_)
+
+    def test_failed_job_gets_new_job_id(self):
+        failed_job = mock.MagicMock()
+        failed_job.error_result = {"reason": "backendError"}
+        failed_job.result.side_effect = ServiceUnavailable("unavailable")
+        job = mock.MagicMock()
+        job.output_rows = 1
+        self.client.load_table_from_file.side_effect = [failed_job, job]
+        self.assertEqual(self._load(self._csv_file()), 1)
+        job_ids = [c.kwargs["job_id"]
+                   for c in self.client.load_table_from_file.call_args_list]
+        self.assertEqual(len(set(job_ids)), 2)
+        self.assertTrue(job_ids[1].endswith("_2"))
+
+
+class _FinishIngestionTest(unittest.TestCase):
+    """BigQueryHelper with an existing destination table
+    and a client recording queries."""
+
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.queries: typing.List[str] = []
+        target = bigquery.Table("p.d.Account",
+                                schema=[
+                                    bigquery.SchemaField("Id", "STRING"),
+                                    bigquery.SchemaField("Name", "STRING"),
+                                    bigquery.SchemaField(
+                                        "SystemModstamp", "TIMESTAMP"),
+                                    bigquery.SchemaField(
+                                        "Recordstamp", "TIMESTAMP"),
+                                    bigquery.SchemaField("RowHash", "INT64"),
+                                ])
+        self.staged_rows = 1
+        self.staged_bytes = 0
+        self.job_configs: typing.List[bigquery.QueryJobConfig] = []
+        self.helper: typing.Optional[BigQueryHelper] = None
+
+        def get_table(table_ref):
+            if table_ref.table_id == "Account":
+                return target
+            staging = bigquery.Table(table_ref, schema=self.helper.schema)
+            staging._properties["numRows"] = str(self.staged_rows)  # pylint:disable=protected-access
+            staging._properties["numBytes"] = str(self.staged_bytes)  # pylint:disable=protected-access
+            return staging
+
+        def query(query, job_config=None, **_):
+            self.queries.append(" ".join(query.split()))
+            self.job_configs.append(job_config)
+            job = mock.MagicMock(total_bytes_billed=0,
+                                 total_bytes_processed=0,
+                                 slot_millis=0)
+            job.__iter__.return_value = iter([(_LAST_JOB_TIMESTAMP,)])
+            return job
+
+        self.client.get_table.side_effect = get_table
+        self.client.query.side_effect = query
+        self.client.create_table.side_effect = lambda table, **_: table
+        self.client.update_table.side_effect = lambda table, _: table
+
+    def _finish_queries(self, finish_empty_job: bool) -> typing.List[str]:
+        self.helper.start_ingestion(_FIELDS)
+        self.queries.clear()
+        self.helper.finish_ingestion(finish_empty_job)
+        return self.queries
+
+
+class SmallDeltaTest(_FinishIngestionTest):
+    """Merge strategy and priority of incremental deltas."""
+
+    def setUp(self):
+        super().setUp()
+        self.helper = _make_helper(self.client)
+
+    def _merge(self) -> typing.Tuple[str, str, str]:
+        """Returns the merge query, its strategy and priority."""
+        queries = self._finish_queries(False)
+        self.assertEqual(len(queries), 1)
+        strategy, = [strategy for stage, strategy in self.helper.job_costs.costs()
+                     if stage == JOB_STAGE_MERGE]
+        return queries[0], strategy, self.job_configs[-1].priority
+
+    def test_small_delta_is_interactive_merge(self):
+        self.staged_rows = BigQueryHelper._SMALL_DELTA_MAX_ROWS_
+        self.staged_bytes = BigQueryHelper._SMALL_DELTA_MAX_BYTES_
+        query, strategy, priority = self._merge()
+        self.assertEqual(strategy, STRATEGY_MERGE)
+        self.assertEqual(priority, bigquery.QueryPriority.INTERACTIVE)
+        temp_table = self.helper.temp_table_name
+        # RowHash is a plain column of the destination without row hashes.
+        self.assertEqual(
+            query,
+            "MERGE `p.d.Account` AS T "
+            f"USING (SELECT * FROM `p.d.{temp_table}` WHERE TRUE "
+            "QUALIFY ROW_NUMBER() OVER (PARTITION BY Id) = 1) AS S "
+            "ON T.Id = S.Id "
+            "WHEN MATCHED AND NOT IFNULL(NOT S.IsDeleted, FALSE) THEN DELETE "
+            "WHEN MATCHED THEN UPDATE SET Id = S.Id, Name = S.Name, "
+            "SystemModstamp = S.SystemModstamp, RowHash = S.RowHash, "
+            "Recordstamp = TIMESTAMP('2024-01-01T00:00:00.000000Z') "
+            "WHEN NOT MATCHED AND IFNULL(NOT S.IsDeleted, FALSE) THEN "
+            "INSERT (Id,Name,SystemModstamp,RowHash,Recordstamp) "
+            "VALUES (S.Id,S.Name,S.SystemModstamp,S.RowHash,"
+            "TIMESTAMP('2024-01-01T00:00:00.000000Z'));")
+
+    def test_many_rows_are_batch_transaction(self):
+        self.staged_rows = BigQueryHelper._SMALL_DELTA_MAX_ROWS_ + 1
+        query, strategy, priority = self._merge()
+        self.assertEqual(strategy, STRATEGY_TRANSACTION)
+        self.assertEqual(priority, bigquery.QueryPriority.BATCH)
+        self.assertTrue(query.startswith("BEGIN TRANSACTION;"))
+
+    def test_many_bytes_are_batch_transaction(self):
+        self.staged_bytes = BigQueryHelper._SMALL_DELTA_MAX_BYTES_ + 1
+        query, strategy, priority = self._merge()
+        self.assertEqual(strategy, STRATEGY_TRANSACTION)
+        self.assertEqual(priority, bigquery.QueryPriority.BATCH)
+        self.assertTrue(query.startswith("BEGIN TRANSACTION;"))
+
+
+class RowHashMergeTest(_FinishIngestionTest):
+    """Merging incremental deltas with row hashes."""
+
+    def setUp(self):
+        super().setUp()
+        self.helper = _make_helper(self.client,
+                                   row_hash_field_name="RowHash",
+                                   row_hash_exclude_fields=["SystemModstamp"])
+        self.assertEqual(self.helper.last_job_timestamp, _LAST_JOB_TIMESTAMP)
+
+    def _merge_query(self) -> str:
+        queries = self._finish_queries(False)
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[1].startswith(
+            "MERGE INTO `p.d._sfdc_watermarks`"))
+        return queries[0]
+
+    def test_small_delta_merge_skips_unchanged_rows(self):
+        query = self._merge_query()
+        self.assertTrue(query.startswith("MERGE `p.d.Account`"))
+        self.assertIn("WHEN MATCHED AND T.RowHash IS DISTINCT FROM "
+                      "S._sfdc2bq_row_hash THEN UPDATE", query)
+        self.assertEqual(query.count("WHEN MATCHED"), 2)
+
+    def test_transaction_skips_unchanged_rows(self):
+        self.staged_rows = BigQueryHelper._SMALL_DELTA_MAX_ROWS_ + 1
+        query = self._merge_query()
+        self.assertTrue(query.startswith("BEGIN TRANSACTION"))
+        self.assertNotIn("UPDATE", query)
+
+    def test_empty_job_moves_watermark(self):
+        queries = self._finish_queries(True)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith(
+            "MERGE INTO `p.d._sfdc_watermarks`"))
+
+    def test_watermark_is_last_job_timestamp(self):
+        watermark = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        def query(query, **_):
+            job = mock.MagicMock(total_bytes_billed=0)
+            job.__iter__.return_value = iter(
+                [(watermark if "_sfdc_watermarks" in query
+                  else _LAST_JOB_TIMESTAMP,)])
+            return job
+
+        self.client.query.side_effect = query
+        helper = _make_helper(self.client, row_hash_field_name="RowHash")
+        self.assertEqual(helper.last_job_timestamp, watermark)
+
+
+class ForcedFullReloadTest(_FinishIngestionTest):
+    """Forced full reload of an existing table without SFDC records."""
+
+    def test_empty_staging_table_replaces_destination(self):
+        self.helper = _make_helper(self.client, force_full_reload=True)
+        self.assertTrue(self.helper.full_ingestion)
+        self._finish_queries(True)
+        self.client.copy_table.assert_called_once()
+        copy_config = self.client.copy_table.call_args.kwargs["job_config"]
+        self.assertEqual(copy_config.write_disposition,
+                         bigquery.WriteDisposition.WRITE_TRUNCATE)
+
+    def test_row_hash_destination_is_emptied(self):
+        self.helper = _make_helper(self.client,
+                                   force_full_reload=True,
+                                   row_hash_field_name="RowHash")
+        queries = self._finish_queries(True)
+        self.assertEqual(len(queries), 2)
+        self.assertIn("DELETE FROM `p.d.Account` WHERE TRUE;", queries[0])
+
+
+class ReplaceCreatedRangesTest(_FinishIngestionTest):
+    """Reconciliation replaces rows in creation date ranges."""
+
+    def _reconcile_queries(self, **kwargs) -> typing.List[str]:
+        self.helper = _make_helper(self.client, **kwargs)
+        self.helper.replace_created_ranges(
+            "CreatedDate",
+            [(None, None),
+             (datetime(2023, 11, 1, tzinfo=timezone.utc),
+              datetime(2024, 1, 1, tzinfo=timezone.utc))])
+        return self._finish_queries(True)
+
+    def test_ranges_are_replaced(self):
+        queries = self._reconcile_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith(
+            "BEGIN TRANSACTION; DELETE FROM `p.d.Account` WHERE "
+            "(CreatedDate IS NULL OR "
+            "(CreatedDate >= TIMESTAMP('2023-11-01T00:00:00Z') AND "
+            "CreatedDate < TIMESTAMP('2024-01-01T00:00:00Z'))); "
+            "INSERT INTO `p.d.Account`"))
+        # Reconciled rows keep the last replication timestamp.
+        self.assertIn("TIMESTAMP('2023-12-31T00:00:00.000000Z') "
+                      "FROM `p.d.", queries[0])
+        self.assertIn("WHERE NOT IsDeleted; COMMIT TRANSACTION;",
+                      queries[0])
+
+    def test_watermark_is_not_stored(self):
+        queries = self._reconcile_queries(row_hash_field_name="RowHash")
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("_sfdc_watermarks", queries[0])
+
+    def test_full_ingestion_is_rejected(self):
+        self.helper = _make_helper(self.client, force_full_reload=True)
+        with self.assertRaises(RuntimeError):
+            self.helper.replace_created_ranges("CreatedDate", [(None, None)])
+
+
+class JoinColumnGroupsTest(_FinishIngestionTest):
+    """Joining column group staging tables."""
+
+    def test_join_query(self):
+        self.helper = _make_helper(self.client)
+        self.helper.start_ingestion(_FIELDS)
+        temp_table = self.helper.temp_table_name
+        groups = []
+        for i, fields in enumerate([["Id", "SystemModstamp", "Name"],
+                                    ["Id", "SystemModstamp", "IsDeleted"],
+                                    ["id", "systemmodstamp", "Phone"]]):
+            group = self.helper.column_group_sink(i)
+            group.start_ingestion([(f, "STRING") for f in fields])
+            groups.append(group)
+        self.queries.clear()
+        self.helper.join_column_groups(groups, ["Id", "SystemModstamp"])
+        self.assertEqual(self.queries, [
+            f"INSERT INTO `p.d.{temp_table}` "
+            "(`Id`, `SystemModstamp`, `Name`, `IsDeleted`, `Phone`) "
+            "SELECT g0.`Id`, g0.`SystemModstamp`, g0.`Name`, "
+            "g1.`IsDeleted`, g2.`Phone` "
+            f"FROM `p.d.{temp_table}_g0` AS g0 "
+            f"INNER JOIN `p.d.{temp_table}_g1` AS g1 "
+            "ON g0.`Id` = g1.`Id` AND g0.`SystemModstamp` = g1.`SystemModstamp` "
+            f"INNER JOIN `p.d.{temp_table}_g2` AS g2 "
+            "ON g0.`Id` = g2.`Id` AND g0.`SystemModstamp` = g2.`SystemModstamp`"
+        ])
+        self.assertEqual(
+            [c.args[0].table_id for c in self.client.delete_table.call_args_list],
+            [f"{temp_table}_g{i}" for i in range(3)])
+
+
+class BackfillColumnsTest(_FinishIngestionTest):
+    """Detecting and backfilling fields new to the destination."""
+
+    def test_new_target_fields(self):
+        self.helper = _make_helper(self.client)
+        self.assertEqual(
+            self.helper.new_target_fields(
+                ["Id", "name", "Phone", "IsDeleted", "Industry"]),
+            ["Phone", "Industry"])
+
+    def test_missing_destination_has_no_new_fields(self):
+        self.helper = _make_helper(self.client)
+        self.client.get_table.side_effect = NotFound("missing")
+        self.assertEqual(self.helper.new_target_fields(["Id", "Phone"]), [])
+
+    def test_update_query(self):
+        self.helper = _make_helper(self.client)
+        self.helper.start_ingestion(_FIELDS)
+        backfill = self.helper.backfill_sink()
+        backfill.start_ingestion([("Id", "STRING"), ("Phone", "STRING"),
+                                  ("Industry", "STRING")])
+        self.queries.clear()
+        self.job_configs.clear()
+        self.helper.backfill_columns(backfill)
+        staging_table = f"{self.helper.temp_table_name}_backfill"
+        self.assertEqual(self.queries, [
+            "UPDATE `p.d.Account` AS T "
+            "SET `Phone` = S.`Phone`, `Industry` = S.`Industry` "
+            f"FROM ( SELECT * FROM `p.d.{staging_table}` WHERE TRUE "
+            "QUALIFY ROW_NUMBER() OVER ( PARTITION BY Id) = 1 ) AS S "
+            "WHERE T.Id = S.Id"
+        ])
+        self.assertEqual(self.job_configs[0].priority,
+                         bigquery.QueryPriority.BATCH)
+        self.assertEqual(
+            self.client.delete_table.call_args.args[0].table_id,
+            staging_table)
+
+
+class ChangeLogTargetTest(unittest.TestCase):
+    """Checking the change log mode destination."""
+
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.target = bigquery.Table("p.d.Account")
+
+        def get_table(table_ref):
+            if table_ref.table_id == "Account":
+                return self.target
+            raise NotFound("missing")
+
+        self.client.get_table.side_effect = get_table
+
+    def test_table_destination_fails_before_changes(self):
+        self.target._properties["type"] = "TABLE"  # pylint:disable=protected-access
+        with self.assertRaises(RuntimeError):
+            _make_helper(self.client, change_log=True)
+        self.client.query.assert_not_called()
+        self.client.create_table.assert_not_called()
+
+    def test_view_destination_is_accepted(self):
+        self.target._properties["type"] = "VIEW"  # pylint:disable=protected-access
+        helper = _make_helper(self.client, change_log=True)
+        self.assertTrue(helper.full_ingestion)
+
+
+class ChangeLogFullReloadTest(_FinishIngestionTest):
+    """Forced full reload in change log mode."""
+
+    def setUp(self):
+        super().setUp()
+        view = bigquery.Table("p.d.Account")
+        view._properties["type"] = "VIEW"  # pylint:disable=protected-access
+        change_log = bigquery.Table("p.d.Account_changelog",
+                                    schema=[bigquery.SchemaField(name, bq_type)
+                                            for name, bq_type in _FIELDS])
+        get_staging_table = self.client.get_table.side_effect
+
+        def get_table(table_ref):
+            if table_ref.table_id == "Account":
+                return view
+            if table_ref.table_id == "Account_changelog":
+                return change_log
+            return get_staging_table(table_ref)
+
+        self.client.get_table.side_effect = get_table
+
+    def test_missing_records_get_tombstones(self):
+        self.helper = _make_helper(self.client, change_log=True,
+                                   force_full_reload=True)
+        self.assertTrue(self.helper.full_ingestion)
+        queries = self._finish_queries(True)
+        self.assertEqual(len(queries), 1)
+        self.assertIn(
+            "INSERT INTO `p.d.Account_changelog` (Id,IsDeleted,Recordstamp) "
+            "SELECT Id,TRUE,TIMESTAMP('2024-01-01T00:00:00.000000Z') "
+            "FROM `p.d.Account_changelog` AS L", queries[0])
+        self.assertIn("AND NOT EXISTS (SELECT 1 FROM `p.d.Δ_Account_",
+                      queries[0])
+
+    def test_object_without_is_deleted_is_rejected(self):
+        self.client.default_query_job_config = None
+        with self.assertRaises(RuntimeError):
+            BigQueryHelper(project_id="p", dataset_name="d",
+                           target_table_name="Account",
+                           job_timestamp=datetime(2024, 1, 1,
+                                                  tzinfo=timezone.utc),
+                           id_field_name="Id",
+                           timestamp_field_name="Recordstamp",
+                           has_is_deleted=False, has_is_archived=False,
+                           bigquery_client=self.client,
+                           change_log=True, force_full_reload=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of offloading base64 fields to a blob store.  """
+
+import gzip
+import io
+import os
+import tempfile
+import typing
+import unittest
+from unittest import mock
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import requests
+import urllib3
+
+from sfdc2bq.blob_store import LocalBlobStore
+from sfdc2bq.salesforce_to_bigquery import _BlobLane
+
+
+def _response(status_code: int,
+              body: bytes = b"",
+              headers: typing.Optional[typing.Dict[str, str]] = None
+             ) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.raw = urllib3.HTTPResponse(body=io.BytesIO(body),
+                                        headers=headers,
+                                        status=status_code,
+                                        preload_content=False)
+    return response
+
+
+class BlobLaneTest(unittest.TestCase):
+    """Streaming blobs from SFDC to a local blob store."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()  # pylint:disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.sfdc_connection = mock.MagicMock()
+        self.sfdc_connection.base_url = "https://sfdc/"
+        self.responses: typing.Dict[str, requests.Response] = {}
+        self.sfdc_connection.session.request.side_effect = (
+            lambda method, url, **_: self.responses[url])
+        self.blob_lane = _BlobLane(self.sfdc_connection, "Attachment",
+                                   ["Body"], LocalBlobStore(temp_dir.name),
+                                   ",", "utf-8")
+
+    def _offload(self, record_id: str) -> typing.Optional[str]:
+        return self.blob_lane._offload_blob(record_id, "Body")  # pylint:disable=protected-access
+
+    @staticmethod
+    def _read(uri: str) -> bytes:
+        with open(url2pathname(urlparse(uri).path), "rb") as file:
+            return file.read()
+
+    def test_content_is_streamed_to_store(self):
+        content = os.urandom(3 * 1024 * 1024 + 17)
+        self.responses["https://sfdc/sobjects/Attachment/001A/Body"] = (
+            _response(200, content))
+        uri = self._offload("001A")
+        self.assertEqual(self._read(uri), content)
+        self.assertTrue(self.sfdc_connection.session.request.call_args
+                        .kwargs["stream"])
+
+    def test_gzip_content_is_decoded(self):
+        self.responses["https://sfdc/sobjects/Attachment/001A/Body"] = (
+            _response(200, gzip.compress(b"\x00\x01bin"),
+                      {"Content-Encoding": "gzip"}))
+        self.assertEqual(self._read(self._offload("001A")), b"\x00\x01bin")
+
+    def test_empty_fields_have_no_blob(self):
+        self.responses["https://sfdc/sobjects/Attachment/001A/Body"] = (
+            _response(404))
+        self.responses["https://sfdc/sobjects/Attachment/001B/Body"] = (
+            _response(200))
+        self.assertIsNone(self._offload("001A"))
+        self.assertIsNone(self._offload("001B"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of CdcSink.  """
+
+from datetime import datetime, timezone
+import os
+import tempfile
+import typing
+import unittest
+from unittest import mock
+
+from google.cloud import bigquery
+from google.cloud.exceptions import NotFound
+
+from sfdc2bq.cdc_sink import CdcSink, LocalCdcWriter
+
+_JOB_TIMESTAMP = datetime(2024, 1, 2, tzinfo=timezone.utc)
+_LAST_JOB_TIMESTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_FIELDS = [("Id", "STRING"), ("Name", "STRING"), ("IsDeleted", "BOOL"),
+           ("SystemModstamp", "TIMESTAMP")]
+
+
+class _FakeClient(mock.MagicMock):
+    """BigQuery client recording queries, with an optional
+    destination table and watermark."""
+
+    def configure(self,
+                  table: typing.Optional[bigquery.Table] = None,
+                  watermark: typing.Optional[datetime] = None):
+        self.default_query_job_config = None
+        self.queries: typing.List[str] = []
+
+        def get_table(table_ref):
+            if table is None or table_ref.table_id != table.table_id:
+                raise NotFound("missing")
+            return table
+
+        def query(query, **_):
+            self.queries.append(" ".join(query.split()))
+            job = mock.MagicMock(total_bytes_billed=0,
+                                 total_bytes_processed=0,
+                                 slot_millis=0)
+            job.result.return_value = ([(watermark,)] if watermark and
+                                       "SELECT recordstamp" in query else [])
+            return job
+
+        self.get_table.side_effect = get_table
+        self.query.side_effect = query
+
+
+def _existing_table(primary_key: typing.Optional[typing.List[str]] = None
+                   ) -> bigquery.Table:
+    table = bigquery.Table("p.d.Account",
+                           schema=[
+                               bigquery.SchemaField(name, bq_type)
+                               for name, bq_type in _FIELDS
+                               if name != "IsDeleted"
+                           ] + [bigquery.SchemaField("Recordstamp",
+                                                     "TIMESTAMP")])
+    if primary_key:
+        table._properties["tableConstraints"] = {
+            "primaryKey": {"columns": primary_key}}
+    return table
+
+
+class CdcSinkTest(unittest.TestCase):
+    """CDC ingestion with LocalCdcWriter."""
+
+    def setUp(self):
+        self.client = _FakeClient()
+        self.writer = LocalCdcWriter()
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint:disable=consider-using-with
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def _make_sink(self, **kwargs) -> CdcSink:
+        return CdcSink(project_id="p",
+                       dataset_name="d",
+                       target_table_name="Account",
+                       job_timestamp=_JOB_TIMESTAMP,
+                       id_field_name="Id",
+                       timestamp_field_name="Recordstamp",
+                       has_is_deleted=True,
+                       has_is_archived=False,
+                       bigquery_client=self.client,
+                       cdc_writer=self.writer,
+                       **kwargs)
+
+    def _write_csv(self, content: str) -> str:
+        path = os.path.join(self.temp_dir.name, "batch.csv")
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            file.write(content)
+        return path
+
+    def _statements(self, prefix: str) -> typing.List[str]:
+        return [q for q in self.client.queries if q.startswith(prefix)]
+
+    def test_new_table_is_created_with_primary_key(self):
+        self.client.configure()
+        sink = self._make_sink()
+        self.assertTrue(sink.full_ingestion)
+        sink.start_ingestion(_FIELDS)
+
+        created = self._statements("CREATE TABLE")
+        self.assertEqual(len(created), 1)
+        self.assertIn("PRIMARY KEY (Id) NOT ENFORCED", created[0])
+        self.assertNotIn("IsDeleted", created[0])
+        self.assertFalse(self._statements("TRUNCATE"))
+
+    def test_existing_table_without_watermark_gets_key_and_is_emptied(self):
+        self.client.configure(table=_existing_table())
+        sink = self._make_sink()
+        self.assertTrue(sink.full_ingestion)
+        sink.start_ingestion(_FIELDS)
+
+        self.assertEqual(self._statements("ALTER TABLE"), [
+            "ALTER TABLE `p.d.Account` ADD PRIMARY KEY (Id) NOT ENFORCED"
+        ])
+        self.assertEqual(self._statements("TRUNCATE"),
+                         ["TRUNCATE TABLE `p.d.Account`"])
+        self.assertFalse(self._statements("CREATE TABLE"))
+
+    def test_existing_table_with_other_primary_key_fails(self):
+        self.client.configure(table=_existing_table(["Name"]))
+        sink = self._make_sink()
+        with self.assertRaises(RuntimeError):
+            sink.start_ingestion(_FIELDS)
+        self.assertFalse(self._statements("TRUNCATE"))
+
+    def test_forced_full_reload_empties_table(self):
+        self.client.configure(table=_existing_table(["Id"]),
+                              watermark=_LAST_JOB_TIMESTAMP)
+        sink = self._make_sink(force_full_reload=True)
+        self.assertTrue(sink.full_ingestion)
+        sink.start_ingestion(_FIELDS)
+
+        self.assertFalse(self._statements("ALTER TABLE"))
+        self.assertEqual(len(self._statements("TRUNCATE")), 1)
+
+    def test_incremental_ingestion_applies_changes(self):
+        self.client.configure(table=_existing_table(["Id"]),
+                              watermark=_LAST_JOB_TIMESTAMP)
+        self.writer.rows = {
+            "001": {"Id": "001", "Name": "Old"},
+            "002": {"Id": "002", "Name": "Removed"},
+        }
+        sink = self._make_sink()
+        self.assertEqual(sink.last_job_timestamp, _LAST_JOB_TIMESTAMP)
+        sink.start_ingestion(_FIELDS)
+        written = sink.load_batch_csv(
+            self._write_csv(
+                "Id,Name,IsDeleted,SystemModstamp\n"
+                "001,New,false,2024-01-01T12:00:00.000Z\n"
+                "002,Removed,true,2024-01-01T12:00:00.000Z\n"
+                "003,Added,false,2024-01-01T13:00:00.000Z\n"))
+        sink.finish_ingestion(False)
+
+        self.assertEqual(written, 3)
+        self.assertFalse(self._statements("ALTER TABLE"))
+        self.assertFalse(self._statements("TRUNCATE"))
+        self.assertEqual(sorted(self.writer.rows), ["001", "003"])
+        self.assertEqual(self.writer.rows["001"]["Name"], "New")
+        self.assertEqual(self.writer.rows["003"]["Recordstamp"],
+                         _JOB_TIMESTAMP)
+        self.assertEqual(len(self._statements("MERGE INTO `p.d._sfdc_cdc")),
+                         1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of CLI cold start: importing main stays light.  """
+
+import json
+import subprocess
+import sys
+import unittest
+
+from conftest import APP_DIR
+
+# Libraries imported only when replication starts.
+_HEAVY_MODULES = ["google.cloud.bigquery", "google.cloud.secretmanager",
+                  "simple_salesforce"]
+# Generous bound of importing main, in seconds.
+_MAX_IMPORT_SECONDS = 2.0
+
+_IMPORT_SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+seconds = time.perf_counter() - started
+heavy = sorted(m for m in sys.modules
+               if any(m == h or m.startswith(h + ".")
+                      for h in {_HEAVY_MODULES!r}))
+print(json.dumps({{"seconds": seconds, "heavy": heavy}}))
+"""
+
+
+class ImportTimeTest(unittest.TestCase):
+    """Importing main in a fresh interpreter."""
+
+    def test_main_import_is_light(self):
+        result = subprocess.run([sys.executable, "-c", _IMPORT_SCRIPT],
+                                cwd=APP_DIR,
+                                capture_output=True,
+                                text=True,
+                                check=True,
+                                timeout=60)
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(stats["heavy"], [])
+        self.assertLess(stats["seconds"], _MAX_IMPORT_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of LocalParquetSink.  """
+
+from datetime import datetime, time, timezone
+import os
+import tempfile
+import typing
+import unittest
+
+import duckdb
+
+from sfdc2bq.local_sink import LocalParquetSink
+
+_FIRST_JOB_TIMESTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_SECOND_JOB_TIMESTAMP = datetime(2024, 1, 2, tzinfo=timezone.utc)
+_FIELDS = [("Id", "STRING"), ("Name", "STRING"), ("StartTime", "TIME"),
+           ("IsDeleted", "BOOL"), ("SystemModstamp", "TIMESTAMP")]
+_HEADER = "Id,Name,StartTime,IsDeleted,SystemModstamp"
+
+
+class LocalParquetSinkTest(unittest.TestCase):
+    """Replication to a local Parquet file."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()  # pylint:disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.base_path = temp_dir.name
+
+    def _sink(self, job_timestamp: datetime,
+              force_full_reload: bool = False) -> LocalParquetSink:
+        return LocalParquetSink(base_path=self.base_path,
+                                target_table_name="Account",
+                                job_timestamp=job_timestamp,
+                                id_field_name="Id",
+                                timestamp_field_name="Recordstamp",
+                                has_is_deleted=True,
+                                has_is_archived=False,
+                                force_full_reload=force_full_reload)
+
+    def _replicate(self, sink: LocalParquetSink,
+                   *pages: typing.List[str]) -> typing.List[int]:
+        sink.start_ingestion(_FIELDS)
+        row_counts = []
+        for page in pages:
+            csv_path = os.path.join(self.base_path, "page.csv")
+            with open(csv_path, "w", encoding="utf-8") as csv_file:
+                csv_file.write("\n".join([_HEADER] + page) + "\n")
+            row_counts.append(sink.load_batch_csv(csv_path))
+        sink.finish_ingestion(not any(row_counts))
+        return row_counts
+
+    def _rows(self) -> typing.List[typing.Tuple[typing.Any, ...]]:
+        return duckdb.execute(
+            "SELECT Id, Name, StartTime, Recordstamp::TIMESTAMP "
+            "FROM read_parquet(?) ORDER BY Id",
+            [os.path.join(self.base_path, "Account.parquet")]).fetchall()
+
+    def _first_job(self):
+        self._replicate(self._sink(_FIRST_JOB_TIMESTAMP), [
+            "001A,Alpha,09:30:00.000Z,false,2023-12-31T10:00:00.000Z",
+            "001B,Beta,,false,2023-12-31T11:00:00.000Z",
+        ], [
+            "001C,Gamma,17:05:30.250Z,true,2023-12-31T12:00:00.000Z",
+        ])
+
+    def test_full_load(self):
+        sink = self._sink(_FIRST_JOB_TIMESTAMP)
+        self.assertTrue(sink.full_ingestion)
+        self._first_job()
+        self.assertEqual(self._rows(), [
+            ("001A", "Alpha", time(9, 30), datetime(2024, 1, 1)),
+            ("001B", "Beta", None, datetime(2024, 1, 1)),
+        ])
+        self.assertEqual(sorted(os.listdir(self.base_path)),
+                         ["Account.parquet", "page.csv"])
+
+    def test_time_values_are_parsed(self):
+        self._replicate(self._sink(_FIRST_JOB_TIMESTAMP), [
+            "001A,Alpha,17:05:30.250Z,false,2023-12-31T10:00:00.000Z",
+        ])
+        self.assertEqual(self._rows()[0][2], time(17, 5, 30, 250000))
+
+    def test_incremental_merge(self):
+        self._first_job()
+        sink = self._sink(_SECOND_JOB_TIMESTAMP)
+        self.assertTrue(sink.incremental_ingestion)
+        self.assertEqual(sink.last_job_timestamp, _FIRST_JOB_TIMESTAMP)
+        self._replicate(sink, [
+            "001B,Beta 2,08:00:00.000Z,false,2024-01-01T10:00:00.000Z",
+            "001D,Delta,,false,2024-01-01T11:00:00.000Z",
+        ])
+        self.assertEqual(self._rows(), [
+            ("001A", "Alpha", time(9, 30), datetime(2024, 1, 1)),
+            ("001B", "Beta 2", time(8), datetime(2024, 1, 2)),
+            ("001D", "Delta", None, datetime(2024, 1, 2)),
+        ])
+
+    def test_deleted_records_are_removed(self):
+        self._first_job()
+        self._replicate(self._sink(_SECOND_JOB_TIMESTAMP), [
+            "001A,Alpha,09:30:00.000Z,true,2024-01-01T10:00:00.000Z",
+        ])
+        self.assertEqual([row[0] for row in self._rows()], ["001B"])
+
+    def test_empty_incremental_job_keeps_target(self):
+        self._first_job()
+        self._replicate(self._sink(_SECOND_JOB_TIMESTAMP))
+        self.assertEqual([row[0] for row in self._rows()], ["001A", "001B"])
+
+    def test_forced_full_reload_replaces_target(self):
+        self._first_job()
+        sink = self._sink(_SECOND_JOB_TIMESTAMP, force_full_reload=True)
+        self.assertIsNone(sink.last_job_timestamp)
+        self._replicate(sink, [
+            "001D,Delta,,false,2024-01-01T11:00:00.000Z",
+        ])
+        self.assertEqual([row[0] for row in self._rows()], ["001D"])
+
+    def test_staged_modstamps(self):
+        self._first_job()
+        sink = self._sink(_SECOND_JOB_TIMESTAMP)
+        sink.start_ingestion(_FIELDS)
+        self.assertIsNone(sink.staged_modstamps("SystemModstamp"))
+        csv_path = os.path.join(self.base_path, "page.csv")
+        with open(csv_path, "w", encoding="utf-8") as csv_file:
+            csv_file.write("\n".join([
+                _HEADER,
+                "001A,Alpha,,false,2023-12-31T23:00:00.000Z",
+                "001B,Beta,,false,2024-01-01T01:00:00.000Z",
+                "001C,Gamma,,false,2024-01-01T03:00:00.000Z",
+            ]) + "\n")
+        sink.load_batch_csv(csv_path)
+        modstamps = sink.staged_modstamps("SystemModstamp")
+        self.assertEqual(
+            modstamps.min_modstamp,
+            datetime(2023, 12, 31, 23, tzinfo=timezone.utc))
+        self.assertEqual(
+            modstamps.max_modstamp,
+            datetime(2024, 1, 1, 3, tzinfo=timezone.utc))
+        self.assertEqual(
+            modstamps.avg_modstamp,
+            datetime(2024, 1, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(modstamps.overlap_rows, 1)
+        sink.finish_ingestion(False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of the CLI.  """
+
+import unittest
+from unittest import mock
+
+import main
+
+
+class ReportTest(unittest.TestCase):
+    """Exit code of the run history report."""
+
+    def _report(self, regressions_count: int) -> int:
+        with mock.patch.object(main, "open_run_history"), \
+                mock.patch.object(main, "format_report", return_value=""), \
+                mock.patch.object(main, "find_regressions",
+                                  return_value=[object()] * regressions_count):
+            return main._report("bigquery", [], "p", "d", "US", 30, 2.0)  # pylint:disable=protected-access
+
+    def test_no_regressions_is_success(self):
+        self.assertEqual(self._report(0), 0)
+
+    def test_many_regressions_are_failure(self):
+        self.assertEqual(self._report(256), 1)
+
+
+class _FakeReplication:
+    """Submitted replication which jobs complete after `polls` polls."""
+
+    def __init__(self, api_name: str, polls: int, events: list):
+        self.api_name = api_name
+        self.polls = polls
+        self.events = events
+
+    def poll(self) -> bool:
+        self.polls -= 1
+        if self.polls < 0:
+            raise RuntimeError("Operation failed")
+        return self.polls == 0
+
+    def complete(self):
+        self.events.append(("complete", self.api_name))
+
+
+class ReplicationPipelineTest(unittest.TestCase):
+    """Jobs of all objects are submitted before results are loaded."""
+
+    def _main(self, polls):
+        events = []
+
+        def _submit(api_name, **_):
+            events.append(("submit", api_name))
+            if polls[api_name] is None:
+                return None
+            return _FakeReplication(api_name, polls[api_name], events)
+
+        with mock.patch.object(main, "submit_sfdc_object_replication",
+                               side_effect=_submit), \
+                mock.patch.object(main.time, "sleep"):
+            err = main.main(["--objects-to-replicate", ",".join(polls),
+                             "--project", "p", "--dataset", "d",
+                             "--sfdc-connection-secret", "s"])
+        return err, events
+
+    def test_jobs_are_submitted_first(self):
+        err, events = self._main({"A": 3, "B": 1, "C": 2, "D": None})
+        self.assertEqual(err, 0)
+        self.assertEqual(events[:4], [("submit", "A"), ("submit", "B"),
+                                      ("submit", "C"), ("submit", "D")])
+        self.assertEqual(sorted(e[1] for e in events[4:]), ["A", "B", "C"])
+        self.assertTrue(all(e[0] == "complete" for e in events[4:]))
+
+    def test_failed_job_fails_its_object(self):
+        err, events = self._main({"A": 1, "B": 0})
+        self.assertEqual(err, 1)
+        self.assertEqual([e[1] for e in events if e[0] == "complete"], ["A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
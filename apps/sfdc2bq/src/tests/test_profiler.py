@@ -0,0 +1,61 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of stage classification of profiled stacks.  """
+
+import os
+import types
+import typing
+import unittest
+
+from sfdc2bq import profiler
+
+_APP_FILE = os.path.join("sfdc2bq", "salesforce_to_bigquery.py")
+_TIME_FILE = "<built-in>"
+
+
+def _stack(*frames: typing.Tuple[str, str]) -> typing.List[typing.Any]:
+    return [types.SimpleNamespace(co_filename=file_name, co_name=name)
+            for file_name, name in frames]
+
+
+class ClassifyTest(unittest.TestCase):
+    """Attributing stacks to replication stages."""
+
+    def test_salesforce_waits_in_app_code(self):
+        for function_name in ["_bulk_wait_for_job", "_bulk_result_pages",
+                              "_rest_get_records", "_request_page",
+                              "_request_blob"]:
+            with self.subTest(function_name):
+                stack = _stack((_APP_FILE, "replicate"),
+                               (_APP_FILE, function_name),
+                               (_TIME_FILE, "sleep"))
+                self.assertEqual(profiler._classify(stack),  # pylint:disable=protected-access
+                                 profiler.STAGE_SALESFORCE)
+
+    def test_app_code_is_processing(self):
+        stack = _stack((_APP_FILE, "replicate"),
+                       (_APP_FILE, "_write_batch_to_file"))
+        self.assertEqual(profiler._classify(stack),  # pylint:disable=protected-access
+                         profiler.STAGE_PROCESSING)
+
+    def test_bigquery_takes_precedence(self):
+        stack = _stack((_APP_FILE, "_bulk_get_records"),
+                       (os.path.join("sfdc2bq", "bigquery_helper.py"),
+                        "load_batch_csv"))
+        self.assertEqual(profiler._classify(stack),  # pylint:disable=protected-access
+                         profiler.STAGE_BIGQUERY)
+
+
+if __name__ == "__main__":
+    unittest.main()
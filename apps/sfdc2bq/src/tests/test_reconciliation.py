@@ -0,0 +1,93 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of reconciliation by CreatedDate month buckets.  """
+
+from datetime import datetime, timezone
+import unittest
+
+from sfdc2bq.reconciliation import (BucketSummary, find_drifted_buckets,
+                                    format_buckets, merge_bucket_ranges,
+                                    soql_range_condition)
+
+_MODSTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _utc(year: int, month: int) -> datetime:
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+class FindDriftedBucketsTest(unittest.TestCase):
+    """Comparing bucket summaries of SFDC and the destination."""
+
+    def test_same_buckets_are_in_sync(self):
+        buckets = {(2024, 1): BucketSummary(10, _MODSTAMP),
+                   None: BucketSummary(1, _MODSTAMP)}
+        self.assertEqual(find_drifted_buckets(buckets, dict(buckets)), [])
+
+    def test_count_and_modstamp_differences(self):
+        source = {
+            (2023, 1): BucketSummary(5, _MODSTAMP),
+            (2023, 2): BucketSummary(5, _MODSTAMP),
+            (2023, 3): BucketSummary(5, _MODSTAMP),
+            None: BucketSummary(2, _MODSTAMP),
+        }
+        target = {
+            # missed update
+            (2023, 1): BucketSummary(5, datetime(2023, 12, 1,
+                                                 tzinfo=timezone.utc)),
+            (2023, 2): BucketSummary(5, _MODSTAMP),
+            # missed delete
+            (2023, 3): BucketSummary(6, _MODSTAMP),
+            # records missing in SFDC
+            (2022, 12): BucketSummary(1, _MODSTAMP),
+            # missed insert
+            None: BucketSummary(1, _MODSTAMP),
+        }
+        self.assertEqual(find_drifted_buckets(source, target),
+                         [None, (2022, 12), (2023, 1), (2023, 3)])
+
+
+class MergeBucketRangesTest(unittest.TestCase):
+    """Converting month buckets to creation date ranges."""
+
+    def test_adjacent_months_are_merged(self):
+        self.assertEqual(
+            merge_bucket_ranges([None, (2023, 11), (2023, 12), (2024, 1),
+                                 (2024, 3)]),
+            [(None, None), (_utc(2023, 11), _utc(2024, 2)),
+             (_utc(2024, 3), _utc(2024, 4))])
+
+    def test_no_buckets(self):
+        self.assertEqual(merge_bucket_ranges([]), [])
+
+
+class SoqlRangeConditionTest(unittest.TestCase):
+    """SOQL conditions of creation date ranges."""
+
+    def test_condition(self):
+        self.assertEqual(
+            soql_range_condition(
+                "CreatedDate",
+                [(None, None), (_utc(2023, 11), _utc(2024, 2))]),
+            "(CreatedDate=null OR "
+            "(CreatedDate>=2023-11-01T00:00:00Z AND "
+            "CreatedDate<2024-02-01T00:00:00Z))")
+
+    def test_format_buckets(self):
+        self.assertEqual(format_buckets([None, (2023, 1)]),
+                         "no date, 2023-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of replication planning.  """
+
+from datetime import datetime, timezone
+import unittest
+
+from sfdc2bq.replication_plan import (STRATEGY_BULK, STRATEGY_NONE,
+                                      STRATEGY_REST, TARGET_TABLE,
+                                      format_plans, make_plan)
+
+_LAST_JOB = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _plan(window_records: int = 100, **kwargs):
+    args = {"object_name": "Account", "table_name": "Account",
+            "target": TARGET_TABLE, "last_job_timestamp": _LAST_JOB,
+            "total_records": 1000000, "window_records": window_records,
+            "row_width_bytes": 100, "page_size": 10000,
+            "rest_query_max_records": 2000}
+    args.update(kwargs)
+    return make_plan(**args)
+
+
+class MakePlanTest(unittest.TestCase):
+    """Strategy follows the conditions of replication."""
+
+    def test_small_incremental_window_is_rest_query(self):
+        plan = _plan(2000)
+        self.assertEqual(plan.mode, "incremental")
+        self.assertEqual(plan.strategy, STRATEGY_REST)
+
+    def test_large_window_is_bulk_job(self):
+        plan = _plan(20001)
+        self.assertEqual(plan.strategy, STRATEGY_BULK)
+        self.assertEqual(plan.page_count, 3)
+        self.assertEqual(plan.window_bytes, 2000100)
+
+    def test_empty_window_is_nothing(self):
+        self.assertEqual(_plan(0).strategy, STRATEGY_NONE)
+
+    def test_small_full_load_is_bulk_job(self):
+        plan = _plan(10, last_job_timestamp=None)
+        self.assertEqual(plan.mode, "full")
+        self.assertEqual(plan.strategy, STRATEGY_BULK)
+
+    def test_base64_fields_are_bulk_job(self):
+        self.assertEqual(_plan(has_base64_fields=True).strategy,
+                         STRATEGY_BULK)
+
+    def test_column_groups_are_bulk_jobs(self):
+        plan = _plan(column_group_count=3)
+        self.assertEqual(plan.strategy, STRATEGY_BULK)
+        self.assertEqual(plan.column_group_count, 3)
+
+    def test_query_too_long_for_rest_is_bulk_job(self):
+        self.assertEqual(_plan(fits_rest_query=False).strategy,
+                         STRATEGY_BULK)
+
+    def test_format_plans(self):
+        lines = format_plans([_plan(), _plan(last_job_timestamp=None)]
+                             ).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("Column groups", lines[0])
+        self.assertEqual(lines[1].split()[:3],
+                         ["Account", "table", "incremental"])
+        self.assertIn(STRATEGY_REST, lines[1])
+        self.assertIn(STRATEGY_BULK, lines[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of REST API query results in the Bulk API CSV format.  """
+
+import csv
+import io
+import unittest
+from unittest import mock
+
+from sfdc2bq.salesforce_to_bigquery import _RestResultPage
+
+_DATETIME = "2024-01-02T03:04:05.000+0000"
+
+
+class RestResultPageTest(unittest.TestCase):
+    """Formatting REST API records as CSV."""
+
+    def _rows(self, record, field_names, timestamp_fields):
+        sfdc_connection = mock.MagicMock()
+        sfdc_connection.query.return_value = {"done": True,
+                                              "records": [record]}
+        page = _RestResultPage(sfdc_connection, "SELECT", None, False,
+                               field_names, ",",
+                               timestamp_fields=timestamp_fields)
+        return list(csv.reader(io.StringIO("".join(page))))
+
+    def test_only_timestamp_fields_are_rewritten(self):
+        rows = self._rows(
+            {"Id": "001A", "SystemModstamp": _DATETIME,
+             "Description": _DATETIME, "Owner": {"Type": "User"},
+             "IsDeleted": False},
+            ["Id", "SystemModstamp", "Description", "Owner.Type",
+             "IsDeleted"],
+            ["SystemModstamp"])
+        self.assertEqual(rows, [
+            ["Id", "SystemModstamp", "Description", "Owner.Type",
+             "IsDeleted"],
+            ["001A", "2024-01-02T03:04:05.000Z", _DATETIME, "User", "false"],
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Tests of SFDC extraction logic.  """
+
+from datetime import datetime, timezone
+import json
+import os
+import tempfile
+import typing
+import unittest
+from unittest import mock
+
+import duckdb
+
+from sfdc2bq.replication_plan import (STRATEGY_BULK, STRATEGY_REST,
+                                      TARGET_LOCAL)
+from sfdc2bq.salesforce_to_bigquery import SalesforceToBigquery
+
+
+def _field(name: str, field_type: str = "string") -> typing.Dict[str, typing.Any]:
+    return {"name": name, "type": field_type, "relationshipName": None,
+            "referenceTo": []}
+
+
+def _describe(custom_field_count: int) -> typing.Dict[str, typing.Any]:
+    return {"name": "Account",
+            "fields": [_field("Id", "id"), _field("IsDeleted", "boolean"),
+                       _field("SystemModstamp", "datetime")] +
+                      [_field(f"Custom_Field_With_A_Long_Name_{i:04d}__c")
+                       for i in range(custom_field_count)]}
+
+
+class _LocalSinkTest(unittest.TestCase):
+    """Replication of Account to a local sink with an existing file."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()  # pylint:disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.sink_path = temp_dir.name
+        # Existing target file makes replication incremental.
+        os.makedirs(os.path.join(self.sink_path, "d"))
+        duckdb.execute(
+            "COPY (SELECT 'x' AS Id, "
+            "TIMESTAMPTZ '2024-01-01 00:00:00+00' AS Recordstamp) "
+            f"TO '{os.path.join(self.sink_path, 'd', 'Account.parquet')}' "
+            "(FORMAT PARQUET)")
+
+
+class RestQueryFallbackTest(_LocalSinkTest):
+    """Small incremental deltas are queried with REST API
+    unless the query doesn't fit a REST API request URI."""
+
+    def _submit(self, custom_field_count: int):
+        sfdc_connection = mock.MagicMock()
+        sfdc_connection.base_url = (
+            "https://example.my.salesforce.com/services/data/v59.0/")
+        sfdc_connection.restful.side_effect = (
+            lambda path, **_: (_describe(custom_field_count)
+                               if path.endswith("describe/")
+                               else {"id": "750A"}))
+        sfdc_connection.query.return_value = {"totalSize": 10}
+        replication = SalesforceToBigquery.submit(
+            simple_sf_connection=sfdc_connection, api_name="Account",
+            bq_client=None, project_id="p", dataset_name="d",
+            include_non_standard_fields=True,
+            local_sink_path=self.sink_path)
+        return sfdc_connection, replication
+
+    def test_narrow_query_uses_rest_api(self):
+        sfdc_connection, replication = self._submit(10)
+        sfdc_connection.query.assert_called_once()
+        self.assertEqual(replication.extract_job_ids, [])
+        self.assertIsNotNone(replication.batches)
+
+    def test_wide_query_falls_back_to_bulk_api(self):
+        sfdc_connection, replication = self._submit(800)
+        query = sfdc_connection.restful.call_args.kwargs["data"]
+        self.assertGreater(len(query),
+                           SalesforceToBigquery._MAX_REST_URI_LENGTH_)  # pylint:disable=protected-access
+        sfdc_connection.query.assert_not_called()
+        self.assertEqual(replication.extract_job_ids, ["750A"])
+
+
+class PlanTest(_LocalSinkTest):
+    """Plans follow the sink and the query of replication."""
+
+    def _plan(self, custom_field_count: int, **kwargs):
+        sfdc_connection = mock.MagicMock()
+        sfdc_connection.base_url = (
+            "https://example.my.salesforce.com/services/data/v59.0/")
+        sfdc_connection.restful.return_value = _describe(custom_field_count)
+        sfdc_connection.query.return_value = {"totalSize": 10}
+        return SalesforceToBigquery.plan(
+            simple_sf_connection=sfdc_connection, api_name="Account",
+            bq_client=None, project_id="p", dataset_name="d",
+            include_non_standard_fields=True,
+            local_sink_path=self.sink_path, **kwargs)
+
+    def test_incremental_plan_of_local_sink(self):
+        plan = self._plan(10)
+        self.assertEqual(plan.target, TARGET_LOCAL)
+        self.assertEqual(plan.mode, "incremental")
+        self.assertEqual(plan.strategy, STRATEGY_REST)
+
+    def test_wide_query_is_planned_as_bulk_job(self):
+        self.assertEqual(self._plan(800).strategy, STRATEGY_BULK)
+
+    def test_forced_full_reload_is_planned_as_bulk_job(self):
+        plan = self._plan(10, force_full_reload=True)
+        self.assertEqual(plan.mode, "full")
+        self.assertEqual(plan.strategy, STRATEGY_BULK)
+
+
+class BackfillNewFieldsTest(unittest.TestCase):
+    """Fields missing in the destination table are backfilled
+    by a separate Bulk API job."""
+
+    def _submit(self, incremental_ingestion: bool = True):
+        sfdc_connection = mock.MagicMock()
+        sfdc_connection.base_url = (
+            "https://example.my.salesforce.com/services/data/v59.0/")
+        sfdc_connection.restful.side_effect = (
+            lambda path, **_: (_describe(3) if path.endswith("describe/")
+                               else {"id": "750B"}))
+        sfdc_connection.query.return_value = {"totalSize": 10}
+        sink = mock.MagicMock(
+            full_ingestion=not incremental_ingestion,
+            incremental_ingestion=incremental_ingestion,
+            last_job_timestamp=(datetime(2024, 1, 1, tzinfo=timezone.utc)
+                                if incremental_ingestion else None),
+            supports_column_backfill=True,
+            supports_column_groups=True)
+        sink.new_target_fields.return_value = [
+            "Custom_Field_With_A_Long_Name_0001__c"]
+        with mock.patch.object(SalesforceToBigquery, "_create_sink",
+                               return_value=sink):
+            replication = SalesforceToBigquery.submit(
+                simple_sf_connection=sfdc_connection, api_name="Account",
+                bq_client=None, project_id="p", dataset_name="d",
+                include_non_standard_fields=True,
+                backfill_new_fields=True)
+        return sfdc_connection, sink, replication
+
+    def test_new_fields_are_backfilled(self):
+        sfdc_connection, sink, replication = self._submit()
+        sink.new_target_fields.assert_called_once_with(
+            ["Id", "IsDeleted", "SystemModstamp",
+             "Custom_Field_With_A_Long_Name_0000__c",
+             "Custom_Field_With_A_Long_Name_0001__c",
+             "Custom_Field_With_A_Long_Name_0002__c"])
+        self.assertEqual(replication.backfill_job_id, "750B")
+        self.assertEqual(replication.backfill_fields,
+                         ["Id", "Custom_Field_With_A_Long_Name_0001__c"])
+        job_request = json.loads(
+            sfdc_connection.restful.call_args.kwargs["data"])
+        self.assertTrue(job_request["query"].startswith(
+            "SELECT Id,Custom_Field_With_A_Long_Name_0001__c FROM Account"))
+        self.assertEqual(job_request["operation"], "query")
+
+    def test_full_replication_is_not_backfilled(self):
+        _, sink, replication = self._submit(incremental_ingestion=False)
+        sink.new_target_fields.assert_not_called()
+        self.assertIsNone(replication.backfill_job_id)
+
+
+class SplitColumnGroupsTest(unittest.TestCase):
+    """Splitting wide objects into column groups."""
+
+    _KEYS = ["Id", "SystemModstamp"]
+
+    def _split(self, fields, max_group_size, max_column_list_length):
+        return SalesforceToBigquery._split_column_groups(  # pylint:disable=protected-access
+            fields, self._KEYS, max_group_size, max_column_list_length)
+
+    def _assert_groups(self, groups, fields):
+        for group in groups:
+            self.assertEqual(group[:2], self._KEYS)
+        self.assertEqual([f for g in groups for f in g[2:]], fields[2:])
+
+    def test_narrow_object_is_one_group(self):
+        fields = self._KEYS + ["Name", "Phone"]
+        self.assertEqual(self._split(fields, None, 1000), [fields])
+        self.assertEqual(self._split(fields, 4, 1000), [fields])
+
+    def test_groups_fit_soql_length_limit(self):
+        fields = self._KEYS + [f"Custom_Field_With_A_Long_Name_{i:05d}__c"
+                               for i in range(5000)]
+        max_length = SalesforceToBigquery._MAX_SOQL_LENGTH_ - 100  # pylint:disable=protected-access
+        groups = self._split(fields, None, max_length)
+        self.assertEqual(len(groups), 2)
+        for group in groups:
+            self.assertLessEqual(len(",".join(group)), max_length)
+        self._assert_groups(groups, fields)
+
+    def test_groups_fit_group_size(self):
+        fields = self._KEYS + [f"Field{i}__c" for i in range(10)]
+        groups = self._split(fields, 5, 1000)
+        self.assertEqual([len(g) for g in groups], [5, 5, 5, 3])
+        self._assert_groups(groups, fields)
+
+
+if __name__ == "__main__":
+    unittest.main()